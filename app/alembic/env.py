@@ -20,6 +20,15 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = SQLModel.metadata
 
+# Full-text search tables, triggers, columns and indexes are created by hand-written
+# migrations and aren't part of the models, so autogenerate must not try to drop them
+SEARCH_OBJECTS = ("note_fts", "repair_fts", "search_vector", "ix_notes_search_vector", "ix_repairs_device_serial_trgm", "ix_repairs_external_ticket_number_trgm")
+
+def include_object(object, name, type_, reflected, compare_to):
+    if reflected and compare_to is None and name is not None and name.startswith(SEARCH_OBJECTS):
+        return False
+    return True
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -36,6 +45,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -55,7 +65,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,58 @@
+"""Add indexes for repair filters and sorts
+
+Revision ID: 015587e9f0a5
+Revises: 2c61739e25aa
+Create Date: 2026-10-18 20:41:09.372215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '015587e9f0a5'
+down_revision: Union[str, Sequence[str], None] = '2c61739e25aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Filtered pages order by (created_at, id) within one school, device model, status or SLA
+# state, and every sortable column needs an index ending in id for keyset pages. Status
+# comes with the school, as one school's repairs in one status is the usual worklist. The
+# composite indexes replace single-column ones, whose lookups they serve as a prefix.
+# A school or the SLA state can match tens of thousands of repairs, so those also get
+# indexes in the other sort orders rather than sorting every match for each page.
+REPLACED = [
+    ('ix_repairs_school_id', ['school_id'], 'ix_repairs_school_id_created_at_id', ['school_id', 'created_at', 'id']),
+    ('ix_repairs_device_model_id', ['device_model_id'], 'ix_repairs_device_model_id_created_at_id', ['device_model_id', 'created_at', 'id']),
+    ('ix_repairs_updated_at', ['updated_at'], 'ix_repairs_updated_at_id', ['updated_at', 'id']),
+]
+ADDED = [
+    ('ix_repairs_status_school_id_created_at_id', ['status', 'school_id', 'created_at', 'id']),
+    ('ix_repairs_school_id_updated_at_id', ['school_id', 'updated_at', 'id']),
+    ('ix_repairs_school_id_date_raised_id', ['school_id', 'date_raised', 'id']),
+    ('ix_repairs_sla_breached_created_at_id', ['is_sla_breached', 'created_at', 'id']),
+    ('ix_repairs_sla_breached_date_raised_id', ['is_sla_breached', 'date_raised', 'id']),
+    ('ix_repairs_date_raised_id', ['date_raised', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for old_name, _, new_name, new_columns in REPLACED:
+        op.drop_index(old_name, table_name='repairs')
+        op.create_index(new_name, 'repairs', new_columns, unique=False)
+    for name, columns in ADDED:
+        op.create_index(name, 'repairs', columns, unique=False)
+    # The planner picks between these by their statistics, which new indexes don't have yet
+    op.execute('ANALYZE repairs')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in reversed(ADDED):
+        op.drop_index(name, table_name='repairs')
+    for old_name, old_columns, new_name, _ in reversed(REPLACED):
+        op.drop_index(new_name, table_name='repairs')
+        op.create_index(old_name, 'repairs', old_columns, unique=False)
@@ -0,0 +1,31 @@
+"""Add notes_version to repairs
+
+Revision ID: 1c9705654b20
+Revises: 015587e9f0a5
+Create Date: 2026-10-18 21:32:47.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c9705654b20'
+down_revision: Union[str, Sequence[str], None] = '015587e9f0a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The server default fills existing rows without rewriting the table
+    op.add_column('repairs', sa.Column('notes_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Not a batch operation: rebuilding repairs on SQLite would drop the repair_fts triggers
+    # and renumber the rowids repair_fts points at. SQLite drops columns in place since 3.35.
+    op.drop_column('repairs', 'notes_version')
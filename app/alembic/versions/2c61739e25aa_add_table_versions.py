@@ -0,0 +1,37 @@
+"""Add table_versions for cache invalidation
+
+Revision ID: 2c61739e25aa
+Revises: b2cf970851eb
+Create Date: 2026-10-18 13:02:51.734290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c61739e25aa'
+down_revision: Union[str, Sequence[str], None] = 'b2cf970851eb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Bumps are plain UPDATEs, so every versioned table needs its row up front
+VERSIONED_TABLES = ['repairs', 'notes', 'schools', 'devices', 'collections']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table_versions = op.create_table('table_versions',
+    sa.Column('table_name', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(table_versions, [{'table_name': name, 'version': 0} for name in VERSIONED_TABLES])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
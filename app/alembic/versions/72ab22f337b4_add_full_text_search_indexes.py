@@ -0,0 +1,96 @@
+"""Add full-text search indexes for notes and repair ticket fields
+
+Revision ID: 72ab22f337b4
+Revises: 8fe5a37faa66
+Create Date: 2026-10-18 11:26:05.931742
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '72ab22f337b4'
+down_revision: Union[str, Sequence[str], None] = '8fe5a37faa66'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite: external-content FTS5 tables keyed by the source table's rowid, kept in sync by
+# triggers. Notes use a stemming tokenizer, repair fields use trigrams for substring matches.
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE note_fts USING fts5(text, content='notes', content_rowid='rowid', tokenize='porter unicode61')",
+    "CREATE VIRTUAL TABLE repair_fts USING fts5(external_ticket_number, device_serial, content='repairs', content_rowid='rowid', tokenize='trigram')",
+    """CREATE TRIGGER note_fts_insert AFTER INSERT ON notes BEGIN
+        INSERT INTO note_fts(rowid, text) VALUES (new.rowid, new.text);
+    END""",
+    """CREATE TRIGGER note_fts_delete AFTER DELETE ON notes BEGIN
+        INSERT INTO note_fts(note_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+    END""",
+    """CREATE TRIGGER note_fts_update AFTER UPDATE OF text ON notes BEGIN
+        INSERT INTO note_fts(note_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+        INSERT INTO note_fts(rowid, text) VALUES (new.rowid, new.text);
+    END""",
+    """CREATE TRIGGER repair_fts_insert AFTER INSERT ON repairs BEGIN
+        INSERT INTO repair_fts(rowid, external_ticket_number, device_serial) VALUES (new.rowid, new.external_ticket_number, new.device_serial);
+    END""",
+    """CREATE TRIGGER repair_fts_delete AFTER DELETE ON repairs BEGIN
+        INSERT INTO repair_fts(repair_fts, rowid, external_ticket_number, device_serial) VALUES ('delete', old.rowid, old.external_ticket_number, old.device_serial);
+    END""",
+    """CREATE TRIGGER repair_fts_update AFTER UPDATE OF external_ticket_number, device_serial ON repairs BEGIN
+        INSERT INTO repair_fts(repair_fts, rowid, external_ticket_number, device_serial) VALUES ('delete', old.rowid, old.external_ticket_number, old.device_serial);
+        INSERT INTO repair_fts(rowid, external_ticket_number, device_serial) VALUES (new.rowid, new.external_ticket_number, new.device_serial);
+    END""",
+    "INSERT INTO note_fts(note_fts) VALUES ('rebuild')",
+    "INSERT INTO repair_fts(repair_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS repair_fts_update",
+    "DROP TRIGGER IF EXISTS repair_fts_delete",
+    "DROP TRIGGER IF EXISTS repair_fts_insert",
+    "DROP TRIGGER IF EXISTS note_fts_update",
+    "DROP TRIGGER IF EXISTS note_fts_delete",
+    "DROP TRIGGER IF EXISTS note_fts_insert",
+    "DROP TABLE IF EXISTS repair_fts",
+    "DROP TABLE IF EXISTS note_fts",
+]
+
+# Postgres: a generated tsvector column with a GIN index for notes, trigram GIN indexes
+# for substring matches on the repair fields. Both stay in sync without triggers.
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE notes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (to_tsvector('english', text)) STORED",
+    "CREATE INDEX ix_notes_search_vector ON notes USING GIN (search_vector)",
+    "CREATE INDEX ix_repairs_device_serial_trgm ON repairs USING GIN (device_serial gin_trgm_ops)",
+    "CREATE INDEX ix_repairs_external_ticket_number_trgm ON repairs USING GIN (external_ticket_number gin_trgm_ops)",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_repairs_external_ticket_number_trgm",
+    "DROP INDEX IF EXISTS ix_repairs_device_serial_trgm",
+    "DROP INDEX IF EXISTS ix_notes_search_vector",
+    "ALTER TABLE notes DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements: list[str]) -> None:
+    for statement in statements:
+        op.execute(sa.text(statement))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        _run(SQLITE_UPGRADE)
+    else:
+        _run(POSTGRES_UPGRADE)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        _run(SQLITE_DOWNGRADE)
+    else:
+        _run(POSTGRES_DOWNGRADE)
@@ -0,0 +1,47 @@
+"""Add indexes for foreign keys and sort columns
+
+Revision ID: 8fe5a37faa66
+Revises: d035db600398
+Create Date: 2026-10-18 10:02:47.118903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8fe5a37faa66'
+down_revision: Union[str, Sequence[str], None] = 'd035db600398'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keyset pages order by (created_at DESC, id DESC), which an ascending
+# (created_at, id) index serves with a backward scan on SQLite and Postgres.
+INDEXES = [
+    ('ix_repairs_created_at_id', 'repairs', ['created_at', 'id']),
+    ('ix_repairs_creator_id', 'repairs', ['creator_id']),
+    ('ix_repairs_school_id', 'repairs', ['school_id']),
+    ('ix_repairs_device_model_id', 'repairs', ['device_model_id']),
+    ('ix_repairs_inbound_collection_id', 'repairs', ['inbound_collection_id']),
+    ('ix_repairs_outbound_collection_id', 'repairs', ['outbound_collection_id']),
+    ('ix_notes_repair_id_created_at', 'notes', ['repair_id', 'created_at']),
+    ('ix_notes_created_at_id', 'notes', ['created_at', 'id']),
+    ('ix_notes_creator_id', 'notes', ['creator_id']),
+    ('ix_schools_created_at_id', 'schools', ['created_at', 'id']),
+    ('ix_devices_created_at_id', 'devices', ['created_at', 'id']),
+    ('ix_collections_created_at_id', 'collections', ['created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,59 @@
+"""Add job_state for the SLA engine and key its partial index on the clock start
+
+Revision ID: b0812b4ee0b3
+Revises: ccb2fa80fdc1
+Create Date: 2026-10-18 23:41:26.907154
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b0812b4ee0b3'
+down_revision: Union[str, Sequence[str], None] = 'ccb2fa80fdc1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Jobs are claimed with a plain UPDATE, so every job needs its row up front
+JOBS = ['sla']
+
+# SQLite only uses a partial index when the query repeats its predicate, and SQLAlchemy
+# renders not_(is_sla_breached) as "is_sla_breached = 0" there.
+SQLITE_OPEN_UNBREACHED = sa.text('date_closed IS NULL AND is_sla_breached = 0')
+POSTGRES_OPEN_UNBREACHED = sa.text('date_closed IS NULL AND NOT is_sla_breached')
+
+# Keyed on when the SLA clock starts, see app.services.sla._clock_start()
+CLOCK_START = sa.text('coalesce(inbound_date, date_raised)')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    job_state = op.create_table('job_state',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('last_started_at', sa.DateTime(), nullable=True),
+    sa.Column('previous_started_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(job_state, [{'name': name} for name in JOBS])
+
+    # b2cf970851eb keyed the index on date_raised, with a predicate SQLite never matched
+    op.drop_index('ix_repairs_open_unbreached', table_name='repairs')
+    op.create_index(
+        'ix_repairs_open_unbreached', 'repairs', [CLOCK_START], unique=False,
+        sqlite_where=SQLITE_OPEN_UNBREACHED, postgresql_where=POSTGRES_OPEN_UNBREACHED,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # As b2cf970851eb created it
+    op.drop_index('ix_repairs_open_unbreached', table_name='repairs')
+    op.create_index(
+        'ix_repairs_open_unbreached', 'repairs', ['date_raised'], unique=False,
+        sqlite_where=POSTGRES_OPEN_UNBREACHED, postgresql_where=POSTGRES_OPEN_UNBREACHED,
+    )
+    op.drop_table('job_state')
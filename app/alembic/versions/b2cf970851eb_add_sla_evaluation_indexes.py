@@ -0,0 +1,37 @@
+"""Add indexes for incremental SLA evaluation
+
+Revision ID: b2cf970851eb
+Revises: 72ab22f337b4
+Create Date: 2026-10-18 12:14:38.502317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2cf970851eb'
+down_revision: Union[str, Sequence[str], None] = '72ab22f337b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Open repairs that haven't breached yet are the only ones whose state can change just
+# because time passed, so the partial index stays small as closed repairs pile up.
+OPEN_UNBREACHED = sa.text('date_closed IS NULL AND NOT is_sla_breached')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_repairs_updated_at', 'repairs', ['updated_at'], unique=False)
+    op.create_index(
+        'ix_repairs_open_unbreached', 'repairs', ['date_raised'], unique=False,
+        sqlite_where=OPEN_UNBREACHED, postgresql_where=OPEN_UNBREACHED,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_repairs_open_unbreached', table_name='repairs')
+    op.drop_index('ix_repairs_updated_at', table_name='repairs')
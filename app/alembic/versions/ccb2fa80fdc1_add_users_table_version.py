@@ -0,0 +1,31 @@
+"""Add a users row to table_versions
+
+Revision ID: ccb2fa80fdc1
+Revises: 1c9705654b20
+Create Date: 2026-10-18 23:14:05.508913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ccb2fa80fdc1'
+down_revision: Union[str, Sequence[str], None] = '1c9705654b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The authenticated-user cache is keyed on the users version, and bumps are plain UPDATEs
+table_versions = sa.table('table_versions', sa.column('table_name', sa.String), sa.column('version', sa.Integer))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.bulk_insert(table_versions, [{'table_name': 'users', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(table_versions.delete().where(table_versions.c.table_name == 'users'))
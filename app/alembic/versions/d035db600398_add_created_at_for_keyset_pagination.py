@@ -0,0 +1,76 @@
+"""Add created_at to School, Device, Collection for keyset pagination
+
+Revision ID: d035db600398
+Revises: efa07ada97af
+Create Date: 2026-10-18 09:12:31.504117
+
+"""
+from datetime import datetime, time, timedelta
+from itertools import groupby
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd035db600398'
+down_revision: Union[str, Sequence[str], None] = 'efa07ada97af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _backfill_created_at(table: str) -> None:
+    # Keyset pagination compares (created_at, id), so existing rows must not be left NULL
+    op.execute(
+        sa.text(f"UPDATE {table} SET created_at = :now WHERE created_at IS NULL")
+        .bindparams(sa.bindparam("now", datetime.now(), type_=sa.DateTime()))
+    )
+
+
+def _backfill_repair_times() -> None:
+    # Repairs created through the form used to get date.today(), i.e. midnight, so within a
+    # day they sorted below timestamped ones and among themselves by random id. Their time
+    # of day is lost; keep them in the order they were inserted (rowid on SQLite) instead.
+    bind = op.get_bind()
+    key = 'rowid' if bind.dialect.name == 'sqlite' else 'id'
+    rows = bind.execute(
+        sa.text(f"SELECT {key} AS key, created_at, updated_at FROM repairs ORDER BY created_at, {key}")
+        .columns(created_at=sa.DateTime(), updated_at=sa.DateTime())
+    ).all()
+    updates = []
+    for day, same_day in groupby((row for row in rows if row.created_at.time() == time()), key=lambda row: row.created_at):
+        for offset, row in enumerate(same_day, start=1):
+            created_at = day + timedelta(microseconds=offset)
+            updates.append({"key": row.key, "created_at": created_at, "updated_at": max(row.updated_at, created_at)})
+    if updates:
+        bind.execute(
+            sa.text(f"UPDATE repairs SET created_at = :created_at, updated_at = :updated_at WHERE {key} = :key")
+            .bindparams(sa.bindparam("created_at", type_=sa.DateTime()), sa.bindparam("updated_at", type_=sa.DateTime())),
+            updates,
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('schools', 'devices', 'collections'):
+        op.add_column(table, sa.Column('created_at', sa.DateTime(), nullable=True))
+        _backfill_created_at(table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+    _backfill_created_at('notes')
+    with op.batch_alter_table('notes') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+    _backfill_repair_times()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('notes') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+
+    for table in ('collections', 'devices', 'schools'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('created_at')
@@ -0,0 +1,79 @@
+"""
+Maintenance commands, run with `python -m app.cli <command>`
+"""
+import argparse
+import asyncio
+from datetime import date
+import time
+
+from app.database import async_engine, engine
+from app.services.search import rebuild_search_index
+from app.services.sla import sla_engine
+from app.services.synthetic import EPOCH, SyntheticReport, SyntheticScale, generate
+
+def rebuild_search_index_command(args: argparse.Namespace) -> None:
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        rebuild_search_index(connection)
+    print(f"Rebuilt search index in {time.perf_counter() - start:.2f}s")
+
+def evaluate_sla_command(args: argparse.Namespace) -> None:
+    async def run():
+        try:
+            return await sla_engine.run(full=True)
+        finally:
+            await async_engine.dispose()
+    result = asyncio.run(run())
+    # A full run always claims the job
+    assert result is not None
+    print(f"Evaluated SLA for all repairs: {result.rows_touched} rows updated in {result.duration_seconds:.2f}s")
+
+def seed_command(args: argparse.Namespace) -> None:
+    scale = SyntheticScale.for_repairs(args.repairs)
+    for name in ("schools", "devices", "collections", "users"):
+        if getattr(args, name) is not None:
+            setattr(scale, name, getattr(args, name))
+    start = time.perf_counter()
+
+    def progress(report: SyntheticReport) -> None:
+        elapsed = time.perf_counter() - start
+        print(f"\r{report.repairs:,}/{scale.repairs:,} repairs, {report.notes:,} notes ({report.repairs / elapsed:,.0f} repairs/s)", end="", flush=True)
+
+    with engine.connect() as connection:
+        report = generate(connection, scale, seed=args.seed, today=args.today, days=args.days, batch_size=args.batch_size, progress=progress)
+    print(
+        f"\nGenerated {report.repairs:,} repairs, {report.notes:,} notes, {report.schools:,} schools, "
+        f"{report.devices:,} devices, {report.collections:,} collections and {report.users:,} users "
+        f"in {time.perf_counter() - start:.1f}s; run evaluate-sla to flag breached repairs"
+    )
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Repair tracker maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-search-index", help="Rebuild the full-text search index from notes and repairs")
+    rebuild.set_defaults(handler=rebuild_search_index_command)
+
+    evaluate_sla = commands.add_parser("evaluate-sla", help="Re-evaluate SLA breaches for every repair")
+    evaluate_sla.set_defaults(handler=evaluate_sla_command)
+
+    seed = commands.add_parser("seed", help="Fill a migrated database with deterministic synthetic data for scale testing")
+    seed.add_argument("--repairs", type=int, default=100_000, help="Number of repairs; other tables are sized in proportion")
+    seed.add_argument("--schools", type=int, help="Override the number of schools")
+    seed.add_argument("--devices", type=int, help="Override the number of device models")
+    seed.add_argument("--collections", type=int, help="Override the number of collections")
+    seed.add_argument("--users", type=int, help="Override the number of technicians creating repairs and notes")
+    seed.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same data")
+    seed.add_argument("--today", type=date.fromisoformat, default=EPOCH, help=f"Last day of the data, YYYY-MM-DD (default {EPOCH}, so a seed always gives the same rows)")
+    seed.add_argument("--days", type=int, default=730, help="Spread repairs over this many days up to --today")
+    seed.add_argument("--batch-size", type=int, default=10_000, help="Rows per INSERT executemany")
+    seed.set_defaults(handler=seed_command)
+
+    return parser
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
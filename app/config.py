@@ -1,3 +1,4 @@
+import os
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic_core import MultiHostUrl
 from pydantic import AnyUrl, computed_field
@@ -17,6 +18,20 @@ class Settings(BaseSettings):
     DB_USER: str = 'myuser'
     DB_PASSWORD: str = 'mypassword'
 
+    # Connection pool settings, applied to both the sync and async engines
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800 # Postgres only
+    DB_POOL_PRE_PING: bool = True # Postgres only
+
+    # SQLite pragmas, applied to every new connection
+    SQLITE_JOURNAL_MODE: str = 'WAL'
+    SQLITE_SYNCHRONOUS: str = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KIB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456 # 256 MiB
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str | AnyUrl:
@@ -32,6 +47,22 @@ class Settings(BaseSettings):
                 path=self.DB_NAME,
             )
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str | AnyUrl:
+        if self.DB_SCHEME == 'sqlite':
+            return f'sqlite+aiosqlite:///{self.DB_NAME}'
+        else:
+            # psycopg 3 serves both the sync and async engines
+            return MultiHostUrl.build(
+                scheme='postgresql+psycopg',
+                username=self.DB_USER,
+                password=self.DB_PASSWORD,
+                host=self.DB_HOST,
+                port=self.DB_PORT,
+                path=self.DB_NAME,
+            )
+
     # Application settings
     APP_NAME: str = 'My FastAPI App'
     APP_VERSION: str = '1.0.0'
@@ -39,5 +70,52 @@ class Settings(BaseSettings):
     SECRET_KEY: str = 'change_this_secret_key'
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080 # 7 days
     SECURE_COOKIES: bool = True  # Set to True in production
+    USER_CACHE_SIZE: int = 1024 # 0 disables the authenticated-user cache
+    USER_CACHE_POLL_INTERVAL_SECONDS: float = 2 # How long a user edited by another worker, e.g. deactivated, may be served stale
+    FRAGMENT_CACHE_SIZE: int = 256 # Rendered overview fragments kept per worker, 0 disables the cache
+    CATALOG_POLL_INTERVAL_SECONDS: float = 2 # How long schools, devices and collections edited by another worker may be served stale
+
+    # Request logging settings; a request over either threshold is logged with all its statements
+    REQUEST_LOG_QUERY_THRESHOLD: int = 0 # 0 disables
+    REQUEST_LOG_MS_THRESHOLD: float = 0 # 0 disables
+
+    # Slow query log settings; statements run while handling a request are recorded with their query plan
+    SLOW_QUERY_MS: float = 250 # 0 disables
+    SLOW_QUERY_LOG_SIZE: int = 100 # Most recent slow queries kept per worker for /admin/slow-queries
+    SLOW_QUERY_LOG_FILE: str = '' # Also append each one here as a JSON line, shared by all workers
+
+    # Metrics settings
+    METRICS_MULTIPROC_DIR: str = '' # Directory shared by all workers of one deployment, emptied before they start; empty serves this process only
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 5 # How stale other workers' numbers may be in a scrape
+
+    # Static asset settings
+    STATIC_BROTLI_QUALITY: int = 11 # Assets are compressed once per worker at startup, so use maximum effort
+
+    # Password hashing settings
+    BCRYPT_ROUNDS: int = 12 # Existing hashes are upgraded on the next successful login
+    PASSWORD_HASH_WORKERS: int = max((os.cpu_count() or 2) // 2, 1) # Leave cores free for request handling
+    PASSWORD_HASH_QUEUE_DEPTH: int = 16 # Hashing requests beyond workers + queue get a 503
+
+    # SLA settings, in days from date_raised (or inbound_date once the device is received) until date_closed
+    SLA_DEFAULT_DAYS: int = 14
+    SLA_STATUS_DAYS: dict[str, int] = {'ON_HOLD': 28} # Keyed by RepairStatus name, overrides the default
+    SLA_SCHOOL_DAYS: dict[str, int] = {} # Keyed by school id, overrides the status and default thresholds
+    SLA_EVALUATION_INTERVAL_SECONDS: float = 300 # 0 disables the in-process SLA job
+
+    # Bulk update settings
+    BULK_UPDATE_CHUNK_SIZE: int = 500 # Repair ids per UPDATE ... WHERE id IN (...) statement
+
+    # Export settings
+    EXPORT_BATCH_SIZE: int = 1000 # Rows fetched from the cursor and written per chunk
+
+    # Import settings
+    IMPORT_BATCH_SIZE: int = 5000 # Rows validated, resolved and inserted per transaction
+    IMPORT_MAX_REPORTED_ERRORS: int = 200 # Further failures are counted but not listed
+
+    # Pagination settings
+    PAGE_SIZE: int = 25
+    MAX_PAGE_SIZE: int = 100
+    REPAIR_COUNT_LIMIT: int = 10000 # Repair lists count matches up to this many and report "more than" beyond it
+    REPAIR_COUNT_CACHE_SIZE: int = 256 # Filtered repair counts kept per worker until repairs change, 0 disables
 
 settings = Settings()
\ No newline at end of file
@@ -1,4 +1,123 @@
-from sqlmodel import create_engine
+from dataclasses import dataclass, field
+from threading import Lock
+import time
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config import settings
+from app.utils.request_timing import current_timing
+from app.utils.slow_queries import slow_query_log
+
+@dataclass
+class PoolWaitStats:
+    """Time spent waiting for a pooled connection, accumulated per engine"""
+    checkouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+class _TimedCheckoutMixin:
+    """Times how long each checkout waits for a free connection (including opening a new one)"""
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+# Stats live on the class because engine.dispose() replaces the pool instance
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    wait_stats = PoolWaitStats()
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    wait_stats = PoolWaitStats()
+
+def _apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    # WAL lets readers proceed while a writer commits, busy_timeout makes writers wait
+    # for the lock instead of failing with "database is locked"
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KIB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    if current_timing.get() is not None:
+        context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    started = getattr(context, "_query_started", None)
+    timing = current_timing.get()
+    if started is None or timing is None:
+        return
+    seconds = time.perf_counter() - started
+    timing.record_query(statement, seconds)
+    if settings.SLOW_QUERY_MS > 0 and seconds * 1000 >= settings.SLOW_QUERY_MS:
+        slow_query_log.record(conn, timing.route, statement, parameters, executemany, seconds)
+
+def _engine_options(is_async: bool) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    if settings.DB_SCHEME != 'sqlite':
+        options["pool_pre_ping"] = settings.DB_POOL_PRE_PING
+        options["pool_recycle"] = settings.DB_POOL_RECYCLE
+    return options
+
+def _configure(sync_engine: Engine) -> Engine:
+    if sync_engine.dialect.name == 'sqlite':
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+    # Per-request query counts and timings, see app.utils.request_timing, and the slow query log
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    return sync_engine
+
+def build_engine() -> Engine:
+    """Sync engine, used by Alembic and scripts"""
+    return _configure(create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **_engine_options(is_async=False)))
+
+def build_async_engine() -> AsyncEngine:
+    """Async engine, used by the routes"""
+    async_engine = create_async_engine(str(settings.SQLALCHEMY_ASYNC_DATABASE_URI), **_engine_options(is_async=True))
+    _configure(async_engine.sync_engine)
+    return async_engine
+
+def pool_stats(sync_engine: Engine) -> dict[str, Any]:
+    """Occupancy and checkout wait statistics for an engine's connection pool"""
+    pool = sync_engine.pool
+    wait_stats = getattr(pool, "wait_stats", PoolWaitStats())
+    return {
+        "size": pool.size(),  # type: ignore[attr-defined]
+        "checked_out": pool.checkedout(),  # type: ignore[attr-defined]
+        "checked_in": pool.checkedin(),  # type: ignore[attr-defined]
+        "overflow": pool.overflow(),  # type: ignore[attr-defined]
+        "checkouts": wait_stats.checkouts,
+        "wait_seconds_total": round(wait_stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(wait_stats.wait_seconds_max, 6),
+    }
+
+engine = build_engine()
+async_engine = build_async_engine()
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
\ No newline at end of file
+# Objects stay loaded after commit, so a handler can return what it just wrote without a
+# SELECT to reload it; every request gets a session of its own, so nothing is served stale
+session_factory = sessionmaker(engine, class_=Session, expire_on_commit=False)
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
@@ -1,15 +1,52 @@
-from pathlib import Path
-from fastapi import Depends, FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from app.routes import auth, repair, school, note, device, collection
+from app.config import settings
+from app.database import async_engine
+from app.routes import admin, auth, repair, school, note, device, collection, metrics
+from app.services.sla import sla_engine
+from app.utils.assets import assets
 from app.utils.dependencies import user_dep, get_current_user
+from app.utils.metrics import MetricsMiddleware, registry
+from app.utils.request_timing import RequestTimingMiddleware
+from app.utils.security import PasswordHasherBusy
+from app.utils.templates import templates
 
-app = FastAPI()
-app.mount("/public", StaticFiles(directory=Path("app") / "public"), name="public")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sla_job = None
+    if settings.SLA_EVALUATION_INTERVAL_SECONDS > 0:
+        sla_job = asyncio.create_task(sla_engine.run_forever())
+    metrics_job = None
+    if registry.directory is not None:
+        metrics_job = asyncio.create_task(registry.flush_forever(settings.METRICS_FLUSH_INTERVAL_SECONDS))
+    yield
+    if metrics_job is not None:
+        metrics_job.cancel()
+        with suppress(asyncio.CancelledError):
+            await metrics_job
+        # Final counts, kept for later scrapes by the remaining workers
+        registry.flush()
+    if sla_job is not None:
+        sla_job.cancel()
+        with suppress(asyncio.CancelledError):
+            await sla_job
+    await async_engine.dispose()
 
-templates = Jinja2Templates(directory=Path("app") / "templates")
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RequestTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.mount("/public", assets, name="public")
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    return templates.TemplateResponse(
+        name="components/notification.html",
+        context={"request": request, "message": "The server is busy, please try again in a moment.", "type": "warning"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"}
+    )
 
 @app.get("/", response_class=HTMLResponse)
 async def renderIndex(request: Request, current_user: user_dep):
@@ -22,8 +59,10 @@ async def renderIndex(request: Request, current_user: user_dep):
     )
 
 app.include_router(auth.router, prefix="/auth")
+app.include_router(metrics.router, prefix="/metrics") # Unauthenticated so Prometheus can scrape it
 app.include_router(repair.router, prefix="/repair", dependencies=[Depends(get_current_user)])
 app.include_router(school.router, prefix="/school", dependencies=[Depends(get_current_user)])
 app.include_router(note.router, prefix="/note", dependencies=[Depends(get_current_user)])
 app.include_router(device.router, prefix="/device", dependencies=[Depends(get_current_user)])
-app.include_router(collection.router, prefix="/collection", dependencies=[Depends(get_current_user)])
\ No newline at end of file
+app.include_router(collection.router, prefix="/collection", dependencies=[Depends(get_current_user)])
+app.include_router(admin.router, prefix="/admin", dependencies=[Depends(get_current_user)])
\ No newline at end of file
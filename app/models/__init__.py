@@ -1,7 +1,9 @@
 # Import all table models here to ensure they are registered with SQLModel
-from .collection import Collection # noqa
-from .device     import Device     # noqa
-from .note       import Note       # noqa
-from .repair     import Repair     # noqa
-from .school     import School     # noqa
-from .user       import User       # noqa
\ No newline at end of file
+from .collection    import Collection   # noqa
+from .device        import Device       # noqa
+from .job_state     import JobState     # noqa
+from .note          import Note         # noqa
+from .repair        import Repair       # noqa
+from .school        import School       # noqa
+from .table_version import TableVersion # noqa
+from .user          import User         # noqa
\ No newline at end of file
@@ -1,3 +1,6 @@
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from typing import List
 import uuid
@@ -11,7 +14,9 @@ class CollectionBase(SQLModel):
 class Collection(CollectionBase, table=True):
 	"""Collection model for database"""
 	__tablename__ = 'collections'
+	__table_args__ = (Index('ix_collections_created_at_id', 'created_at', 'id'),)
 	id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, nullable=False)
+	created_at: datetime = Field(default_factory=datetime.now, nullable=False)
 
 class CollectionPublic(CollectionBase):
     """Public model for collections"""
@@ -20,4 +25,13 @@ class CollectionPublic(CollectionBase):
 class CollectionsPublic(SQLModel):
     """Public model for fetching a list of collections with count"""
     data: List[CollectionPublic]
-    count: int
\ No newline at end of file
+    count: int
+
+@dataclass(slots=True, frozen=True)
+class CollectionRow:
+    """Read-only collection for lists, selected with columns_of(CollectionRow, Collection)"""
+    id: uuid.UUID
+    collection_number: str
+    origin: str
+    destination: str
+    created_at: datetime
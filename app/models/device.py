@@ -1,3 +1,6 @@
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from typing import List
 import uuid
@@ -10,7 +13,9 @@ class DeviceBase(SQLModel):
 class Device(DeviceBase, table=True):
     """Device model for database"""
     __tablename__ = 'devices'
+    __table_args__ = (Index('ix_devices_created_at_id', 'created_at', 'id'),)
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now, nullable=False)
 
 class DevicePublic(DeviceBase):
     id: uuid.UUID
@@ -19,4 +24,12 @@ class DevicePublic(DeviceBase):
 
 class DevicesPublic(SQLModel):
     data: List[DevicePublic]
-    count: int
\ No newline at end of file
+    count: int
+
+@dataclass(slots=True, frozen=True)
+class DeviceRow:
+    """Read-only device for lists, selected with columns_of(DeviceRow, Device)"""
+    id: uuid.UUID
+    manufacturer: str
+    model: str
+    created_at: datetime
@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import SQLModel, Field
+
+class JobState(SQLModel, table=True):
+    """When each background job last started, shared by every worker; a run claims the job by updating its row"""
+    __tablename__ = "job_state"
+    name: str = Field(primary_key=True, max_length=64)
+    last_started_at: Optional[datetime] = Field(default=None, nullable=True)
+    previous_started_at: Optional[datetime] = Field(default=None, nullable=True)
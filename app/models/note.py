@@ -1,8 +1,14 @@
+from dataclasses import dataclass
 from datetime import datetime
-from sqlmodel import SQLModel, Field
-from typing import List
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field, Relationship
+from typing import TYPE_CHECKING, List, Optional
 import uuid
 
+if TYPE_CHECKING:
+    from app.models.repair import Repair
+    from app.models.user import User
+
 class NoteBase(SQLModel):
     """Base model for notes"""
     repair_id: uuid.UUID = Field(foreign_key="repairs.id", nullable=False)
@@ -11,9 +17,16 @@ class NoteBase(SQLModel):
 class Note(NoteBase, table=True):
     """Note model for database"""
     __tablename__ = "notes"
+    __table_args__ = (
+        Index("ix_notes_repair_id_created_at", "repair_id", "created_at"),
+        Index("ix_notes_created_at_id", "created_at", "id"),
+        Index("ix_notes_creator_id", "creator_id"),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     creator_id: uuid.UUID = Field(foreign_key="users.id", nullable=False)
     created_at: datetime = Field(default_factory=datetime.now)
+    repair: "Repair" = Relationship(back_populates="notes", sa_relationship_kwargs={"lazy": "raise_on_sql"})
+    creator: "User" = Relationship(sa_relationship_kwargs={"lazy": "raise_on_sql"})
 
 class NotePublic(NoteBase):
     """Public model for notes"""
@@ -25,4 +38,14 @@ class NoteUpdate(SQLModel):
 
 class NotesPublic(SQLModel):
     data: List[NotePublic]
-    count: int
\ No newline at end of file
+    count: int
+    next_cursor: Optional[str] = None
+
+@dataclass(slots=True, frozen=True)
+class NoteRow:
+    """Read-only note for lists, selected with columns_of(NoteRow, Note)"""
+    id: uuid.UUID
+    repair_id: uuid.UUID
+    creator_id: uuid.UUID
+    text: str
+    created_at: datetime
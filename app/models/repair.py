@@ -1,8 +1,19 @@
+from dataclasses import dataclass
 from enum import IntEnum
 from datetime import date, datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Any, List, Literal, Optional
 import uuid
-from sqlmodel import Field, SQLModel
+from pydantic import model_validator
+from sqlalchemy import Index, text
+from sqlmodel import Field, Relationship, SQLModel
+from app.config import settings
+
+if TYPE_CHECKING:
+    from app.models.collection import Collection
+    from app.models.device import Device
+    from app.models.note import Note
+    from app.models.school import School
+    from app.models.user import User
 
 class RepairStatus(IntEnum):
     """Enum for repair status values"""
@@ -19,10 +30,27 @@ class RepairBase(SQLModel):
 class Repair(RepairBase, table=True):
     """Table model for repairs"""
     __tablename__ = 'repairs'
+    __table_args__ = (
+        Index('ix_repairs_created_at_id', 'created_at', 'id'),
+        Index('ix_repairs_creator_id', 'creator_id'),
+        Index('ix_repairs_school_id_created_at_id', 'school_id', 'created_at', 'id'),
+        Index('ix_repairs_device_model_id_created_at_id', 'device_model_id', 'created_at', 'id'),
+        Index('ix_repairs_status_school_id_created_at_id', 'status', 'school_id', 'created_at', 'id'),
+        Index('ix_repairs_school_id_updated_at_id', 'school_id', 'updated_at', 'id'),
+        Index('ix_repairs_school_id_date_raised_id', 'school_id', 'date_raised', 'id'),
+        Index('ix_repairs_sla_breached_created_at_id', 'is_sla_breached', 'created_at', 'id'),
+        Index('ix_repairs_sla_breached_date_raised_id', 'is_sla_breached', 'date_raised', 'id'),
+        Index('ix_repairs_inbound_collection_id', 'inbound_collection_id'),
+        Index('ix_repairs_outbound_collection_id', 'outbound_collection_id'),
+        Index('ix_repairs_updated_at_id', 'updated_at', 'id'),
+        Index('ix_repairs_date_raised_id', 'date_raised', 'id'),
+        # Matches the SLA engine's aged UPDATE as each dialect renders not_(is_sla_breached)
+        Index('ix_repairs_open_unbreached', text('coalesce(inbound_date, date_raised)'), sqlite_where=text('date_closed IS NULL AND is_sla_breached = 0'), postgresql_where=text('date_closed IS NULL AND NOT is_sla_breached')),
+    )
     id:                     uuid.UUID           = Field(nullable=False, default_factory=uuid.uuid4, primary_key=True,             description="Unique identifier for the repair")
     creator_id:             uuid.UUID           = Field(nullable=False, default_factory=None,       foreign_key="users.id",       description="ID of the user who created the repair")
-    created_at:             datetime            = Field(nullable=False, default_factory=date.today,                               description="Date the repair was created")
-    updated_at:             datetime            = Field(nullable=False, default_factory=date.today,                               description="Date the repair was last updated")
+    created_at:             datetime            = Field(nullable=False, default_factory=datetime.now,                             description="Date the repair was created")
+    updated_at:             datetime            = Field(nullable=False, default_factory=datetime.now,                             description="Date the repair was last updated")
     date_raised:            date                = Field(nullable=False, default_factory=None,                                     description="Date the repair was raised")
     date_closed:            Optional[date]      = Field(nullable=True,  default=None,                                             description="Date the repair was closed")
     school_id:              uuid.UUID           = Field(nullable=False, default_factory=None,       foreign_key="schools.id",     description="ID of the school associated with the repair")
@@ -34,6 +62,16 @@ class Repair(RepairBase, table=True):
     outbound_collection_id: Optional[uuid.UUID] = Field(nullable=True,  default=None,               foreign_key="collections.id", description="ID of the outbound collection associated with the repair")
     inbound_date:           Optional[date]      = Field(nullable=True,  default=None,                                             description="Date the inbound collection was received")
     outbound_date:          Optional[date]      = Field(nullable=True,  default=None,                                             description="Date the outbound collection was sent")
+    notes_version:          int                 = Field(nullable=False, default=0,                                                description="Bumped with every write to the repair's notes", sa_column_kwargs={"server_default": "0"})
+
+    # Relationships never lazy load: under AsyncSession that would fail anyway, and raising
+    # makes a missing selectinload/joinedload (an N+1 in the making) show up straight away
+    creator:                "User"                 = Relationship(sa_relationship_kwargs={"lazy": "raise_on_sql"})
+    school:                 "School"               = Relationship(sa_relationship_kwargs={"lazy": "raise_on_sql"})
+    device_model:           "Device"               = Relationship(sa_relationship_kwargs={"lazy": "raise_on_sql"})
+    inbound_collection:     Optional["Collection"] = Relationship(sa_relationship_kwargs={"lazy": "raise_on_sql", "foreign_keys": "[Repair.inbound_collection_id]"})
+    outbound_collection:    Optional["Collection"] = Relationship(sa_relationship_kwargs={"lazy": "raise_on_sql", "foreign_keys": "[Repair.outbound_collection_id]"})
+    notes:                  List["Note"]           = Relationship(back_populates="repair", sa_relationship_kwargs={"lazy": "raise_on_sql", "order_by": "Note.created_at.desc()"})
 
 class RepairCreate(RepairBase):
     """Model for creating a repair"""
@@ -53,6 +91,64 @@ class RepairUpdate(SQLModel):
     inbound_date:           Optional[date]         = Field(default=None,                                                             description="Date the inbound collection was received")
     outbound_date:          Optional[date]         = Field(default=None,                                                             description="Date the outbound collection was sent")
 
+class RepairFilter(SQLModel):
+    """Model for selecting repairs by their attributes; all given criteria must match"""
+    status:                 Optional[list[RepairStatus]] = Field(default=None,                                                   description="Any of these statuses")
+    school_id:              Optional[uuid.UUID]          = Field(default=None,                                                   description="ID of the school associated with the repair")
+    device_model_id:        Optional[uuid.UUID]          = Field(default=None,                                                   description="ID of the device model associated with the repair")
+    collection_id:          Optional[uuid.UUID]          = Field(default=None,                                                   description="ID of the inbound or outbound collection associated with the repair")
+    inbound_collection_id:  Optional[uuid.UUID]          = Field(default=None,                                                   description="ID of the inbound collection associated with the repair")
+    outbound_collection_id: Optional[uuid.UUID]          = Field(default=None,                                                   description="ID of the outbound collection associated with the repair")
+    date_raised_from:       Optional[date]               = Field(default=None,                                                   description="Raised on or after this date")
+    date_raised_to:         Optional[date]               = Field(default=None,                                                   description="Raised on or before this date")
+    is_sla_breached:        Optional[bool]               = Field(default=None,                                                   description="Whether the SLA has been breached")
+
+    @model_validator(mode="before")
+    @classmethod
+    def drop_blank_values(cls, data: Any) -> Any:
+        """An empty form field or query parameter means no criterion rather than an invalid one"""
+        if not isinstance(data, dict):
+            return data
+        cleaned = {}
+        for name, value in data.items():
+            if isinstance(value, list):
+                value = [item for item in value if item != ""] or None
+            if value != "":
+                cleaned[name] = value
+        return cleaned
+
+# Sortable columns, each with an index ending in id for keyset pages; "-" sorts newest first
+RepairSort = Literal["-created_at", "created_at", "-updated_at", "updated_at", "-date_raised", "date_raised"]
+
+class RepairListParams(RepairFilter):
+    """Query parameters for listing repairs: filter criteria plus sort order and page"""
+    collection_number:      Optional[str]                = Field(default=None,                                                   description="Number of the inbound or outbound collection, instead of its ID")
+    sort:                   RepairSort                   = Field(default="-created_at",                                          description="Column to sort by, prefixed with - for descending; date_raised whenever a date_raised range is given")
+    cursor:                 Optional[str]                = Field(default=None,                                                   description="Cursor of the page to fetch, from next_cursor")
+    limit:                  int                          = Field(default=settings.PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE,    description="Repairs per page")
+
+    @model_validator(mode="after")
+    def sort_date_ranges_by_date_raised(self) -> "RepairListParams":
+        """
+        No index serves a date_raised range in created_at or updated_at order: the database
+        would either sort every repair in the range or walk the sort index past every repair
+        outside it, both of which take seconds at a million repairs. A range is listed by
+        date_raised instead, in the requested direction.
+        """
+        if (self.date_raised_from is not None or self.date_raised_to is not None) and self.sort.lstrip("-") != "date_raised":
+            self.sort = "-date_raised" if self.sort.startswith("-") else "date_raised"
+        return self
+
+class RepairBulkUpdate(SQLModel):
+    """Model for applying one update to many repairs, selected by id or by filter"""
+    ids:                    Optional[list[uuid.UUID]]    = Field(default=None,                                                   description="IDs of the repairs to update")
+    filter:                 Optional[RepairFilter]       = Field(default=None,                                                   description="Criteria selecting the repairs to update")
+    update:                 RepairUpdate                 = Field(                                                                description="Fields to set on every selected repair")
+
+class RepairBulkUpdateResult(SQLModel):
+    """Public model for the outcome of a bulk update"""
+    updated: int
+
 class RepairPublic(RepairBase):
     """Public model for a repair"""
     id: uuid.UUID
@@ -72,6 +168,29 @@ class RepairPublic(RepairBase):
     outbound_date: Optional[date] = None
 
 class RepairsPublic(SQLModel):
-    """Public model for a list of repairs"""
+    """Public model for a page of repairs and how many match in total"""
     data: list[RepairPublic]
-    count: int
\ No newline at end of file
+    count: int
+    count_exact: bool = True
+    next_cursor: Optional[str] = None
+
+@dataclass(slots=True, frozen=True)
+class RepairRow:
+    """
+    Read-only repair for overview rows, with its school and device model flattened in.
+    Selected by app.services.repair_query.select_repair_rows(); carries every sortable column
+    so keyset cursors can be built from it.
+    """
+    id: uuid.UUID
+    status: RepairStatus
+    external_ticket_number: Optional[str]
+    device_serial: str
+    has_protective_case: bool
+    is_sla_breached: bool
+    date_raised: date
+    date_closed: Optional[date]
+    created_at: datetime
+    updated_at: datetime
+    school_name: str
+    device_manufacturer: str
+    device_model: str
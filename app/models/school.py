@@ -1,3 +1,6 @@
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from typing import List, Optional
 import uuid
@@ -11,7 +14,9 @@ class SchoolBase(SQLModel):
 class School(SchoolBase, table=True):
     """School model for database"""
     __tablename__ = 'schools'
+    __table_args__ = (Index('ix_schools_created_at_id', 'created_at', 'id'),)
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, nullable=False)
+    created_at: datetime = Field(default_factory=datetime.now, nullable=False)
 
 class SchoolUpdate(SchoolBase):
     name: Optional[str] = Field(default=None)
@@ -23,4 +28,13 @@ class SchoolPublic(SchoolBase):
 
 class SchoolsPublic(SQLModel):
     data: List[SchoolPublic]
-    count: int
\ No newline at end of file
+    count: int
+
+@dataclass(slots=True, frozen=True)
+class SchoolRow:
+    """Read-only school for lists, selected with columns_of(SchoolRow, School)"""
+    id: uuid.UUID
+    name: str
+    contact_name: str
+    address: str
+    created_at: datetime
@@ -0,0 +1,7 @@
+from sqlmodel import SQLModel, Field
+
+class TableVersion(SQLModel, table=True):
+    """Write counter per table, bumped in the same transaction as the write; used to invalidate caches"""
+    __tablename__ = "table_versions"
+    table_name: str = Field(primary_key=True, max_length=64)
+    version: int = Field(default=0, nullable=False)
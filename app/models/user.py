@@ -1,9 +1,10 @@
 from typing import Any
 import uuid
 from pydantic import EmailStr
-from sqlmodel import Field, SQLModel, Session, select
+from sqlmodel import Field, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.utils.security import get_password_hash
+from app.utils.security import get_password_hash_async
 
 class UserBase(SQLModel):
     email: EmailStr = Field(unique=True, index=True, max_length=255, nullable=False)
@@ -59,29 +60,40 @@ class NewPassword(SQLModel):
     token: str
     new_password: str = Field(min_length=8, max_length=40)
 
-def get_user_by_email(*, session: Session, email: str) -> User | None:
+async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
     statement = select(User).where(User.email == email)
-    session_user = session.exec(statement).first()
+    session_user = (await session.exec(statement)).first()
     return session_user
 
-def create_user(*, session: Session, user_create: UserCreate) -> User:
+async def create_user(*, session: AsyncSession, user_create: UserCreate) -> User:
     db_obj = User.model_validate(
-        user_create, update={"hashed_password": get_password_hash(user_create.password)}
+        user_create, update={"hashed_password": await get_password_hash_async(user_create.password)}
     )
     session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
+    # Sessions from app.database's factories keep db_obj loaded after commit, so no refresh
+    await session.commit()
     return db_obj
 
-def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
+async def update_user(*, session: AsyncSession, db_user: User, user_in: UserUpdate) -> Any:
+    """
+    Callers bump the users table version in the same transaction, as routes do for every
+    versioned table; cached users are stored at that version, so the bump drops them in
+    every worker, which is what enforces a deactivation
+    """
     user_data = user_in.model_dump(exclude_unset=True)
     extra_data = {}
     if "password" in user_data:
         password = user_data["password"]
-        hashed_password = get_password_hash(password)
+        hashed_password = await get_password_hash_async(password)
         extra_data["hashed_password"] = hashed_password
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    return db_user
+
+async def update_password_hash(*, session: AsyncSession, db_user: User, hashed_password: str) -> User:
+    """Callers bump the users table version in the same transaction, see update_user"""
+    db_user.hashed_password = hashed_password
+    session.add(db_user)
+    await session.commit()
     return db_user
\ No newline at end of file
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse
+from app.config import settings
+from app.utils.dependencies import superuser_dep
+from app.utils.slow_queries import slow_query_log
+from app.utils.templates import templates
+
+router = APIRouter()
+
+@router.get("/slow-queries", response_class=HTMLResponse)
+async def slow_queries(*, request: Request, user: superuser_dep):
+    return templates.TemplateResponse(
+        name="views/admin_slow_queries.html",
+        context={"request": request, "queries": slow_query_log.entries(), "threshold_ms": settings.SLOW_QUERY_MS}
+    )
+
+@router.delete("/slow-queries", response_class=HTMLResponse)
+async def clear_slow_queries(*, request: Request, user: superuser_dep):
+    slow_query_log.clear()
+    return templates.TemplateResponse(
+        name="components/notification.html",
+        context={"request": request, "message": "Slow query log cleared", "type": "success"},
+        headers={"HX-Trigger": "refreshSlowQueries"}
+    )
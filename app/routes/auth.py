@@ -1,27 +1,35 @@
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi import Depends, APIRouter, HTTPException, Request, Response, Query, status
 from typing import Annotated, Any
 
-from fastapi.templating import Jinja2Templates
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config import settings
 import jwt
 
-from app.models.user import User, UserCreate, UserPublic, UserRegister, get_user_by_email, create_user
-from app.utils.dependencies import session_dep
-from app.utils.security import verify_password
+from app.database import async_session_factory
+from app.models.user import User, UserCreate, UserPublic, UserRegister, get_user_by_email, create_user, update_password_hash
+from app.utils.dependencies import async_session_dep
+from app.utils.security import verify_and_update_password
+from app.utils.table_versions import bump_table_versions
+from app.utils.templates import templates
 
-templates = Jinja2Templates(directory=Path("app") / "templates")
-
-def authenticate(session: Session, email: str, password: str) -> User | None:
-    db_user = get_user_by_email(session=session, email=email)
+async def authenticate(session: AsyncSession, email: str, password: str) -> User | None:
+    db_user = await get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    # Hand the connection back to the pool while bcrypt runs, or a login storm exhausts it
+    await session.close()
+    verified, new_hash = await verify_and_update_password(password, db_user.hashed_password)
+    if not verified:
         return None
+    if new_hash:
+        # The hash was made with outdated cost parameters, upgrade it while we have the password.
+        # The request's session was closed for bcrypt, so the write gets a fresh one.
+        async with async_session_factory() as rehash_session:
+            await bump_table_versions(rehash_session, User.__tablename__)
+            await update_password_hash(session=rehash_session, db_user=db_user, hashed_password=new_hash)
     return db_user
 
 def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
@@ -46,13 +54,13 @@ async def render_login(request: Request, next: str = Query(default="/")):
     )
 
 @router.post("/login")
-def login(
+async def login(
     request: Request,
-    session: session_dep,
+    session: async_session_dep,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     next: str = Query(default="/")
 ) -> Response:
-    user = authenticate(session=session, email=form_data.username, password=form_data.password)
+    user = await authenticate(session=session, email=form_data.username, password=form_data.password)
     if not user:
         # return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
         return templates.TemplateResponse(
@@ -82,17 +90,17 @@ def login(
 
 # TO-DO: Delete this or implement it with a registration key from .env
 @router.get("/register")
-def render_Register():
+async def render_Register():
     pass
 
 # TO-DO: Don't allow arbitrary user registration, restrict to superusers via admin UI
 @router.post("/register", response_model=UserPublic)
-def register(session: session_dep, new_user: UserRegister):
+async def register(session: async_session_dep, new_user: UserRegister):
     """
     Create new user without needing to be logged in (e.g. as a Superuser)
     """
     # Check if user with the same email already exists
-    existing_user = get_user_by_email(session=session, email=new_user.email)
+    existing_user = await get_user_by_email(session=session, email=new_user.email)
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A user with this email already exists")
 
@@ -101,11 +109,11 @@ def register(session: session_dep, new_user: UserRegister):
         new_user,
         update={"is_superuser": False, "is_active": True}
     )
-    user = create_user(session=session, user_create=user_create)
+    user = await create_user(session=session, user_create=user_create)
     return user
 
 @router.post("/logout")
-def logout(request: Request):
+async def logout(request: Request):
     """
     Log out the user by clearing the access token cookie.
     TO-DO: This is complete and utter garbage - come back later and implement Refresh Tokens.
@@ -1,38 +1,49 @@
 from typing import Annotated
 from fastapi import APIRouter, Form, HTTPException, Request, status
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlmodel import or_, select
+from app.config import settings
+from sqlmodel import or_
 from app.models.collection import Collection, CollectionBase, CollectionPublic, CollectionsPublic
 from app.models.repair import Repair
-from app.utils.dependencies import session_dep
+from app.utils.catalog import catalog
+from app.utils.dependencies import async_session_dep
+from app.utils.fragment_cache import cached_fragment
+from app.utils.integrity import count_references, describe_references, has_references
+from app.utils.pagination import page_size_query
+from app.utils.table_versions import bump_table_versions
+from app.utils.templates import templates
 import uuid
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 #
 # Device view routes and HTMX Partials
 #
 
 @router.get("/overview", response_class=HTMLResponse)
-def collection_overview(*, session: session_dep, request: Request):
-    collections = session.exec(select(Collection)).all()
-    return templates.TemplateResponse(
-        "views/collection_overview.html",
-        {"request": request, "collections": collections}
-    )
+async def collection_overview(*, session: async_session_dep, request: Request, limit: page_size_query = settings.PAGE_SIZE):
+    async def render(versions):
+        collections, next_cursor = (await catalog.get(session, Collection.__tablename__, version=versions[Collection.__tablename__])).page(None, limit)
+        return templates.get_template("views/collection_overview.html").render({"request": request, "collections": collections, "next_cursor": next_cursor})
+    return await cached_fragment(request, session, (Collection.__tablename__,), render)
+
+@router.get("/overview/rows", response_class=HTMLResponse)
+async def collection_rows(*, session: async_session_dep, request: Request, cursor: str, limit: page_size_query = settings.PAGE_SIZE):
+    async def render(versions):
+        collections, next_cursor = (await catalog.get(session, Collection.__tablename__, version=versions[Collection.__tablename__])).page(cursor, limit)
+        return templates.get_template("partials/collection_rows.html").render({"request": request, "collections": collections, "next_cursor": next_cursor})
+    return await cached_fragment(request, session, (Collection.__tablename__,), render)
 
 #
 # Collection CRUD routes
 #
 
 @router.post("/", response_class=HTMLResponse)
-def create_collection(*, request: Request, session: session_dep, collection: Annotated[CollectionBase, Form()]):
+async def create_collection(*, request: Request, session: async_session_dep, collection: Annotated[CollectionBase, Form()]):
     db_collection = Collection.model_validate(collection)
     session.add(db_collection)
-    session.commit()
-    session.refresh(db_collection)
+    await bump_table_versions(session, Collection.__tablename__)
+    await session.commit()
     return templates.TemplateResponse(
         name="components/notification.html",
         context={"request": request, "message": "Collection created successfully!", "type": "success"},
@@ -41,32 +52,29 @@ def create_collection(*, request: Request, session: session_dep, collection: Ann
     )
 
 @router.delete("/{collection_id}", response_model=CollectionPublic)
-def delete_collection(*, request: Request, session: session_dep, collection_id: uuid.UUID):
-    associated_repairs = session.exec(
-        select(Repair)
-        .where(
-            or_(
-                Repair.inbound_collection_id == collection_id,
-                Repair.outbound_collection_id == collection_id
-            )
-        )
-    ).all()
+async def delete_collection(*, request: Request, session: async_session_dep, collection_id: uuid.UUID):
+    references_collection = or_(
+        Repair.inbound_collection_id == collection_id,
+        Repair.outbound_collection_id == collection_id
+    )
 
-    if associated_repairs:
+    if await has_references(session, Repair, references_collection):
+        repair_count = await count_references(session, Repair, references_collection)
         return templates.TemplateResponse(
             "components/notification.html",
-            {"request": request, "message": "Cannot delete collection with associated repairs.", "type": "error"},
+            {"request": request, "message": f"Cannot delete collection with {describe_references(repair_count)} associated repairs.", "type": "error"},
         )
     
-    db_collection = session.get(Collection, collection_id)
+    db_collection = await session.get(Collection, collection_id)
     if not db_collection:
         return templates.TemplateResponse(
             "components/notification.html",
             {"request": request, "message": "Cannot delete a collection that does not exist!", "type": "error"},
         )
     
-    session.delete(db_collection)
-    session.commit()
+    await session.delete(db_collection)
+    await bump_table_versions(session, Collection.__tablename__)
+    await session.commit()
     return templates.TemplateResponse(
         "components/notification.html",
         {"request": request, "message": "Collection deleted successfully!", "type": "success"},
@@ -1,38 +1,48 @@
 from typing import Annotated
 from fastapi import APIRouter, Form, Request, status
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlmodel import select
+from app.config import settings
 from app.models.device import Device, DeviceBase
 from app.models.repair import Repair
-from app.utils.dependencies import session_dep
+from app.utils.catalog import catalog
+from app.utils.dependencies import async_session_dep
+from app.utils.fragment_cache import cached_fragment
+from app.utils.integrity import count_references, describe_references, has_references
+from app.utils.pagination import page_size_query
+from app.utils.table_versions import bump_table_versions
+from app.utils.templates import templates
 import uuid
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 #
 # Device view routes and HTMX Partials
 #
 
 @router.get("/overview", response_class=HTMLResponse)
-def device_overview(*, session: session_dep, request: Request):
-    devices = session.exec(select(Device)).all()
-    return templates.TemplateResponse(
-        "views/device_overview.html",
-        {"request": request, "devices": devices}
-    )
+async def device_overview(*, session: async_session_dep, request: Request, limit: page_size_query = settings.PAGE_SIZE):
+    async def render(versions):
+        devices, next_cursor = (await catalog.get(session, Device.__tablename__, version=versions[Device.__tablename__])).page(None, limit)
+        return templates.get_template("views/device_overview.html").render({"request": request, "devices": devices, "next_cursor": next_cursor})
+    return await cached_fragment(request, session, (Device.__tablename__,), render)
+
+@router.get("/overview/rows", response_class=HTMLResponse)
+async def device_rows(*, session: async_session_dep, request: Request, cursor: str, limit: page_size_query = settings.PAGE_SIZE):
+    async def render(versions):
+        devices, next_cursor = (await catalog.get(session, Device.__tablename__, version=versions[Device.__tablename__])).page(cursor, limit)
+        return templates.get_template("partials/device_rows.html").render({"request": request, "devices": devices, "next_cursor": next_cursor})
+    return await cached_fragment(request, session, (Device.__tablename__,), render)
 
 #
 # Device CRUD routes
 #
 
 @router.post("/", response_class=HTMLResponse)
-def create_device(*, request: Request, session: session_dep, device: Annotated[DeviceBase, Form()]):
+async def create_device(*, request: Request, session: async_session_dep, device: Annotated[DeviceBase, Form()]):
     db_device = Device.model_validate(device)
     session.add(db_device)
-    session.commit()
-    session.refresh(db_device)
+    await bump_table_versions(session, Device.__tablename__)
+    await session.commit()
     return templates.TemplateResponse(
         name="components/notification.html",
         context={"request": request, "message": "Device created successfully!", "type": "success"},
@@ -48,28 +58,25 @@ def create_device(*, request: Request, session: session_dep, device: Annotated[D
 #         raise HTTPException(status_code=404, detail="Device not found")
 #     return device
 
-# Come back later and validate device has no repairs tied to it before deleting
 @router.delete("/{device_id}", response_class=HTMLResponse)
-def delete_device(*, request: Request, session: session_dep, device_id: uuid.UUID):
-    associated_repairs = session.exec(
-        select(Repair).where(Repair.device_model_id == device_id)
-    ).all()
-
-    if associated_repairs:
+async def delete_device(*, request: Request, session: async_session_dep, device_id: uuid.UUID):
+    if await has_references(session, Repair, Repair.device_model_id == device_id):
+        repair_count = await count_references(session, Repair, Repair.device_model_id == device_id)
         return templates.TemplateResponse(
             "components/notification.html",
-            {"request": request, "message": "Cannot delete a device model with associated repairs!", "type": "error"}
+            {"request": request, "message": f"Cannot delete a device model with {describe_references(repair_count)} associated repairs!", "type": "error"}
         )
     
-    db_device = session.get(Device, device_id)
+    db_device = await session.get(Device, device_id)
     if not db_device:
         return templates.TemplateResponse(
             name="components/notification.html",
             context={"request": request, "message": "Cannot delete a device that does not exist!", "type": "error"}
         )
     
-    session.delete(db_device)
-    session.commit()
+    await session.delete(db_device)
+    await bump_table_versions(session, Device.__tablename__)
+    await session.commit()
     return templates.TemplateResponse(
         name="components/notification.html",
         context={"request": request, "message": "Device deleted successfully!", "type": "success"},
@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.utils.metrics import CONTENT_TYPE, registry
+
+router = APIRouter()
+
+@router.get("", include_in_schema=False)
+async def metrics():
+    return Response(content=await registry.exposition(), media_type=CONTENT_TYPE)
@@ -1,47 +1,66 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from sqlmodel import select
-from app.models.note import Note, NoteBase, NotePublic, NoteUpdate, NotesPublic
-from app.utils.dependencies import session_dep, user_dep
+from app.config import settings
+from app.models.note import Note, NoteBase, NotePublic, NoteRow, NoteUpdate, NotesPublic
+from app.services.row_versions import bump_notes_version, note_with_version
+from app.utils.conditional import CACHE_CONTROL, etag_matches, make_etag, not_modified
+from app.utils.dependencies import async_session_dep, user_dep
+from app.utils.pagination import page_size_query, paginate
+from app.utils.read_models import build_rows, columns_of
+from app.utils.table_versions import bump_table_versions, get_table_versions
+from app.utils.writes import delete_returning, update_returning
 import uuid
 
 router = APIRouter()
 
 @router.post("/", response_model=NotePublic)
-def create_note(*, session: session_dep, user: user_dep, note: NoteBase):
+async def create_note(*, session: async_session_dep, user: user_dep, note: NoteBase):
     db_note = Note.model_validate(note, update={"creator_id": user.id})
     session.add(db_note)
-    session.commit()
-    session.refresh(db_note)
+    await session.exec(bump_notes_version(db_note.repair_id))  # type: ignore[call-overload]
+    await bump_table_versions(session, Note.__tablename__)
+    await session.commit()
     return db_note
 
 @router.get("/", response_model=NotesPublic)
-def list_notes(*, session: session_dep):
-    notes = session.exec(select(Note)).all()
-    return NotesPublic(data=notes, count=len(notes))
+async def list_notes(*, request: Request, response: Response, session: async_session_dep, cursor: str | None = None, limit: page_size_query = settings.PAGE_SIZE):
+    etag = make_etag("notes", await get_table_versions(session, Note.__tablename__), cursor, limit)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    rows, next_cursor = await paginate(session, select(*columns_of(NoteRow, Note)), Note, cursor=cursor, limit=limit)
+    notes = build_rows(NoteRow, rows)
+    response.headers.update({"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return NotesPublic(data=notes, count=len(notes), next_cursor=next_cursor)
 
 @router.get("/{note_id}", response_model=NotePublic)
-def get_note(*, session: session_dep, note_id: uuid.UUID):
-    note = session.get(Note, note_id)
-    if not note:
+async def get_note(*, request: Request, response: Response, session: async_session_dep, note_id: uuid.UUID):
+    # A note is as small as its version, so both come from one query
+    found = await note_with_version(session, note_id)
+    if not found:
         raise HTTPException(status_code=404, detail="Note not found")
+    note, notes_version = found
+    etag = make_etag("note", note_id, notes_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update({"ETag": etag, "Cache-Control": CACHE_CONTROL})
     return note
 
 @router.patch("/{note_id}", response_model=NotePublic)
-def update_note(*, session: session_dep, note_id: uuid.UUID, note_update: NoteUpdate):
-    db_note = session.get(Note, note_id)
+async def update_note(*, session: async_session_dep, note_id: uuid.UUID, note_update: NoteUpdate):
+    db_note = await update_returning(session, Note, note_id, note_update.model_dump(exclude_unset=True))
     if not db_note:
         raise HTTPException(status_code=404, detail="Note not found")
-    db_note.sqlmodel_update(note_update.model_dump(exclude_unset=True))
-    session.add(db_note)
-    session.commit()
-    session.refresh(db_note)
+    await session.exec(bump_notes_version(db_note.repair_id))  # type: ignore[call-overload]
+    await bump_table_versions(session, Note.__tablename__)
+    await session.commit()
     return db_note
 
 @router.delete("/{note_id}", response_model=NotePublic)
-def delete_note(*, session: session_dep, note_id: uuid.UUID):
-    db_note = session.get(Note, note_id)
+async def delete_note(*, session: async_session_dep, note_id: uuid.UUID):
+    db_note = await delete_returning(session, Note, note_id)
     if not db_note:
         raise HTTPException(status_code=404, detail="Note not found")
-    session.delete(db_note)
-    session.commit()
+    await session.exec(bump_notes_version(db_note.repair_id))  # type: ignore[call-overload]
+    await bump_table_versions(session, Note.__tablename__)
+    await session.commit()
     return db_note
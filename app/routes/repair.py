@@ -1,40 +1,129 @@
-from typing import Annotated
-from fastapi import APIRouter, Form, HTTPException, Request, Response, status
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlmodel import select
+from datetime import date, datetime
+from typing import Annotated, Any, Literal, Optional
+from urllib.parse import urlencode
+from fastapi import APIRouter, File, Form, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, StreamingResponse
+from sqlalchemy.orm import joinedload
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.database import engine
+from app.models.collection import Collection
+from app.models.device import Device
 from app.models.note import Note
-from app.models.repair import Repair, RepairBase, RepairCreate, RepairUpdate, RepairPublic
-from app.utils.dependencies import session_dep, user_dep
+from app.models.repair import Repair, RepairBulkUpdate, RepairBulkUpdateResult, RepairCreate, RepairFilter, RepairListParams, RepairRow, RepairStatus, RepairUpdate, RepairPublic, RepairsPublic
+from app.models.school import School
+from app.services.bulk import bulk_update_repairs, filter_criteria
+from app.services.export import MEDIA_TYPES, ExportFilters, stream_repairs
+from app.services.importer import COLUMNS as IMPORT_COLUMNS, import_repairs
+from app.services.repair_query import RepairQuery, select_repair_rows
+from app.services.row_versions import repair_version, repair_with_version
+from app.services.search import search_repairs
+from app.utils.catalog import catalog
+from app.utils.conditional import CACHE_CONTROL, etag_matches, make_etag, not_modified
+from app.utils.dependencies import async_session_dep, user_dep
+from app.utils.fragment_cache import cached_fragment
+from app.utils.integrity import has_references
+from app.utils.pagination import page_size_query, paginate
+from app.utils.read_models import build_rows
+from app.utils.table_versions import bump_table_versions
+from app.utils.templates import templates
+from app.utils.writes import update_returning
 import uuid
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+# Overview rows are RepairRows, which join in the school and device model
+ROW_TABLES = (Repair.__tablename__, School.__tablename__, Device.__tablename__)
 
 #
 # Repair view routes and HTMX partials
 #
 
+async def _list_query(session: AsyncSession, params: RepairListParams, versions: dict[str, Any] | None = None) -> RepairQuery:
+    repair_filter = RepairFilter.model_validate(params.model_dump(include=set(RepairFilter.model_fields)))
+    if params.collection_number:
+        version = versions[Collection.__tablename__] if versions else None
+        collection = (await catalog.get(session, Collection.__tablename__, version=version)).find(params.collection_number)
+        # An unknown collection number matches no repairs, like an unknown collection_id
+        repair_filter.collection_id = collection.id if collection is not None else uuid.UUID(int=0)
+    return RepairQuery(repair_filter, params.sort)
+
+def _list_tables(params: RepairListParams) -> tuple[str, ...]:
+    return ROW_TABLES + (Collection.__tablename__,) if params.collection_number else ROW_TABLES
+
+def _list_url(path: str, params: RepairListParams, **updates: Any) -> str:
+    """`path` with the same filters and sort, for refreshing a list or loading its next page"""
+    query = {**params.model_dump(mode="json", exclude_none=True, exclude={"cursor"}), **updates}
+    return f"{path}?" + urlencode({name: str(value).lower() if isinstance(value, bool) else value for name, value in query.items()}, doseq=True)
+
+@router.get("/", response_model=RepairsPublic)
+async def list_repairs(*, session: async_session_dep, params: Annotated[RepairListParams, Query()]):
+    query = await _list_query(session, params)
+    repairs, next_cursor, count = await query.page(session, cursor=params.cursor, limit=params.limit)
+    return RepairsPublic(data=repairs, count=count.value, count_exact=count.exact, next_cursor=next_cursor)
+
 @router.get("/overview", response_class=HTMLResponse)
-def repairs_page(request: Request, session: session_dep):
-    repairs = session.exec(
-        select(Repair).order_by(Repair.created_at.desc()).limit(10)
-    ).all()
+async def repairs_page(request: Request, session: async_session_dep, params: Annotated[RepairListParams, Query()]):
+    async def render(versions):
+        query = (await _list_query(session, params, versions)).as_rows()
+        repairs, next_cursor, count = await query.page(session, cursor=None, limit=params.limit)
+        schools = await catalog.get(session, School.__tablename__, version=versions[School.__tablename__])
+        devices = await catalog.get(session, Device.__tablename__, version=versions[Device.__tablename__])
+        return templates.get_template("views/repair_overview.html").render({
+            "request": request, "repairs": repairs, "count": count, "params": params,
+            "filtered": bool(query.repair_filter.model_dump(exclude_none=True)),
+            "schools": schools.options(), "devices": devices.options(), "statuses": list(RepairStatus),
+            "refresh_url": _list_url("/repair/overview", params),
+            "rows_url": next_cursor and _list_url("/repair/overview/rows", params, cursor=next_cursor),
+        })
+    return await cached_fragment(request, session, _list_tables(params), render)
+
+@router.get("/overview/rows", response_class=HTMLResponse)
+async def repair_rows(request: Request, session: async_session_dep, params: Annotated[RepairListParams, Query()]):
+    async def render(versions):
+        query = (await _list_query(session, params, versions)).as_rows()
+        repairs, next_cursor, _ = await query.page(session, cursor=params.cursor, limit=params.limit)
+        return templates.get_template("partials/repair_rows.html").render({
+            "request": request, "repairs": repairs,
+            "rows_url": next_cursor and _list_url("/repair/overview/rows", params, cursor=next_cursor),
+        })
+    return await cached_fragment(request, session, _list_tables(params), render)
+
+@router.get("/search", response_class=HTMLResponse)
+async def repair_search(request: Request, session: async_session_dep, q: str = "", limit: page_size_query = settings.PAGE_SIZE):
+    if not q.strip():
+        rows, next_cursor = await paginate(session, select_repair_rows(), Repair, cursor=None, limit=limit)
+        return templates.TemplateResponse(
+            "partials/repair_rows.html",
+            {"request": request, "repairs": build_rows(RepairRow, rows), "rows_url": next_cursor and f"/repair/overview/rows?cursor={next_cursor}&limit={limit}"}
+        )
+    rows = await search_repairs(session, q, limit=limit, statement=select_repair_rows())
     return templates.TemplateResponse(
-        "views/repair_overview.html", 
-        {"request": request, "repairs": repairs}
+        "partials/repair_search_results.html",
+        {"request": request, "repairs": build_rows(RepairRow, rows), "query": q}
     )
 
 @router.get("/new", response_class=HTMLResponse)
-def new_repair(*, request: Request):
+async def new_repair(*, session: async_session_dep, request: Request):
+    schools = await catalog.get(session, School.__tablename__)
+    devices = await catalog.get(session, Device.__tablename__)
     return templates.TemplateResponse(
         "partials/repair_new.html",
-        {"request": request}
+        {"request": request, "schools": schools.options(), "devices": devices.options(), "today": date.today()}
+    )
+
+@router.get("/import", response_class=HTMLResponse)
+async def import_form(*, request: Request):
+    return templates.TemplateResponse(
+        "partials/repair_import.html",
+        {"request": request, "columns": IMPORT_COLUMNS}
     )
 
 @router.get("/{repair_id}/edit", response_class=HTMLResponse)
-def edit_repair(*, session: session_dep, repair_id: uuid.UUID, request: Request):
-    repair = session.get(Repair, repair_id)
+async def edit_repair(*, session: async_session_dep, repair_id: uuid.UUID, request: Request):
+    repair = await session.get(Repair, repair_id)
     if not repair:
         raise HTTPException(status_code=404, detail="Repair not found")
     return templates.TemplateResponse(
@@ -47,11 +136,11 @@ def edit_repair(*, session: session_dep, repair_id: uuid.UUID, request: Request)
 #
 
 @router.post("/", response_class=HTMLResponse)
-def create_repair(*, request: Request, response: Response, session: session_dep, user: user_dep, repair: Annotated[RepairCreate, Form()]):
+async def create_repair(*, request: Request, response: Response, session: async_session_dep, user: user_dep, repair: Annotated[RepairCreate, Form()]):
     db_repair = Repair.model_validate(repair, update={"creator_id": user.id})
     session.add(db_repair)
-    session.commit()
-    session.refresh(db_repair)
+    await bump_table_versions(session, Repair.__tablename__)
+    await session.commit()
     return templates.TemplateResponse(
         "components/notification.html",
         {"request": request, "message": "Repair created successfully!", "type": "success"},
@@ -59,30 +148,95 @@ def create_repair(*, request: Request, response: Response, session: session_dep,
         headers={"HX-Trigger": "refreshOverview"}
     )
 
+@router.post("/import", response_class=HTMLResponse)
+async def import_repairs_csv(*, request: Request, user: user_dep, file: Annotated[UploadFile, File()]):
+    def run():
+        # Validation and inserts are CPU-bound, so the import runs on the sync engine in a worker thread
+        with Session(engine) as session:
+            return import_repairs(session, file.file, creator_id=user.id)
+    report = await run_in_threadpool(run)
+    if report.read_error and not report.imported and not report.failed:
+        return templates.TemplateResponse(
+            "components/notification.html",
+            {"request": request, "message": report.read_error.message, "type": "error"},
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    return templates.TemplateResponse(
+        "partials/repair_import_report.html",
+        {"request": request, "report": report},
+        headers={"HX-Trigger": "refreshOverview"} if report.imported else None
+    )
+
+@router.get("/export")
+async def export_repairs(
+    format: Literal["csv", "ndjson"] = "csv",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    statuses: Annotated[list[RepairStatus], Query(alias="status")] = [],
+    school_id: Optional[uuid.UUID] = None,
+):
+    filters = ExportFilters(date_from=date_from, date_to=date_to, statuses=statuses, school_id=school_id)
+    filename = f"repairs-{date.today():%Y%m%d}.{format}"
+    return StreamingResponse(
+        stream_repairs(filters, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/{repair_id}", response_class=HTMLResponse)
-def get_repair(*, request: Request, session: session_dep, repair_id: uuid.UUID):
-    repair = session.get(Repair, repair_id)
-    notes = session.exec(
-        select(Note).where(Note.repair_id == repair_id).order_by(Note.created_at.desc())
-    ).all()
-    if not repair:
+async def get_repair(*, request: Request, session: async_session_dep, repair_id: uuid.UUID):
+    # Tabs refocused on a repair revalidate it; answer those from the repair's version
+    # columns alone, before its relations and notes are loaded or anything is rendered
+    version = await repair_version(session, repair_id)
+    if version is not None:
+        etag = make_etag("repair", repair_id, *version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    # None as well when the repair was deleted in between
+    found = await repair_with_version(session, repair_id) if version is not None else None
+    if not found:
         return templates.TemplateResponse(
             "components/notification.html",
             {"request": request, "message": "Repair not found", "type": "error"},
             status_code=status.HTTP_404_NOT_FOUND
         )
+    # Tagged with the version loaded alongside the repair, in case it was written since
+    repair, version = found
+    etag = make_etag("repair", repair_id, *version)
+    notes = (await session.exec(
+        select(Note).where(Note.repair_id == repair_id)
+        .options(joinedload(Note.creator))
+        .order_by(Note.created_at.desc())  # type: ignore[attr-defined]
+    )).all()
     return templates.TemplateResponse(
         "views/repair_view.html",
-        {"request": request, "repair": repair, "notes": notes}
+        {"request": request, "repair": repair, "notes": notes},
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
     )
 
+@router.patch("/bulk", response_model=RepairBulkUpdateResult)
+async def bulk_update(*, session: async_session_dep, bulk_update: RepairBulkUpdate):
+    if (bulk_update.ids is None) == (bulk_update.filter is None):
+        raise HTTPException(status_code=422, detail="Provide either ids or filter")
+    criteria = filter_criteria(bulk_update.filter) if bulk_update.filter is not None else None
+    if criteria is not None and not criteria:
+        raise HTTPException(status_code=422, detail="Filter must set at least one criterion")
+    values = bulk_update.update.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=422, detail="Update must set at least one field")
+    for field in ("inbound_collection_id", "outbound_collection_id"):
+        if values.get(field) is not None and not await has_references(session, Collection, Collection.id == values[field]):
+            raise HTTPException(status_code=404, detail="Collection not found")
+    updated = await bulk_update_repairs(session, values, ids=bulk_update.ids, criteria=criteria)
+    return RepairBulkUpdateResult(updated=updated)
+
 @router.patch("/{repair_id}", response_model=RepairPublic)
-def update_repair(*, session: session_dep, repair_id: uuid.UUID, repair_update: RepairUpdate):
-    db_repair = session.get(RepairBase, repair_id)
+async def update_repair(*, session: async_session_dep, repair_id: uuid.UUID, repair_update: RepairUpdate):
+    # The SLA engine re-evaluates repairs written since its last run
+    values = {**repair_update.model_dump(exclude_unset=True), "updated_at": datetime.now()}
+    db_repair = await update_returning(session, Repair, repair_id, values)
     if not db_repair:
         raise HTTPException(status_code=404, detail="Repair not found")
-    db_repair.sqlmodel_update(repair_update.model_dump(exclude_unset=True))
-    session.add(db_repair)
-    session.commit()
-    session.refresh(db_repair)
+    await bump_table_versions(session, Repair.__tablename__)
+    await session.commit()
     return db_repair
\ No newline at end of file
@@ -1,38 +1,49 @@
 from typing import Annotated
 from fastapi import APIRouter, Form, HTTPException, Request, status
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from app.config import settings
 from app.models.repair import Repair
 from app.models.school import School, SchoolBase, SchoolUpdate
-from sqlmodel import select
-from app.utils.dependencies import session_dep
+from app.utils.catalog import catalog
+from app.utils.dependencies import async_session_dep
+from app.utils.fragment_cache import cached_fragment
+from app.utils.integrity import count_references, describe_references, has_references
+from app.utils.pagination import page_size_query
+from app.utils.table_versions import bump_table_versions
+from app.utils.templates import templates
+from app.utils.writes import update_by_id
 import uuid
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 #
 # School view routes and HTMX Partials
 #
 
 @router.get("/overview", response_class=HTMLResponse)
-def school_overview(*, session: session_dep, request: Request):
-    schools = session.exec(select(School)).all()
-    return templates.TemplateResponse(
-        "views/school_overview.html",
-        {"request": request, "schools": schools}
-    )
+async def school_overview(*, session: async_session_dep, request: Request, limit: page_size_query = settings.PAGE_SIZE):
+    async def render(versions):
+        schools, next_cursor = (await catalog.get(session, School.__tablename__, version=versions[School.__tablename__])).page(None, limit)
+        return templates.get_template("views/school_overview.html").render({"request": request, "schools": schools, "next_cursor": next_cursor})
+    return await cached_fragment(request, session, (School.__tablename__,), render)
+
+@router.get("/overview/rows", response_class=HTMLResponse)
+async def school_rows(*, session: async_session_dep, request: Request, cursor: str, limit: page_size_query = settings.PAGE_SIZE):
+    async def render(versions):
+        schools, next_cursor = (await catalog.get(session, School.__tablename__, version=versions[School.__tablename__])).page(cursor, limit)
+        return templates.get_template("partials/school_rows.html").render({"request": request, "schools": schools, "next_cursor": next_cursor})
+    return await cached_fragment(request, session, (School.__tablename__,), render)
 
 @router.get("/new", response_class=HTMLResponse)
-def new_school(*, request: Request):
+async def new_school(*, request: Request):
     return templates.TemplateResponse(
-        "views/school_new.html",
+        "partials/school_new.html",
         {"request": request}
     )
 
 @router.get("/{school_id}/edit", response_class=HTMLResponse)
-def edit_school(*, session: session_dep, school_id: uuid.UUID, request: Request):
-    school = session.get(School, school_id)
+async def edit_school(*, session: async_session_dep, school_id: uuid.UUID, request: Request):
+    school = await session.get(School, school_id)
     if not school:
         raise HTTPException(status_code=404, detail="School not found")
     return templates.TemplateResponse(
@@ -45,11 +56,11 @@ def edit_school(*, session: session_dep, school_id: uuid.UUID, request: Request)
 #
 
 @router.post("/", response_class=HTMLResponse)
-def create_school(*, request: Request, session: session_dep, school: Annotated[SchoolBase, Form()]):
+async def create_school(*, request: Request, session: async_session_dep, school: Annotated[SchoolBase, Form()]):
     db_school = School.model_validate(school)
     session.add(db_school)
-    session.commit()
-    session.refresh(db_school)
+    await bump_table_versions(session, School.__tablename__)
+    await session.commit()
     return templates.TemplateResponse(
         name="components/notification.html",
         context={"request": request, "message": "School created successfully!", "type": "success"},
@@ -58,14 +69,11 @@ def create_school(*, request: Request, session: session_dep, school: Annotated[S
     )
 
 @router.patch("/{school_id}", response_class=HTMLResponse)
-def update_school(*, session: session_dep, school_id: uuid.UUID, school_update: Annotated[SchoolUpdate, Form()]):
-    db_school = session.get(School, school_id)
-    if not db_school:
+async def update_school(*, session: async_session_dep, school_id: uuid.UUID, school_update: Annotated[SchoolUpdate, Form()]):
+    if not await update_by_id(session, School, school_id, school_update.model_dump(exclude_unset=True)):
         raise HTTPException(status_code=404, detail="School not found")
-    db_school.sqlmodel_update(school_update.model_dump(exclude_unset=True))
-    session.add(db_school)
-    session.commit()
-    session.refresh(db_school)
+    await bump_table_versions(session, School.__tablename__)
+    await session.commit()
     return HTMLResponse(
         status_code=status.HTTP_200_OK,
         headers={
@@ -74,26 +82,24 @@ def update_school(*, session: session_dep, school_id: uuid.UUID, school_update:
     )
 
 @router.delete("/{school_id}", response_class=HTMLResponse)
-def delete_school(*, request: Request, session: session_dep, school_id: uuid.UUID):
-    associated_repairs = session.exec(
-        select(Repair).where(Repair.school_id == school_id)
-    ).all()
-
-    if associated_repairs:
+async def delete_school(*, request: Request, session: async_session_dep, school_id: uuid.UUID):
+    if await has_references(session, Repair, Repair.school_id == school_id):
+        repair_count = await count_references(session, Repair, Repair.school_id == school_id)
         return templates.TemplateResponse(
             "components/notification.html",
-            {"request": request, "message": "Cannot delete a school with associated repairs!", "type": "error"}
+            {"request": request, "message": f"Cannot delete a school with {describe_references(repair_count)} associated repairs!", "type": "error"}
         )
     
-    db_school = session.get(School, school_id)
+    db_school = await session.get(School, school_id)
     if not db_school:
         return templates.TemplateResponse(
             "components/notification.html",
             {"request": request, "message": "Cannot delete a school that does not exist!", "type": "error"}
         )
     
-    session.delete(db_school)
-    session.commit()
+    await session.delete(db_school)
+    await bump_table_versions(session, School.__tablename__)
+    await session.commit()
     return templates.TemplateResponse(
         name="components/notification.html",
         context={"request": request, "message": "School successfully deleted!", "type": "success"},
@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import Any, Sequence
+import uuid
+
+from sqlalchemy import ColumnElement, or_, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.models.repair import Repair, RepairFilter
+from app.utils.table_versions import bump_table_versions
+
+def filter_criteria(repair_filter: RepairFilter) -> list[ColumnElement[bool]]:
+    """WHERE clauses for a RepairFilter; empty when no criteria are set"""
+    criteria: list[ColumnElement[bool]] = []
+    if repair_filter.status:
+        criteria.append(Repair.status.in_(repair_filter.status))  # type: ignore[attr-defined]
+    if repair_filter.school_id is not None:
+        criteria.append(Repair.school_id == repair_filter.school_id)
+    if repair_filter.device_model_id is not None:
+        criteria.append(Repair.device_model_id == repair_filter.device_model_id)
+    if repair_filter.collection_id is not None:
+        criteria.append(or_(
+            Repair.inbound_collection_id == repair_filter.collection_id,
+            Repair.outbound_collection_id == repair_filter.collection_id,
+        ))
+    if repair_filter.inbound_collection_id is not None:
+        criteria.append(Repair.inbound_collection_id == repair_filter.inbound_collection_id)
+    if repair_filter.outbound_collection_id is not None:
+        criteria.append(Repair.outbound_collection_id == repair_filter.outbound_collection_id)
+    if repair_filter.date_raised_from is not None:
+        criteria.append(Repair.date_raised >= repair_filter.date_raised_from)
+    if repair_filter.date_raised_to is not None:
+        criteria.append(Repair.date_raised <= repair_filter.date_raised_to)
+    if repair_filter.is_sla_breached is not None:
+        criteria.append(Repair.is_sla_breached == repair_filter.is_sla_breached)
+    return criteria
+
+async def bulk_update_repairs(
+    session: AsyncSession,
+    values: dict[str, Any],
+    *,
+    ids: Sequence[uuid.UUID] | None = None,
+    criteria: Sequence[ColumnElement[bool]] | None = None,
+) -> int:
+    """
+    Apply `values` to the repairs selected by `ids` or `criteria` and return how many rows
+    changed. Ids are updated with one UPDATE ... WHERE id IN (...) per chunk of
+    BULK_UPDATE_CHUNK_SIZE, criteria with a single UPDATE; either way in one transaction.
+    """
+    # The SLA engine re-evaluates repairs written since its last run
+    values = {**values, "updated_at": datetime.now()}
+    # Nothing is loaded into the session, so there's no identity map to keep in sync
+    statement = update(Repair).values(**values).execution_options(synchronize_session=False)
+
+    updated = 0
+    if ids is not None:
+        unique_ids = list(dict.fromkeys(ids))
+        chunk_size = settings.BULK_UPDATE_CHUNK_SIZE
+        for start in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[start:start + chunk_size]
+            updated += (await session.exec(statement.where(Repair.id.in_(chunk)))).rowcount  # type: ignore[call-overload, attr-defined]
+    else:
+        updated = (await session.exec(statement.where(*(criteria or ())))).rowcount  # type: ignore[call-overload]
+
+    if updated:
+        await bump_table_versions(session, Repair.__tablename__)
+    await session.commit()
+    return updated
@@ -0,0 +1,111 @@
+import csv
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+import io
+import json
+from typing import Any, AsyncIterator, Sequence
+import uuid
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.database import async_engine
+from app.models.collection import Collection
+from app.models.device import Device
+from app.models.repair import Repair, RepairStatus
+from app.models.school import School
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+inbound = aliased(Collection, name="inbound")
+outbound = aliased(Collection, name="outbound")
+
+# Header name and column for every exported field, in output order
+COLUMNS = [
+    ("id", Repair.id),
+    ("status", Repair.status),
+    ("external_ticket_number", Repair.external_ticket_number),
+    ("date_raised", Repair.date_raised),
+    ("date_closed", Repair.date_closed),
+    ("is_sla_breached", Repair.is_sla_breached),
+    ("device_serial", Repair.device_serial),
+    ("has_protective_case", Repair.has_protective_case),
+    ("device_manufacturer", Device.manufacturer),
+    ("device_model", Device.model),
+    ("school_name", School.name),
+    ("school_contact_name", School.contact_name),
+    ("school_address", School.address),
+    ("inbound_collection_number", inbound.collection_number),
+    ("inbound_date", Repair.inbound_date),
+    ("outbound_collection_number", outbound.collection_number),
+    ("outbound_date", Repair.outbound_date),
+    ("created_at", Repair.created_at),
+    ("updated_at", Repair.updated_at),
+]
+HEADERS = [name for name, _ in COLUMNS]
+
+@dataclass
+class ExportFilters:
+    date_from: date | None = None
+    date_to: date | None = None
+    statuses: Sequence[RepairStatus] = ()
+    school_id: uuid.UUID | None = None
+
+def export_statement(filters: ExportFilters) -> Select:
+    """Flat rows of repairs with their school, device and collections, oldest first"""
+    statement = (
+        select(*(column for _, column in COLUMNS))
+        .join(School, School.id == Repair.school_id)
+        .join(Device, Device.id == Repair.device_model_id)
+        .outerjoin(inbound, inbound.id == Repair.inbound_collection_id)
+        .outerjoin(outbound, outbound.id == Repair.outbound_collection_id)
+        .order_by(Repair.created_at, Repair.id)
+    )
+    if filters.date_from is not None:
+        statement = statement.where(Repair.date_raised >= filters.date_from)
+    if filters.date_to is not None:
+        statement = statement.where(Repair.date_raised <= filters.date_to)
+    if filters.statuses:
+        statement = statement.where(Repair.status.in_(filters.statuses))
+    if filters.school_id is not None:
+        statement = statement.where(Repair.school_id == filters.school_id)
+    return statement
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, (date, uuid.UUID)):
+        return str(value)
+    return value
+
+def _csv_chunk(rows: Sequence[Sequence[Any]], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(HEADERS)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+def _ndjson_chunk(rows: Sequence[Sequence[Any]], header: bool) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(HEADERS, (_plain(value) for value in row)))) + "\n" for row in rows
+    ).encode()
+
+async def stream_repairs(filters: ExportFilters, format: str) -> AsyncIterator[bytes]:
+    """
+    Yield the export one batch at a time. Rows come from a server-side cursor (fetchmany
+    on SQLite) in batches of EXPORT_BATCH_SIZE, so memory stays flat however many rows match.
+    Opens its own connection, since the request's session is closed before streaming starts.
+    """
+    encode = _csv_chunk if format == "csv" else _ndjson_chunk
+    statement = export_statement(filters).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    async with async_engine.connect() as connection:
+        result = await connection.stream(statement)
+        first = True
+        async for rows in result.partitions():
+            yield encode(rows, first)
+            first = False
+        if first and format == "csv":
+            yield encode([], True)
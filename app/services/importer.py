@@ -0,0 +1,159 @@
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from threading import Lock
+from typing import IO, Any, Iterator
+import uuid
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlmodel import Session
+
+from app.config import settings
+from app.models.device import Device
+from app.models.repair import Repair, RepairCreate, RepairStatus
+from app.models.school import School
+from app.utils.table_versions import bump_statement
+
+# Columns of an import file. A school or device can be referenced by id or, when the id
+# column is blank, by school name / device model name.
+COLUMNS = [
+    "school_id", "school_name", "device_model_id", "device_model", "device_serial",
+    "has_protective_case", "date_raised", "status", "external_ticket_number",
+]
+
+# Imports in this worker take turns to write. SQLite has one writer at a time, and its busy
+# handler retries on a backoff rather than in order, so concurrent imports left to it can
+# wait past the busy timeout while the others keep taking the lock.
+_write_lock = Lock()
+
+@dataclass
+class RowError:
+    line: int
+    message: str
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    failed: int = 0
+    errors: list[RowError] = field(default_factory=list)
+    # Set when the file stopped being readable part way; the rows before it are still imported
+    read_error: RowError | None = None
+
+    def add_error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line, message))
+
+def _read_rows(file: IO[bytes], report: ImportReport) -> Iterator[tuple[int, dict[str, str]]]:
+    """
+    Yield (line number, row) pairs without reading the whole file into memory. A line that
+    can't be decoded or parsed ends the file there and is recorded as the report's read_error.
+    """
+    # Decoded line by line rather than through a TextIOWrapper, whose read-ahead would fail
+    # on a bad byte before the rows in front of it were yielded
+    reader = csv.DictReader(line.decode("utf-8-sig") for line in file)
+    try:
+        for row in reader:
+            yield reader.line_num, {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+    except (UnicodeDecodeError, csv.Error) as e:
+        report.read_error = RowError(reader.line_num + 1, f"Could not read the CSV file: {e}")
+
+def _parse_uuid(value: str) -> uuid.UUID | None:
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+def _resolve(session: Session, model: Any, name_column: Any, ids: set[uuid.UUID], names: set[str]) -> tuple[set[uuid.UUID], dict[str, uuid.UUID | None]]:
+    """One query per batch: which ids exist and which id each name maps to (None if ambiguous)"""
+    if not ids and not names:
+        return set(), {}
+    found_ids: set[uuid.UUID] = set()
+    by_name: dict[str, uuid.UUID | None] = {}
+    for row_id, name in session.exec(select(model.id, name_column).where(or_(model.id.in_(list(ids)), name_column.in_(list(names))))):  # type: ignore[call-overload]
+        found_ids.add(row_id)
+        if name in names:
+            by_name[name] = None if name in by_name else row_id
+    return found_ids, by_name
+
+def _reference(row: dict[str, str], id_key: str, name_key: str, found_ids: set[uuid.UUID], by_name: dict[str, uuid.UUID | None], label: str) -> uuid.UUID:
+    if row.get(id_key):
+        row_id = _parse_uuid(row[id_key])
+        if row_id is None or row_id not in found_ids:
+            raise ValueError(f"{label} {row[id_key]!r} not found")
+        return row_id
+    name = row.get(name_key, "")
+    if not name:
+        raise ValueError(f"{id_key} or {name_key} is required")
+    if name not in by_name:
+        raise ValueError(f"{label} {name!r} not found")
+    if by_name[name] is None:
+        raise ValueError(f"{label} name {name!r} is ambiguous, use {id_key}")
+    return by_name[name]  # type: ignore[return-value]
+
+def _import_batch(session: Session, batch: list[tuple[int, dict[str, str]]], creator_id: uuid.UUID, report: ImportReport) -> None:
+    school_ids = {i for line, row in batch if (i := _parse_uuid(row.get("school_id", "")))}
+    school_names = {row["school_name"] for line, row in batch if not row.get("school_id") and row.get("school_name")}
+    device_ids = {i for line, row in batch if (i := _parse_uuid(row.get("device_model_id", "")))}
+    device_names = {row["device_model"] for line, row in batch if not row.get("device_model_id") and row.get("device_model")}
+    found_schools, schools_by_name = _resolve(session, School, School.name, school_ids, school_names)
+    found_devices, devices_by_name = _resolve(session, Device, Device.model, device_ids, device_names)
+
+    now = datetime.now()
+    values: list[dict[str, Any]] = []
+    for line, row in batch:
+        try:
+            school_id = _reference(row, "school_id", "school_name", found_schools, schools_by_name, "School")
+            device_model_id = _reference(row, "device_model_id", "device_model", found_devices, devices_by_name, "Device")
+            status = row.get("status") or RepairStatus.OPEN
+            if isinstance(status, str) and status.upper() in RepairStatus.__members__:
+                status = RepairStatus[status.upper()]
+            repair = RepairCreate.model_validate({
+                "school_id": school_id,
+                "device_model_id": device_model_id,
+                "device_serial": row.get("device_serial") or None,
+                "has_protective_case": row.get("has_protective_case") or None,
+                "date_raised": row.get("date_raised") or None,
+                "status": status,
+                "external_ticket_number": row.get("external_ticket_number") or None,
+            })
+        except ValidationError as e:
+            report.add_error(line, "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()))
+            continue
+        except ValueError as e:
+            report.add_error(line, str(e))
+            continue
+        values.append({
+            **repair.model_dump(),
+            "id": uuid.uuid4(),
+            "creator_id": creator_id,
+            "created_at": now,
+            "updated_at": now,
+            "is_sla_breached": False,
+        })
+
+    if values:
+        # Core insert on the table, so the list of parameter sets runs as one executemany; the ORM
+        # bulk path falls back to a statement per row here because of the status server default
+        with _write_lock:
+            session.connection().execute(insert(Repair.__table__), values)  # type: ignore[arg-type]
+            session.connection().execute(bump_statement(Repair.__tablename__))
+            session.commit()
+        report.imported += len(values)
+
+def import_repairs(session: Session, file: IO[bytes], creator_id: uuid.UUID, batch_size: int | None = None) -> ImportReport:
+    """
+    Import repairs from a CSV file in batches: each batch is validated against RepairCreate,
+    its school and device references are resolved with one query each, and its valid rows are
+    inserted with a single executemany and committed. Invalid rows are skipped and reported.
+    An unreadable line stops the import there; the batches before it stay committed and the
+    report says where it stopped.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    report = ImportReport()
+    rows = _read_rows(file, report)
+    while batch := list(islice(rows, batch_size)):
+        _import_batch(session, batch, creator_id, report)
+    return report
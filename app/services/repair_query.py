@@ -0,0 +1,102 @@
+from dataclasses import dataclass, field, replace
+from typing import Any, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.sql import Select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.models.device import Device
+from app.models.repair import Repair, RepairFilter, RepairRow, RepairSort
+from app.models.school import School
+from app.services.bulk import filter_criteria
+from app.utils.pagination import paginate
+from app.utils.read_models import build_rows, columns_of
+from app.utils.table_versions import get_table_versions
+from app.utils.versioned_cache import VersionedLRUCache
+
+SORT_COLUMNS = {
+    "created_at": Repair.created_at,
+    "updated_at": Repair.updated_at,
+    "date_raised": Repair.date_raised,
+}
+
+def select_repair_rows() -> Select[Any]:
+    """Select RepairRow columns, joining each repair's school and device model"""
+    columns = columns_of(RepairRow, Repair, school_name=School.name, device_manufacturer=Device.manufacturer, device_model=Device.model)
+    # Every repair has both, so outer joins return the same rows; but SQLite never reorders
+    # them, so repairs stays the outer loop and the page plan is the one without the joins
+    return (
+        select(*columns)
+        .join(School, School.id == Repair.school_id, isouter=True)
+        .join(Device, Device.id == Repair.device_model_id, isouter=True)
+    )
+
+@dataclass(frozen=True)
+class RepairCount:
+    value: int
+    exact: bool  # False when more than REPAIR_COUNT_LIMIT repairs match; value is then the limit
+
+# Repair counts keyed by filter, each served while the repairs table version it was counted
+# at is unchanged, so paging through a list counts once rather than on every page
+count_cache: VersionedLRUCache[str, RepairCount] = VersionedLRUCache(maxsize=settings.REPAIR_COUNT_CACHE_SIZE)
+
+@dataclass(frozen=True)
+class RepairQuery:
+    """
+    A repair list built up from filter criteria, a sort order and either loader options or
+    a projection, then run as one keyset page query and one bounded COUNT. Each method
+    returns a new query:
+
+        RepairQuery().filter(school_id=school_id).order_by("-date_raised").as_rows()
+    """
+    repair_filter: RepairFilter = field(default_factory=RepairFilter)
+    sort: RepairSort = "-created_at"
+    loader_options: tuple[Any, ...] = ()
+    read_rows: bool = False
+
+    def filter(self, **criteria: Any) -> "RepairQuery":
+        return replace(self, repair_filter=self.repair_filter.model_copy(update=criteria))
+
+    def order_by(self, sort: RepairSort) -> "RepairQuery":
+        return replace(self, sort=sort)
+
+    def options(self, *options: Any) -> "RepairQuery":
+        return replace(self, loader_options=self.loader_options + options)
+
+    def as_rows(self) -> "RepairQuery":
+        """Page RepairRow read models, for lists that render rather than change repairs"""
+        return replace(self, read_rows=True)
+
+    def _key(self) -> str:
+        return self.repair_filter.model_dump_json(include=set(RepairFilter.model_fields), exclude_none=True)
+
+    async def count(self, session: AsyncSession) -> RepairCount:
+        """
+        How many repairs match, counted up to REPAIR_COUNT_LIMIT: past that the exact figure
+        costs a scan of every match but tells a person scrolling a list nothing more.
+        """
+        key = self._key()
+        version = await get_table_versions(session, Repair.__tablename__)
+        count = count_cache.get(key, version)
+        if count is not None:
+            return count
+        limit = settings.REPAIR_COUNT_LIMIT
+        matches = select(Repair.id).where(*filter_criteria(self.repair_filter)).limit(limit + 1).subquery()
+        value = (await session.exec(select(func.count()).select_from(matches))).one()
+        count = RepairCount(value=min(value, limit), exact=value <= limit)
+        count_cache.put(key, version, count)
+        return count
+
+    async def page(self, session: AsyncSession, *, cursor: str | None, limit: int) -> tuple[Sequence[Repair | RepairRow], str | None, RepairCount]:
+        """One page of matching repairs, the cursor for the next one and the total count"""
+        count = await self.count(session)
+        if count.value == 0:
+            return [], None, count
+        statement = select_repair_rows() if self.read_rows else select(Repair).options(*self.loader_options)
+        rows, next_cursor = await paginate(
+            session, statement.where(*filter_criteria(self.repair_filter)), Repair,
+            cursor=cursor, limit=limit, sort_column=SORT_COLUMNS[self.sort.lstrip("-")], descending=self.sort.startswith("-"),
+        )
+        return build_rows(RepairRow, rows) if self.read_rows else rows, next_cursor, count
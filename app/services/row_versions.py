@@ -0,0 +1,72 @@
+from typing import Any
+import uuid
+
+from sqlalchemy import Update, func, update
+from sqlalchemy.orm import joinedload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.collection import Collection
+from app.models.device import Device
+from app.models.note import Note
+from app.models.repair import Repair
+from app.models.school import School
+from app.models.table_version import TableVersion
+
+# Reference tables whose rows the repair detail shows next to the repair. Users are shown
+# too but aren't versioned; nothing renames a user once registered.
+DETAIL_TABLES = (School.__tablename__, Device.__tablename__, Collection.__tablename__)
+
+def bump_notes_version(repair_id: uuid.UUID) -> Update:
+    """UPDATE that marks a repair's notes as changed; run it in the same transaction as the note write"""
+    return (
+        update(Repair)
+        .where(Repair.id == repair_id)
+        .values(notes_version=Repair.notes_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def _references_version() -> Any:
+    """Scalar subquery for the version of the reference tables the repair detail renders"""
+    # Table versions only grow, so their sum changes whenever any one of them does
+    return (
+        select(func.coalesce(func.sum(TableVersion.version), 0))
+        .where(TableVersion.table_name.in_(DETAIL_TABLES))  # type: ignore[attr-defined]
+        .scalar_subquery()
+    )
+
+async def repair_version(session: AsyncSession, repair_id: uuid.UUID) -> tuple[Any, ...] | None:
+    """
+    The version of everything the repair detail renders from, read from the repair row's
+    version columns alone: the repair's own writes (updated_at), SLA flips (which leave
+    updated_at alone, as the SLA engine uses it to find repairs written since its last
+    run), its notes and the reference tables. None when there is no such repair.
+    """
+    statement = select(Repair.updated_at, Repair.is_sla_breached, Repair.notes_version, _references_version()).where(Repair.id == repair_id)
+    row = (await session.exec(statement)).first()
+    return tuple(row) if row is not None else None
+
+async def repair_with_version(session: AsyncSession, repair_id: uuid.UUID) -> tuple[Repair, tuple[Any, ...]] | None:
+    """
+    A repair with its to-one relations and its version as from `repair_version`, in one
+    query, so the version matches what is rendered even after a concurrent write. None
+    when there is no such repair. The notes themselves are left unloaded.
+    """
+    statement = select(Repair, _references_version()).where(Repair.id == repair_id).options(
+        joinedload(Repair.school),
+        joinedload(Repair.device_model),
+        joinedload(Repair.inbound_collection),
+        joinedload(Repair.outbound_collection),
+        joinedload(Repair.creator),
+    )
+    row = (await session.exec(statement)).first()
+    if row is None:
+        return None
+    repair, references_version = row
+    return repair, (repair.updated_at, repair.is_sla_breached, repair.notes_version, references_version)
+
+async def note_with_version(session: AsyncSession, note_id: uuid.UUID) -> tuple[Note, int] | None:
+    """A note and its repair's notes_version in one query, or None when there is no such note"""
+    statement = select(Note, Repair.notes_version).join(Repair, Repair.id == Note.repair_id).where(Note.id == note_id)
+    row = (await session.exec(statement)).first()
+    return (row[0], row[1]) if row is not None else None
@@ -0,0 +1,116 @@
+import re
+from typing import Any, Sequence
+import uuid
+
+from sqlalchemy import Connection, text
+from sqlalchemy.sql import Select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.repair import Repair
+
+# Each index ranks all of its matches and contributes the best of them. Notes are taken a
+# few per result, since a repair with several matching notes fills several note slots.
+NOTE_CANDIDATES_PER_RESULT = 4
+
+# Ticket and serial hits are more specific than words in free-text notes
+FIELD_WEIGHT = 2.0
+
+_TOKEN = re.compile(r"\w+")
+
+SQLITE_SEARCH = text("""
+    SELECT repair_id, MIN(score) AS score FROM (
+        SELECT notes.repair_id AS repair_id, hits.score AS score
+        FROM (
+            SELECT rowid, rank AS score FROM note_fts
+            WHERE note_fts MATCH :note_query
+            ORDER BY rank LIMIT :note_candidates
+        ) AS hits JOIN notes ON notes.rowid = hits.rowid
+        UNION ALL
+        SELECT repairs.id AS repair_id, hits.score * :field_weight AS score
+        FROM (
+            SELECT rowid, rank AS score FROM repair_fts
+            WHERE repair_fts MATCH :field_query
+            ORDER BY rank LIMIT :limit
+        ) AS hits JOIN repairs ON repairs.rowid = hits.rowid
+    )
+    GROUP BY repair_id
+    ORDER BY score
+    LIMIT :limit
+""")
+
+POSTGRES_SEARCH = text("""
+    SELECT repair_id, MAX(score) AS score FROM (
+        (SELECT notes.repair_id AS repair_id, ts_rank(notes.search_vector, query) AS score
+         FROM notes, websearch_to_tsquery('english', :raw_query) AS query
+         WHERE notes.search_vector @@ query
+         ORDER BY score DESC LIMIT :note_candidates)
+        UNION ALL
+        (SELECT repairs.id AS repair_id, similarity(coalesce(repairs.external_ticket_number, '') || ' ' || repairs.device_serial, :raw_query) * :field_weight AS score
+         FROM repairs
+         WHERE repairs.device_serial ILIKE :pattern OR repairs.external_ticket_number ILIKE :pattern
+         ORDER BY score DESC LIMIT :limit)
+    ) AS hits
+    GROUP BY repair_id
+    ORDER BY score DESC
+    LIMIT :limit
+""")
+
+def _fts5_query(query: str, prefix: bool) -> str:
+    """Quote each word so user input can't inject FTS5 syntax; words are AND-ed together"""
+    tokens = [f'"{token}"' for token in _TOKEN.findall(query)]
+    if prefix and tokens:
+        tokens[-1] += "*"
+    return " ".join(tokens)
+
+async def search_repairs(session: AsyncSession, query: str, limit: int, statement: Select[Any] | None = None) -> Sequence[Any]:
+    """
+    Rank repairs by matches in their notes, external ticket number and device serial.
+    `statement` loads the ranked repairs, select(Repair) by default; any select with the
+    repair id among its columns will do, such as a projection for rendering rows.
+    """
+    query = query.strip()
+    if not _TOKEN.search(query):
+        return []
+
+    if session.bind.dialect.name == 'sqlite':
+        result = await session.exec(SQLITE_SEARCH, params={
+            # Notes match whole (stemmed) words, with the last word as a prefix for search-as-you-type;
+            # the trigram index needs at least three characters per word
+            "note_query": _fts5_query(query, prefix=True),
+            "field_query": _fts5_query(" ".join(t for t in _TOKEN.findall(query) if len(t) >= 3), prefix=False) or '""',
+            "field_weight": FIELD_WEIGHT,
+            "note_candidates": limit * NOTE_CANDIDATES_PER_RESULT,
+            "limit": limit,
+        })
+    else:
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        result = await session.exec(POSTGRES_SEARCH, params={
+            "raw_query": query,
+            "pattern": f"%{escaped}%",
+            "field_weight": FIELD_WEIGHT,
+            "note_candidates": limit * NOTE_CANDIDATES_PER_RESULT,
+            "limit": limit,
+        })
+
+    ranked_ids = [uuid.UUID(str(row.repair_id)) for row in result]
+    if not ranked_ids:
+        return []
+    statement = select(Repair) if statement is None else statement
+    repairs = {repair.id: repair for repair in (await session.exec(statement.where(Repair.id.in_(ranked_ids)))).all()}
+    return [repairs[repair_id] for repair_id in ranked_ids if repair_id in repairs]
+
+def rebuild_search_index(connection: Connection) -> None:
+    """
+    Rebuild the search indexes from the source tables. Needed after restoring a backup or,
+    on SQLite, after a VACUUM, which may renumber the rowids the FTS5 tables point at.
+    """
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql("INSERT INTO note_fts(note_fts) VALUES ('rebuild')")
+        connection.exec_driver_sql("INSERT INTO repair_fts(repair_fts) VALUES ('rebuild')")
+        connection.exec_driver_sql("INSERT INTO note_fts(note_fts) VALUES ('optimize')")
+        connection.exec_driver_sql("INSERT INTO repair_fts(repair_fts) VALUES ('optimize')")
+    else:
+        connection.exec_driver_sql("REINDEX INDEX ix_notes_search_vector")
+        connection.exec_driver_sql("REINDEX INDEX ix_repairs_device_serial_trgm")
+        connection.exec_driver_sql("REINDEX INDEX ix_repairs_external_ticket_number_trgm")
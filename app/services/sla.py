@@ -0,0 +1,181 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+import logging
+import time
+from typing import Any
+import uuid
+
+from sqlalchemy import ColumnElement, Date, and_, bindparam, case, cast, func, literal, not_, or_, select, true, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.database import async_engine
+from app.models.job_state import JobState
+from app.models.repair import Repair, RepairStatus
+from app.utils.table_versions import bump_statement
+
+logger = logging.getLogger(__name__)
+
+# The engine's row in job_state
+SLA_JOB = "sla"
+
+@dataclass
+class SlaRun:
+    """Outcome of one SLA evaluation"""
+    started_at: datetime
+    full: bool
+    changed_rows: int
+    aged_rows: int
+    duration_seconds: float
+
+    @property
+    def rows_touched(self) -> int:
+        return self.changed_rows + self.aged_rows
+
+def _days_between(dialect_name: str, start: Any, end: Any) -> ColumnElement[Any]:
+    """Whole days from `start` to `end`, for date columns or date parameters"""
+    if dialect_name == 'sqlite':
+        # Dates are stored as ISO strings on SQLite
+        return func.julianday(end) - func.julianday(start)
+    # Subtracting two dates gives an integer number of days on Postgres
+    return cast(end, Date) - cast(start, Date)
+
+def _threshold_days() -> ColumnElement[int]:
+    """Allowed days for each repair: a school override, else a status override, else the default"""
+    whens: list[tuple[ColumnElement[bool], int]] = [
+        (Repair.school_id == uuid.UUID(school_id), days) for school_id, days in settings.SLA_SCHOOL_DAYS.items()
+    ]
+    whens += [(Repair.status == RepairStatus[name], days) for name, days in settings.SLA_STATUS_DAYS.items()]
+    if not whens:
+        return literal(settings.SLA_DEFAULT_DAYS)
+    return case(*whens, else_=settings.SLA_DEFAULT_DAYS)
+
+def _threshold_range() -> tuple[int, int]:
+    """Fewest and most days any repair is allowed, over the default and every override"""
+    days = [settings.SLA_DEFAULT_DAYS, *settings.SLA_STATUS_DAYS.values(), *settings.SLA_SCHOOL_DAYS.values()]
+    return min(days), max(days)
+
+def _clock_start() -> ColumnElement[date]:
+    # The clock restarts when the device is received, so courier delays don't count against us
+    return func.coalesce(Repair.inbound_date, Repair.date_raised)
+
+class SlaEngine:
+    """
+    Keeps Repair.is_sla_breached up to date with set-based UPDATEs. The first run evaluates
+    every repair; later runs only look at repairs written since the previous run and open
+    repairs whose deadline passed since then, so no repair is ever loaded into Python.
+
+    Every worker runs the engine, but the start of the last run is kept in the job_state
+    row, which a run claims in the same transaction as its UPDATEs. The claim only succeeds
+    once the last run started more than half an interval ago, and its row lock holds off the
+    other workers until that transaction ends, so one worker evaluates per interval and a
+    restart carries on incrementally.
+    """
+    def __init__(self, async_engine: AsyncEngine, interval: float):
+        self.async_engine = async_engine
+        self.interval = interval
+        self.last_run: SlaRun | None = None
+        self.runs = 0
+
+    def _breached(self, dialect_name: str, today: date) -> ColumnElement[bool]:
+        end = func.coalesce(Repair.date_closed, bindparam("today", today, type_=Date))
+        return _days_between(dialect_name, _clock_start(), end) > _threshold_days()
+
+    async def run(self, full: bool = False) -> SlaRun | None:
+        """Evaluate now, or return None when another worker's run is recent enough"""
+        started_at = datetime.now()
+        start = time.perf_counter()
+        today = started_at.date()
+
+        async with self.async_engine.begin() as connection:
+            # The claim comes first, so it takes the write lock before anything is read
+            claim = (
+                update(JobState)
+                .where(JobState.name == SLA_JOB)
+                .values(previous_started_at=JobState.last_started_at, last_started_at=started_at)
+            )
+            if not full:
+                due = started_at - timedelta(seconds=self.interval / 2)
+                claim = claim.where(or_(JobState.last_started_at.is_(None), JobState.last_started_at <= due))  # type: ignore[union-attr,operator]
+            if not (await connection.execute(claim)).rowcount:
+                return None
+            previous_start = None if full else (await connection.execute(
+                select(JobState.previous_started_at).where(JobState.name == SLA_JOB)
+            )).scalar_one()
+
+            dialect_name = connection.dialect.name
+            breached = self._breached(dialect_name, today)
+
+            # Repairs whose status, school or dates changed (or everything, on a full run)
+            changed = update(Repair).where(Repair.is_sla_breached != breached).values(is_sla_breached=breached)
+            if previous_start is not None:
+                changed = changed.where(Repair.updated_at >= previous_start)
+            changed_rows = (await connection.execute(changed)).rowcount
+
+            # Open repairs that crossed their deadline since the last run, without being written to
+            aged_rows = 0
+            if previous_start is not None and previous_start.date() < today:
+                since_date = previous_start.date()
+                since = bindparam("since", since_date, type_=Date)
+                crossed = and_(
+                    breached,
+                    not_(_days_between(dialect_name, _clock_start(), since) > _threshold_days()),
+                )
+                # Only clocks started within the thresholds before `since` and `today` can have
+                # crossed; comparing the clock start itself lets the partial index
+                # ix_repairs_open_unbreached, keyed on it, serve the range
+                fewest_days, most_days = _threshold_range()
+                aged = (
+                    update(Repair)
+                    .where(
+                        Repair.date_closed.is_(None),
+                        not_(Repair.is_sla_breached),
+                        _clock_start() >= bindparam("earliest_start", since_date - timedelta(days=most_days), type_=Date),
+                        _clock_start() < bindparam("latest_start", today - timedelta(days=fewest_days), type_=Date),
+                        crossed,
+                    )
+                    .values(is_sla_breached=true())
+                )
+                aged_rows = (await connection.execute(aged)).rowcount
+
+            if changed_rows or aged_rows:
+                await connection.execute(bump_statement(Repair.__tablename__))
+
+        self.last_run = SlaRun(
+            started_at=started_at,
+            full=previous_start is None,
+            changed_rows=changed_rows,
+            aged_rows=aged_rows,
+            duration_seconds=time.perf_counter() - start,
+        )
+        self.runs += 1
+        logger.info(
+            "SLA evaluation (%s): %d rows touched (%d changed, %d aged) in %.1f ms",
+            "full" if self.last_run.full else "incremental",
+            self.last_run.rows_touched, changed_rows, aged_rows,
+            self.last_run.duration_seconds * 1000,
+        )
+        return self.last_run
+
+    async def run_forever(self) -> None:
+        """Evaluate on a fixed interval until cancelled; a failed run is logged and retried next time"""
+        while True:
+            try:
+                await self.run()
+            except Exception:
+                logger.exception("SLA evaluation failed")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict[str, Any]:
+        if self.last_run is None:
+            return {"runs": self.runs}
+        return {
+            "runs": self.runs,
+            "last_run_at": self.last_run.started_at.isoformat(),
+            "last_run_full": self.last_run.full,
+            "last_run_rows_touched": self.last_run.rows_touched,
+            "last_run_seconds": round(self.last_run.duration_seconds, 6),
+        }
+
+sla_engine = SlaEngine(async_engine, settings.SLA_EVALUATION_INTERVAL_SECONDS)
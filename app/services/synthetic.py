@@ -0,0 +1,255 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+import random
+import re
+import secrets
+from typing import Any, Callable
+import uuid
+
+from sqlalchemy import Connection, insert
+
+from app.config import settings
+from app.models.collection import Collection
+from app.models.device import Device
+from app.models.note import Note
+from app.models.repair import Repair, RepairStatus
+from app.models.school import School
+from app.models.user import User
+from app.services.search import rebuild_search_index
+from app.utils.security import pwd_context
+from app.utils.table_versions import bump_statement
+
+# Last day of the generated data unless given; fixed, so a seed gives the same rows on any day
+EPOCH = date(2026, 1, 1)
+
+# Most repairs are long finished; the open backlog is a small, uneven tail
+STATUS_WEIGHTS = {RepairStatus.CLOSED: 70, RepairStatus.OPEN: 12, RepairStatus.PENDING: 10, RepairStatus.ON_HOLD: 8}
+
+# Notes per repair follow a Pareto tail: most repairs get none or a couple, a few get dozens
+NOTES_PARETO_ALPHA = 1.5
+MAX_NOTES_PER_REPAIR = 200
+
+# School sizes follow a Zipf-like curve, so a handful of schools raise most repairs
+SCHOOL_SKEW = 0.8
+
+MANUFACTURERS = ["Lenovo", "HP", "Dell", "Acer", "Apple", "Samsung", "Microsoft", "ASUS"]
+DEVICE_KINDS = ["Chromebook", "Laptop", "Tablet", "Convertible"]
+FAULTS = ["cracked screen", "swollen battery", "broken hinge", "missing keys", "no power", "liquid damage", "faulty charging port", "dead pixels", "touchpad unresponsive", "won't boot"]
+ACTIONS = ["Replaced", "Ordered", "Inspected", "Cleaned", "Reseated", "Tested", "Quoted for", "Escalated"]
+PARTS = ["display panel", "battery", "keyboard", "hinge assembly", "motherboard", "charging board", "bezel", "bottom case"]
+TOWNS = ["Ashford", "Bramley", "Carlton", "Dunmore", "Eastleigh", "Fairview", "Glenwood", "Harrow", "Kingsley", "Milford"]
+
+@dataclass
+class SyntheticScale:
+    repairs: int
+    schools: int
+    devices: int
+    collections: int
+    users: int
+
+    @classmethod
+    def for_repairs(cls, repairs: int) -> "SyntheticScale":
+        """Proportions of a production dataset: ~250 repairs per school, a few hundred device models"""
+        return cls(
+            repairs=repairs,
+            schools=max(repairs // 250, 10),
+            devices=min(max(repairs // 5000, 20), 500),
+            collections=max(repairs // 40, 10),
+            users=max(repairs // 20_000, 5),
+        )
+
+@dataclass
+class SyntheticReport:
+    users: int = 0
+    schools: int = 0
+    devices: int = 0
+    collections: int = 0
+    repairs: int = 0
+    notes: int = 0
+
+def _drop_sqlite_indexes(connection: Connection) -> list[str]:
+    """
+    Drop the secondary indexes and search triggers on repairs and notes and return the DDL
+    to recreate them. Building an index once over the loaded rows is several times faster
+    than updating it on every insert, especially for indexes over random UUIDs.
+    """
+    rows = connection.exec_driver_sql(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE tbl_name IN ('repairs', 'notes') AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+    ).all()
+    for kind, name, _ in rows:
+        connection.exec_driver_sql(f"DROP {kind.upper()} {name}")
+    return [sql for _, _, sql in rows]
+
+class _Generator:
+    def __init__(self, seed: int, today: date, days: int):
+        self.rng = random.Random(seed)
+        self.today = today
+        self.days = days
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def day(self, start: date, min_days: int, max_days: int) -> date:
+        return min(start + timedelta(days=self.rng.randint(min_days, max_days)), self.today)
+
+    def moment(self, day: date) -> datetime:
+        return datetime.combine(day, time()) + timedelta(seconds=self.rng.randrange(8 * 3600, 17 * 3600))
+
+    def until_today(self, moment: datetime) -> datetime:
+        """`moment`, or the end of the working day on `today` if it falls later"""
+        return min(moment, datetime.combine(self.today, time(17)))
+
+def generate(
+    connection: Connection,
+    scale: SyntheticScale,
+    *,
+    seed: int = 0,
+    today: date = EPOCH,
+    days: int = 730,
+    batch_size: int = 10_000,
+    commit_every: int = 200_000,
+    progress: Callable[[SyntheticReport], None] | None = None,
+) -> SyntheticReport:
+    """
+    Fill the migrated schema with a deterministic synthetic dataset: the same seed, scale
+    and `today` give the same ids and rows. Repairs are spread over the `days` days up to
+    `today`, with dates, collections and status consistent with their lifecycle, and
+    nothing is dated after `today`. Rows go in with Core executemany inserts of
+    `batch_size`, committing every `commit_every` repairs. On SQLite the repair and note
+    indexes and search triggers are rebuilt once at the end instead of maintained per
+    row. Ids derive from the seed, so load into an empty database or use a new seed each
+    time.
+    """
+    g = _Generator(seed, today, days)
+    report = SyntheticReport()
+    is_sqlite = connection.dialect.name == 'sqlite'
+    if is_sqlite:
+        # A crash only loses generated data, so skip the fsyncs on every commit
+        connection.exec_driver_sql("PRAGMA synchronous=OFF")
+        deferred_ddl = _drop_sqlite_indexes(connection)
+    try:
+        _generate(connection, g, scale, seed, batch_size, commit_every, report, progress)
+    except BaseException:
+        # Batches committed so far stay; rolling back may also have restored the dropped objects
+        connection.rollback()
+        raise
+    finally:
+        if is_sqlite:
+            for ddl in deferred_ddl:
+                connection.exec_driver_sql(re.sub(r"^CREATE (UNIQUE )?(INDEX|TRIGGER) ", r"CREATE \1\2 IF NOT EXISTS ", ddl))
+            rebuild_search_index(connection)
+            connection.commit()
+            # Planner statistics for the new row counts, then back to the configured durability
+            connection.exec_driver_sql("ANALYZE")
+            connection.exec_driver_sql(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    return report
+
+def _generate(
+    connection: Connection,
+    g: _Generator,
+    scale: SyntheticScale,
+    seed: int,
+    batch_size: int,
+    commit_every: int,
+    report: SyntheticReport,
+    progress: Callable[[SyntheticReport], None] | None,
+) -> None:
+    rng = g.rng
+    days = g.days
+
+    # Synthetic staff can't log in; one hash serves them all since bcrypt is deliberately slow
+    hashed_password = pwd_context.hash(secrets.token_urlsafe())
+    user_ids = [g.uuid() for _ in range(scale.users)]
+    connection.execute(insert(User.__table__), [
+        {"id": user_id, "email": f"technician{n}.seed{seed}@example.com", "full_name": f"Technician {n}",
+         "hashed_password": hashed_password, "is_active": True, "is_superuser": False}
+        for n, user_id in enumerate(user_ids)
+    ])
+    report.users = len(user_ids)
+
+    school_ids = [g.uuid() for _ in range(scale.schools)]
+    connection.execute(insert(School.__table__), [
+        {"id": school_id, "name": f"{rng.choice(TOWNS)} {rng.choice(['Primary', 'Secondary', 'Academy', 'High'])} School {n}",
+         "contact_name": f"Contact {n}", "address": f"{rng.randint(1, 200)} {rng.choice(TOWNS)} Road",
+         "created_at": g.moment(g.today - timedelta(days=days + rng.randrange(365)))}
+        for n, school_id in enumerate(school_ids)
+    ])
+    report.schools = len(school_ids)
+
+    device_ids = [g.uuid() for _ in range(scale.devices)]
+    connection.execute(insert(Device.__table__), [
+        {"id": device_id, "manufacturer": rng.choice(MANUFACTURERS), "model": f"{rng.choice(DEVICE_KINDS)} {100 + n}",
+         "created_at": g.moment(g.today - timedelta(days=days + rng.randrange(365)))}
+        for n, device_id in enumerate(device_ids)
+    ])
+    report.devices = len(device_ids)
+
+    # Half the collections bring devices in from schools, half take them back out
+    collection_ids = [g.uuid() for _ in range(scale.collections)]
+    inbound_ids, outbound_ids = collection_ids[0::2], collection_ids[1::2] or collection_ids[0::2]
+    connection.execute(insert(Collection.__table__), [
+        {"id": collection_id, "collection_number": f"COL-{seed}-{n:07d}",
+         "origin": "School" if n % 2 == 0 else "Depot", "destination": "Depot" if n % 2 == 0 else "School",
+         "created_at": g.moment(g.today - timedelta(days=rng.randrange(days)))}
+        for n, collection_id in enumerate(collection_ids)
+    ])
+    report.collections = len(collection_ids)
+
+    school_weights = list(accumulate(1 / (rank + 1) ** SCHOOL_SKEW for rank in range(len(school_ids))))
+    statuses, status_weights = list(STATUS_WEIGHTS), list(accumulate(STATUS_WEIGHTS.values()))
+
+    uncommitted = 0
+    for start in range(0, scale.repairs, batch_size):
+        count = min(batch_size, scale.repairs - start)
+        schools = rng.choices(school_ids, cum_weights=school_weights, k=count)
+        batch_statuses = rng.choices(statuses, cum_weights=status_weights, k=count)
+        repairs: list[dict[str, Any]] = []
+        notes: list[dict[str, Any]] = []
+        for n, school_id, status in zip(range(start, start + count), schools, batch_statuses):
+            raised = g.today - timedelta(days=rng.randrange(days))
+            created_at = g.moment(raised)
+            row: dict[str, Any] = {
+                "id": g.uuid(), "creator_id": rng.choice(user_ids), "school_id": school_id,
+                "device_model_id": rng.choice(device_ids), "device_serial": f"SN{seed:02d}{n:09d}",
+                "external_ticket_number": f"TCK-{n:08d}" if rng.random() < 0.6 else None,
+                "has_protective_case": rng.random() < 0.4, "status": status,
+                "created_at": created_at, "updated_at": created_at, "date_raised": raised,
+                "date_closed": None, "is_sla_breached": False,
+                "inbound_collection_id": None, "outbound_collection_id": None, "inbound_date": None, "outbound_date": None,
+            }
+            # Everything past OPEN has been collected; CLOSED repairs have also gone back out
+            if status != RepairStatus.OPEN:
+                row["inbound_collection_id"] = rng.choice(inbound_ids)
+                row["inbound_date"] = g.day(raised, 1, 7)
+            if status == RepairStatus.CLOSED:
+                row["outbound_collection_id"] = rng.choice(outbound_ids)
+                row["outbound_date"] = row["date_closed"] = g.day(row["inbound_date"], 1, 21)
+            last_touched = row["date_closed"] or row["inbound_date"] or raised
+            row["updated_at"] = max(created_at, g.moment(last_touched))
+            repairs.append(row)
+
+            note_count = min(int(rng.paretovariate(NOTES_PARETO_ALPHA)) - 1, MAX_NOTES_PER_REPAIR)
+            for k in range(note_count):
+                notes.append({
+                    "id": g.uuid(), "repair_id": row["id"], "creator_id": rng.choice(user_ids),
+                    "text": f"{rng.choice(ACTIONS)} {rng.choice(PARTS)} after {rng.choice(FAULTS)} reported",
+                    # A long thread on a recent repair would otherwise run past today
+                    "created_at": g.until_today(created_at + timedelta(hours=k * 4 + rng.randrange(4))),
+                })
+
+        connection.execute(insert(Repair.__table__), repairs)
+        if notes:
+            connection.execute(insert(Note.__table__), notes)
+        report.repairs += len(repairs)
+        report.notes += len(notes)
+        uncommitted += len(repairs)
+        if uncommitted >= commit_every:
+            connection.commit()
+            uncommitted = 0
+        if progress is not None:
+            progress(report)
+
+    connection.execute(bump_statement(School.__tablename__, Device.__tablename__, Collection.__tablename__, Repair.__tablename__, Note.__tablename__))
+    connection.commit()
@@ -0,0 +1,120 @@
+from dataclasses import dataclass, field
+import gzip
+import hashlib
+import mimetypes
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency, gzip is always available
+    brotli = None
+
+# Only worth compressing text formats; images and fonts are already compressed
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+@dataclass
+class Asset:
+    path: str
+    hashed_path: str
+    media_type: str
+    digest: str
+    # Content-Encoding -> body; "identity" is the file as-is
+    bodies: dict[str, bytes] = field(default_factory=dict)
+
+def _hashed_path(path: str, digest: str) -> str:
+    """css/site.min.css -> css/site.min.<digest>.css"""
+    stem, dot, suffix = path.rpartition(".")
+    return f"{stem}.{digest}.{suffix}" if dot else f"{path}.{digest}"
+
+def _load(root: Path, file: Path) -> Asset:
+    body = file.read_bytes()
+    path = file.relative_to(root).as_posix()
+    digest = hashlib.sha256(body).hexdigest()[:12]
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    asset = Asset(path=path, hashed_path=_hashed_path(path, digest), media_type=media_type, digest=digest)
+    asset.bodies["identity"] = body
+    if media_type.startswith(COMPRESSIBLE_TYPES):
+        # Compressed once here at maximum effort, instead of per request at a cheap level
+        asset.bodies["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            asset.bodies["br"] = brotli.compress(body, quality=settings.STATIC_BROTLI_QUALITY)
+    return asset
+
+def _preferred_encoding(accept_encoding: str, available: dict[str, bytes]) -> str:
+    """Pick the smallest acceptable encoding the asset has, honouring q=0 refusals"""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    candidates = [
+        encoding for encoding in available
+        if encoding != "identity" and accepted.get(encoding, accepted.get("*", 0.0)) > 0
+    ]
+    return min(candidates, key=lambda encoding: len(available[encoding]), default="identity")
+
+class AssetFiles:
+    """
+    Serves everything under a directory from memory, precompressed with gzip (and brotli
+    when installed) at startup and negotiated per request via Accept-Encoding.
+    Content-hashed names (see asset_url) are cached as immutable for a year; the original
+    names stay available for anything not yet using asset_url and are revalidated with ETags.
+    """
+    def __init__(self, directory: Path):
+        self.assets: dict[str, Asset] = {}
+        self.by_path: dict[str, Asset] = {}
+        for file in sorted(directory.rglob("*")):
+            if file.is_file():
+                asset = _load(directory, file)
+                self.by_path[asset.path] = asset
+                self.assets[asset.path] = asset
+                self.assets[asset.hashed_path] = asset
+
+    def url(self, path: str) -> str:
+        asset = self.by_path.get(path)
+        return f"/public/{asset.hashed_path if asset else path}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope["path"].removeprefix(scope.get("root_path", "")).lstrip("/")
+        asset = self.assets.get(path)
+        if scope["method"] not in ("GET", "HEAD") or asset is None:
+            response: Response = PlainTextResponse("Not Found", status_code=404)
+            await response(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = _preferred_encoding(request_headers.get("accept-encoding", ""), asset.bodies)
+        etag = f'"{asset.digest}-{encoding}"'
+        headers = {
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "public, max-age=31536000, immutable" if path == asset.hashed_path else "no-cache",
+        }
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        if etag in request_headers.get("if-none-match", ""):
+            response = Response(status_code=304, headers=headers)
+        elif scope["method"] == "HEAD":
+            headers["Content-Length"] = str(len(asset.bodies[encoding]))
+            response = Response(media_type=asset.media_type, headers=headers)
+        else:
+            response = Response(asset.bodies[encoding], media_type=asset.media_type, headers=headers)
+        await response(scope, receive, send)
+
+assets = AssetFiles(Path("app") / "public")
+
+def asset_url(path: str) -> str:
+    """URL of a file under app/public with its content hash in the name, for use in templates"""
+    return assets.url(path)
@@ -0,0 +1,138 @@
+import asyncio
+from bisect import bisect_left
+from dataclasses import dataclass, field
+import time
+from typing import Any, Callable, Sequence
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.models.collection import Collection, CollectionRow
+from app.models.device import Device, DeviceRow
+from app.models.school import School, SchoolRow
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.read_models import build_rows, columns_of
+from app.utils.table_versions import BUMPED_TABLES, get_table_versions
+from app.utils.user_cache import user_cache
+
+# Reference tables kept in memory as read models, with the label each is listed by in pick-lists
+CATALOG_MODELS: dict[str, tuple[Any, type, Callable[[Any], str]]] = {
+    School.__tablename__: (School, SchoolRow, lambda school: school.name),
+    Device.__tablename__: (Device, DeviceRow, lambda device: f"{device.manufacturer} {device.model}"),
+    Collection.__tablename__: (Collection, CollectionRow, lambda collection: collection.collection_number),
+}
+
+@dataclass
+class CatalogTable:
+    """All rows of one reference table as of `version`, oldest first, as read models"""
+    version: Any
+    rows: list[Any]
+    label: Callable[[Any], str]
+    keys: list[tuple[Any, uuid.UUID]] = field(init=False)
+    by_id: dict[uuid.UUID, Any] = field(init=False)
+    _options: list[tuple[uuid.UUID, str]] | None = field(default=None, init=False)
+    _by_label: dict[str, Any] | None = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        self.rows.sort(key=lambda row: (row.created_at, row.id))
+        self.keys = [(row.created_at, row.id) for row in self.rows]
+        self.by_id = {row.id: row for row in self.rows}
+
+    def page(self, cursor: str | None, limit: int) -> tuple[list[Any], str | None]:
+        """Same page and next cursor as paginate() would return, newest first, from memory"""
+        end = len(self.rows) if cursor is None else bisect_left(self.keys, decode_cursor(cursor))
+        start = max(end - limit, 0)
+        rows = self.rows[start:end][::-1]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id) if start > 0 and rows else None
+
+    def options(self) -> list[tuple[uuid.UUID, str]]:
+        """(id, label) pairs sorted by label, for <select> pick-lists"""
+        if self._options is None:
+            self._options = sorted(((row.id, self.label(row)) for row in self.rows), key=lambda option: option[1].lower())
+        return self._options
+
+    def find(self, label: str) -> Any | None:
+        """The row listed as `label`, e.g. a collection by its number"""
+        if self._by_label is None:
+            self._by_label = {self.label(row): row for row in self.rows}
+        return self._by_label.get(label)
+
+class ReferenceCatalog:
+    """
+    In-memory copies of schools, devices and collections, which are read on every overview
+    and form but rarely written. Each table is loaded on first use together with its
+    table_versions row and reloaded when that version moves on. Writes in this worker mark
+    the table stale once their transaction commits (see bump_table_versions); writes by
+    other workers are picked up by polling the versions at most every `poll_interval`.
+    """
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self.loads = 0
+        self._tables: dict[str, CatalogTable] = {}
+        self._versions: dict[str, Any] = {}
+        self._stale: set[str] = set()
+        self._checked_at = 0.0
+        self._loading: dict[str, asyncio.Lock] = {}
+
+    def mark_stale(self, tables: Sequence[str]) -> None:
+        self._stale.update(table for table in tables if table in CATALOG_MODELS)
+
+    async def get(self, session: AsyncSession, table: str, *, version: Any = None) -> CatalogTable:
+        """
+        The catalog copy of `table`. Callers caching output under a version they just read
+        pass it as `version`, and get a copy at least that new without the versions being
+        read again.
+        """
+        if version is None:
+            if table not in self._versions or table in self._stale or time.monotonic() - self._checked_at >= self.poll_interval:
+                # Cleared before reading, so a commit that lands meanwhile marks the table again
+                self._stale.difference_update(CATALOG_MODELS)
+                self._checked_at = time.monotonic()
+                names = list({*self._versions, table})
+                self._versions.update(zip(names, await get_table_versions(session, *names)))
+            version = self._versions[table]
+        entry = self._tables.get(table)
+        if entry is not None and entry.version == version:
+            return entry
+        lock = self._loading.setdefault(table, asyncio.Lock())
+        async with lock:
+            try:
+                # Another request may have reloaded it while we waited
+                entry = self._tables.get(table)
+                if entry is not None and entry.version == version:
+                    return entry
+                # Versions are read before the rows, so a copy is never older than its version;
+                # other tables seen to have moved on are reloaded when next asked for
+                model, row_type, label = CATALOG_MODELS[table]
+                # Plain column rows never enter the caller's identity map, and cost a fraction
+                # of the memory and load time of ORM entities
+                rows = build_rows(row_type, await session.exec(select(*columns_of(row_type, model))))
+                entry = self._tables[table] = CatalogTable(version, rows, label)
+                self.loads += 1
+                return entry
+            finally:
+                if self._loading.get(table) is lock:
+                    del self._loading[table]
+
+    def clear(self) -> None:
+        self._tables.clear()
+        self._versions.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"loads": self.loads, "rows": {name: len(entry.rows) for name, entry in self._tables.items()}}
+
+catalog = ReferenceCatalog(poll_interval=settings.CATALOG_POLL_INTERVAL_SECONDS)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    tables = session.info.pop(BUMPED_TABLES, ())
+    catalog.mark_stale(tables)
+    user_cache.mark_stale(tables)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(BUMPED_TABLES, None)
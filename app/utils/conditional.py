@@ -0,0 +1,29 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+from app.config import settings
+
+# Clients may keep the response but must revalidate it on every use; it is per user
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong ETag for the representation identified by `parts`, such as a row id and its
+    versions. The app version is mixed in so a deploy that changes templates or fields
+    doesn't get 304s for what older code rendered.
+    """
+    digest = hashlib.blake2b(repr((settings.APP_VERSION, *parts)).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match lists `etag` or is "*"; the comparison is weak, as RFC 9110 requires for GET"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
@@ -1,4 +1,4 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 import uuid
 
@@ -8,21 +8,29 @@ from fastapi.security import APIKeyCookie
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
-from app.database import engine
+from app.database import async_session_factory, session_factory
 from app.models.user import TokenPayload, User
+from app.utils.user_cache import user_cache
 
 apikey_cookie = APIKeyCookie(name="access_token", auto_error=False)
 token_dep = Annotated[str, Depends(apikey_cookie)]
 
 def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    with session_factory() as session:
         yield session
 
 session_dep = Annotated[Session, Depends(get_db)]
 
-def get_current_user(session: session_dep, token: token_dep, request: Request) -> User:
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session_factory() as session:
+        yield session
+
+async_session_dep = Annotated[AsyncSession, Depends(get_async_db)]
+
+async def get_current_user(session: async_session_dep, token: token_dep, request: Request) -> User:
     # If access token cookie is not present, redirect to login
     try:
         if token:
@@ -33,12 +41,19 @@ def get_current_user(session: session_dep, token: token_dep, request: Request) -
         else:
             raise NameError("Access token not found")
 
-        if not (user := session.get(User, uuid.UUID(token_data.sub))):
+        user_id = uuid.UUID(token_data.sub)
+        version = await user_cache.version(session)
+        if version is not None and (user := user_cache.get(user_id, version)):
+            return user
+
+        if not (user := await session.get(User, user_id)):
             raise NameError("User not found")
         
         if not user.is_active:
             raise ValueError("Inactive user")
 
+        if version is not None:
+            user_cache.put(user, version)
         return user
         
     except (InvalidTokenError, ValidationError, NameError, ValueError):
@@ -52,7 +67,7 @@ def get_current_user(session: session_dep, token: token_dep, request: Request) -
 
 user_dep = Annotated[User, Depends(get_current_user)]
 
-def get_current_active_superuser(current_user: user_dep) -> User:
+async def get_current_active_superuser(current_user: user_dep) -> User:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="The user doesn't have enough privileges"
@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.utils.table_versions import get_table_versions
+from app.utils.versioned_cache import VersionedLRUCache
+
+class FragmentCache(VersionedLRUCache[Hashable, str]):
+    """
+    Bounded LRU cache of rendered HTML, keyed by route and query parameters. Each entry
+    records the versions of the tables it was rendered from and is only served while
+    those versions are unchanged. Concurrent misses for the same key wait for a single
+    render instead of each running the query and template.
+    """
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize)
+        self._renders: dict[Hashable, asyncio.Lock] = {}
+
+    async def get_or_render(self, key: Hashable, version: tuple[Any, ...], render: Callable[[], Awaitable[str]]) -> str:
+        if self.maxsize <= 0:
+            return await render()
+        html = self.get(key, version)
+        if html is not None:
+            return html
+        lock = self._renders.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another request may have rendered this while we waited
+            html = self.peek(key, version)
+            if html is not None:
+                return html
+            try:
+                html = await render()
+                # Stored under the versions read before rendering, so a write that lands
+                # mid-render makes this entry stale rather than hiding the write
+                self.put(key, version, html)
+                return html
+            finally:
+                # Waiters keep their reference to the lock and find the entry once they get it
+                if self._renders.get(key) is lock:
+                    del self._renders[key]
+
+fragment_cache = FragmentCache(maxsize=settings.FRAGMENT_CACHE_SIZE)
+
+async def cached_fragment(request: Request, session: AsyncSession, tables: tuple[str, ...], render: Callable[[dict[str, Any]], Awaitable[str]]) -> HTMLResponse:
+    """
+    Serve a rendered fragment from the cache while the tables it reads from are unchanged.
+    `render` is given the versions the entry is stored under, by table, to pass on to the
+    catalog rather than have it read them again.
+    """
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    version = await get_table_versions(session, *tables)
+    return HTMLResponse(await fragment_cache.get_or_render(key, version, lambda: render(dict(zip(tables, version)))))
@@ -0,0 +1,22 @@
+from typing import Any
+
+from sqlalchemy import ColumnElement, func, literal_column
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Upper bound on how many referencing rows are counted for an error message
+REFERENCE_COUNT_CAP = 100
+
+async def has_references(session: AsyncSession, model: Any, *criteria: ColumnElement[bool]) -> bool:
+    """Return True if any `model` row matches `criteria`, using a single EXISTS probe"""
+    probe = select(literal_column("1")).select_from(model).where(*criteria).limit(1)
+    return (await session.exec(select(probe.exists()))).one()
+
+async def count_references(session: AsyncSession, model: Any, *criteria: ColumnElement[bool], cap: int = REFERENCE_COUNT_CAP) -> int:
+    """Count `model` rows matching `criteria`, stopping at `cap` so the cost stays bounded"""
+    capped = select(literal_column("1")).select_from(model).where(*criteria).limit(cap).subquery()
+    return (await session.exec(select(func.count()).select_from(capped))).one()
+
+def describe_references(count: int, cap: int = REFERENCE_COUNT_CAP) -> str:
+    """Render a capped reference count for a notification, e.g. '3' or '100+'"""
+    return f"{count}+" if count >= cap else str(count)
@@ -0,0 +1,349 @@
+import asyncio
+from bisect import bisect_left
+from dataclasses import dataclass, field
+import json
+import logging
+import os
+from pathlib import Path
+import time
+from typing import Any, Callable, Iterable
+import uuid
+
+from anyio import to_thread
+from fastapi.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.database import async_engine, engine, pool_stats
+from app.services.repair_query import count_cache
+from app.services.sla import sla_engine
+from app.utils.catalog import catalog
+from app.utils.fragment_cache import fragment_cache
+from app.utils.security import hasher_stats
+from app.utils.user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+# Request latency buckets in seconds, from cached fragments up to large exports
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[tuple[str, str], ...]
+SampleKey = tuple[str, Labels]
+
+@dataclass
+class MetricFamily:
+    """One metric as exposed, with its samples keyed by sample name and labels"""
+    name: str
+    kind: str  # counter, gauge or histogram
+    help: str
+    # How gauges from several live workers combine; counters and histograms always add up
+    merge: str = "sum"  # or "max"
+    samples: dict[SampleKey, float] = field(default_factory=dict)
+
+    def add(self, value: float, sample_name: str | None = None, **labels: str) -> "MetricFamily":
+        self.samples[(sample_name or self.name, tuple(labels.items()))] = value
+        return self
+
+class Counter:
+    """Monotonic count per label combination; only updated from the event loop, so unlocked"""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.kind, self.help)
+        for labels, value in self.values.items():
+            family.samples[(self.name, tuple(zip(self.labelnames, labels)))] = value
+        return family
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+class Histogram:
+    """Bucketed observations per label combination; buckets are made cumulative on collection"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per label combination: one count per bucket, the +Inf count, then the sum
+        self.values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.kind, self.help)
+        for labels, counts in self.values.items():
+            base = tuple(zip(self.labelnames, labels))
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                family.samples[(f"{self.name}_bucket", (*base, ("le", _format_value(bound))))] = cumulative
+            family.samples[(f"{self.name}_sum", base)] = counts[-1]
+            family.samples[(f"{self.name}_count", base)] = cumulative
+        return family
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def render(families: Iterable[MetricFamily]) -> str:
+    """Prometheus text exposition format"""
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {_escape(family.help)}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for (sample_name, labels), value in family.samples.items():
+            label_text = ",".join(f'{name}="{_escape(label)}"' for name, label in labels)
+            lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}" if labels else f"{sample_name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class MetricsRegistry:
+    """
+    In-process metrics, plus collectors that read other components' stats at scrape time.
+    With a multiprocess directory configured, every worker periodically writes its
+    snapshot to `<pid>-<uuid>.json` there and a scrape merges all of them: counters and
+    histograms are summed across every file, including those of exited workers so totals
+    never go backwards, while gauges only come from workers that are still running.
+    The uuid keeps a worker that reuses an exited worker's pid from overwriting its file.
+    """
+    def __init__(self, directory: str = ""):
+        self.directory = Path(directory) if directory else None
+        self.metrics: list[Counter | Histogram] = []
+        self.collectors: list[Callable[[], Iterable[MetricFamily]]] = []
+        self._snapshot_pid = 0
+        self._snapshot_name = ""
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        metric = Gauge(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Callable[[], Iterable[MetricFamily]]) -> Callable[[], Iterable[MetricFamily]]:
+        """Register a function returning metric families computed at scrape time; usable as a decorator"""
+        self.collectors.append(collect)
+        return collect
+
+    def collect(self) -> list[MetricFamily]:
+        families = [metric.collect() for metric in self.metrics]
+        for collect in self.collectors:
+            families.extend(collect())
+        return families
+
+    def _snapshot(self) -> list[list[Any]]:
+        return [
+            [family.name, family.kind, family.help, family.merge, [[name, labels, value] for (name, labels), value in family.samples.items()]]
+            for family in self.collect()
+        ]
+
+    def _write(self, snapshot: list[list[Any]]) -> None:
+        assert self.directory is not None
+        # Named on first write in each process, as workers forked from a preloaded app share this object
+        if self._snapshot_pid != os.getpid():
+            self._snapshot_pid = os.getpid()
+            self._snapshot_name = f"{self._snapshot_pid}-{uuid.uuid4().hex}.json"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / self._snapshot_name
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(snapshot))
+        os.replace(temporary, path)
+
+    def flush(self) -> None:
+        """Write this worker's snapshot for the other workers' scrapes to merge"""
+        if self.directory is None:
+            return
+        self._write(self._snapshot())
+
+    async def flush_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("Writing the metrics snapshot failed")
+
+    def _merge(self, snapshot: list[list[Any]]) -> str:
+        """This worker's `snapshot` written out and merged with every other worker's file"""
+        assert self.directory is not None
+        # This worker's numbers are current, the others' are at most one flush interval old
+        self._write(snapshot)
+        merged: dict[str, MetricFamily] = {}
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                snapshot = json.loads(path.read_text())
+                alive = _process_alive(int(path.stem.split("-")[0]))
+            except (OSError, ValueError):
+                continue  # replaced or removed mid-read, or not a snapshot
+            for name, kind, help, merge, samples in snapshot:
+                if kind == "gauge" and not alive:
+                    continue
+                family = merged.setdefault(name, MetricFamily(name, kind, help, merge))
+                for sample_name, labels, value in samples:
+                    key = (sample_name, tuple((label, label_value) for label, label_value in labels))
+                    if key not in family.samples:
+                        family.samples[key] = value
+                    elif merge == "max":
+                        family.samples[key] = max(family.samples[key], value)
+                    else:
+                        family.samples[key] += value
+        return render(merged.values())
+
+    async def exposition(self) -> str:
+        if self.directory is None:
+            return render(self.collect())
+        # Collectors read event loop state, such as the AnyIO thread limiter, so they run
+        # here; reading and merging every worker's file is blocking I/O and goes to a thread
+        return await run_in_threadpool(self._merge, self._snapshot())
+
+registry = MetricsRegistry(settings.METRICS_MULTIPROC_DIR)
+
+http_requests = registry.counter("http_requests_total", "HTTP requests by router prefix, method and status code", ("route", "method", "status"))
+http_request_duration = registry.histogram("http_request_duration_seconds", "HTTP request duration by router prefix and method", ("route", "method"))
+http_requests_in_progress = registry.gauge("http_requests_in_progress", "HTTP requests currently being handled, by router prefix", ("route",))
+
+@registry.collector
+def collect_database_pools() -> list[MetricFamily]:
+    checked_out = MetricFamily("db_pool_checked_out", "gauge", "Connections currently checked out of the pool")
+    size = MetricFamily("db_pool_size", "gauge", "Configured pool size")
+    overflow = MetricFamily("db_pool_overflow", "gauge", "Connections open beyond the pool size")
+    checkouts = MetricFamily("db_pool_checkouts_total", "counter", "Connection checkouts")
+    wait = MetricFamily("db_pool_checkout_wait_seconds_total", "counter", "Time spent waiting for a pooled connection")
+    wait_max = MetricFamily("db_pool_checkout_wait_seconds_max", "gauge", "Longest wait for a pooled connection", merge="max")
+    for name, sync_engine in (("async", async_engine.sync_engine), ("sync", engine)):
+        stats = pool_stats(sync_engine)
+        checked_out.add(stats["checked_out"], engine=name)
+        size.add(stats["size"], engine=name)
+        overflow.add(max(stats["overflow"], 0), engine=name)
+        checkouts.add(stats["checkouts"], engine=name)
+        wait.add(stats["wait_seconds_total"], engine=name)
+        wait_max.add(stats["wait_seconds_max"], engine=name)
+    return [checked_out, size, overflow, checkouts, wait, wait_max]
+
+@registry.collector
+def collect_threadpools() -> list[MetricFamily]:
+    # The AnyIO limiter bounds sync routes, sync dependencies and run_in_threadpool calls
+    limiter = to_thread.current_default_thread_limiter()
+    hasher = hasher_stats()
+    return [
+        MetricFamily("threadpool_busy_threads", "gauge", "AnyIO worker threads in use").add(limiter.borrowed_tokens),
+        MetricFamily("threadpool_size", "gauge", "AnyIO worker thread limit").add(limiter.total_tokens),
+        MetricFamily("threadpool_waiting_tasks", "gauge", "Tasks waiting for an AnyIO worker thread").add(limiter.statistics().tasks_waiting),
+        MetricFamily("password_hash_pending", "gauge", "Password hashes running or queued").add(hasher["pending"]),
+        MetricFamily("password_hash_queued", "gauge", "Password hashes waiting for a hashing thread").add(hasher["queued"]),
+        MetricFamily("password_hash_capacity", "gauge", "Password hashes admitted before requests get a 503").add(hasher["capacity"]),
+    ]
+
+@registry.collector
+def collect_caches() -> list[MetricFamily]:
+    hits = MetricFamily("cache_hits_total", "counter", "Cache hits")
+    misses = MetricFamily("cache_misses_total", "counter", "Cache misses")
+    size = MetricFamily("cache_entries", "gauge", "Entries currently cached")
+    for name, stats in (("user", user_cache.stats()), ("fragment", fragment_cache.stats()), ("repair_count", count_cache.stats())):
+        hits.add(stats["hits"], cache=name)
+        misses.add(stats["misses"], cache=name)
+        size.add(stats["size"], cache=name)
+    return [hits, misses, size]
+
+@registry.collector
+def collect_catalog() -> list[MetricFamily]:
+    stats = catalog.stats()
+    rows = MetricFamily("catalog_rows", "gauge", "Reference rows held in the in-memory catalog")
+    for table, count in stats["rows"].items():
+        rows.add(count, table=table)
+    return [MetricFamily("catalog_loads_total", "counter", "Reference tables (re)loaded into the catalog").add(stats["loads"]), rows]
+
+@registry.collector
+def collect_sla() -> list[MetricFamily]:
+    stats = sla_engine.stats()
+    families = [MetricFamily("sla_evaluation_runs_total", "counter", "SLA evaluation runs").add(stats["runs"])]
+    if "last_run_seconds" in stats:
+        families.append(MetricFamily("sla_evaluation_last_duration_seconds", "gauge", "Duration of the latest SLA evaluation", merge="max").add(stats["last_run_seconds"]))
+        families.append(MetricFamily("sla_evaluation_last_rows_touched", "gauge", "Repairs updated by the latest SLA evaluation", merge="max").add(stats["last_run_rows_touched"]))
+    return families
+
+# Anything else is reported as "OTHER" so odd client methods can't grow the label set
+KNOWN_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+class MetricsMiddleware:
+    """
+    Records request counts, latency and in-flight requests per router prefix (the first
+    path segment of the app's routes and mounts, e.g. /repair). Paths outside every
+    prefix are grouped as "unmatched" to keep scanners from inflating the label set.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.prefixes: frozenset[str] | None = None
+
+    def _route(self, scope: Scope) -> str:
+        if self.prefixes is None:
+            # Routers are included after the middleware is added, so look them up on first use
+            self.prefixes = frozenset("/" + route.path.split("/")[1] for route in scope["app"].routes)
+        prefix = "/" + scope["path"].split("/")[1]
+        return prefix if prefix in self.prefixes else "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route(scope)
+        method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(route)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_progress.dec(route)
+            http_request_duration.observe(time.perf_counter() - started, route, method)
+            http_requests.inc(route, method, str(status_code))
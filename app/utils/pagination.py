@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Annotated, Any, Callable, Sequence
+import uuid
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.config import settings
+
+page_size_query = Annotated[int, Query(ge=1, le=settings.MAX_PAGE_SIZE)]
+
+def encode_cursor(value: date | datetime, id: uuid.UUID) -> str:
+    """Encode the (sort value, id) keyset of the last row on a page into an opaque cursor"""
+    raw = json.dumps([value.isoformat(), id.hex], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, parse: Callable[[str], Any] = datetime.fromisoformat) -> tuple[Any, uuid.UUID]:
+    """Decode a cursor produced by encode_cursor, rejecting anything malformed with a 400"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, id = json.loads(raw)
+        if not isinstance(value, str) or not isinstance(id, str):
+            raise ValueError("Cursor elements must be strings")
+        return parse(value), uuid.UUID(hex=id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+async def paginate(
+    session: AsyncSession,
+    statement: SelectOfScalar[Any] | Select[Any],
+    model: Any,
+    *,
+    cursor: str | None,
+    limit: int,
+    sort_column: Any = None,
+    descending: bool = True,
+) -> tuple[Sequence[Any], str | None]:
+    """
+    Fetch one page of `statement` using keyset pagination on (sort_column, id), newest
+    first by default; `sort_column` defaults to created_at and must be a non-null date
+    or datetime column, and a column select must include it and `model.id` by name.
+    Returns the rows and the cursor for the next page, or None when this is the last page.
+    """
+    column = model.created_at if sort_column is None else sort_column
+    if cursor:
+        value, id = decode_cursor(cursor, column.type.python_type.fromisoformat)
+        keyset, after = tuple_(column, model.id), tuple_(value, id)
+        statement = statement.where(keyset < after if descending else keyset > after)
+
+    # Fetch one extra row to find out whether another page exists without a COUNT
+    order = (column.desc(), model.id.desc()) if descending else (column.asc(), model.id.asc())
+    rows = (await session.exec(statement.order_by(*order).limit(limit + 1))).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(getattr(rows[-1], column.key), rows[-1].id)
@@ -0,0 +1,19 @@
+from dataclasses import fields
+from typing import Any, Iterable, TypeVar
+
+Row = TypeVar("Row")
+
+def columns_of(row_type: type, model: Any, **joined: Any) -> list[Any]:
+    """
+    The columns to select into `row_type`, a slotted dataclass, in its field order: each
+    field is the `model` column of the same name unless `joined` maps it to a column of
+    another table, which is labeled with the field name.
+    """
+    return [joined[f.name].label(f.name) if f.name in joined else getattr(model, f.name) for f in fields(row_type)]
+
+def build_rows(row_type: type[Row], rows: Iterable[Any]) -> list[Row]:
+    """
+    `row_type` instances from result rows selected with columns_of(). Unlike ORM entities
+    they are not tracked by any session, so a page costs its columns and nothing more.
+    """
+    return [row_type(*row) for row in rows]
@@ -0,0 +1,109 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import json
+import logging
+import time
+from typing import Any
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RequestTiming:
+    """Database and template time accumulated while handling one request"""
+    scope: Scope = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_seconds: float = 0.0
+    render_seconds: float = 0.0
+    # Only kept when a slow-request threshold is configured
+    statements: list[tuple[float, str]] | None = None
+
+    @property
+    def route(self) -> str:
+        """Method and route template (e.g. GET /repair/{repair_id}) once routing has matched, else the raw path"""
+        route = self.scope.get("route")
+        return f"{self.scope.get('method')} {getattr(route, 'path', None) or self.scope.get('path')}"
+
+    def record_query(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.db_seconds += seconds
+        if self.statements is not None:
+            self.statements.append((seconds, statement))
+
+# Set per request by the middleware. The engine events run in SQLAlchemy's greenlets and
+# in threadpool workers, both of which see the request's context, so they can find it here.
+current_timing: ContextVar[RequestTiming | None] = ContextVar("current_timing", default=None)
+
+def record_render(seconds: float) -> None:
+    timing = current_timing.get()
+    if timing is not None:
+        timing.render_seconds += seconds
+
+def _over_threshold(timing: RequestTiming, total_ms: float) -> bool:
+    return (
+        (settings.REQUEST_LOG_QUERY_THRESHOLD > 0 and timing.queries > settings.REQUEST_LOG_QUERY_THRESHOLD)
+        or (settings.REQUEST_LOG_MS_THRESHOLD > 0 and total_ms > settings.REQUEST_LOG_MS_THRESHOLD)
+    )
+
+class RequestTimingMiddleware:
+    """
+    Counts queries, database time and template render time per request, reports them in a
+    Server-Timing header and one structured log line, and logs every statement of requests
+    over the configured query count or duration thresholds.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.keep_statements = settings.REQUEST_LOG_QUERY_THRESHOLD > 0 or settings.REQUEST_LOG_MS_THRESHOLD > 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming(scope=scope, statements=[] if self.keep_statements else None)
+        token = current_timing.set(timing)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Headers go out before a streamed body is produced, so streaming responses
+                # only report the work done up to their first chunk
+                total_ms = (time.perf_counter() - timing.started) * 1000
+                MutableHeaders(scope=message).append("Server-Timing", ", ".join((
+                    f'db;dur={timing.db_seconds * 1000:.1f};desc="{timing.queries} queries"',
+                    f"render;dur={timing.render_seconds * 1000:.1f}",
+                    f"total;dur={total_ms:.1f}",
+                )))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timing.reset(token)
+            self._log(scope, status_code, timing)
+
+    def _log(self, scope: Scope, status_code: int, timing: RequestTiming) -> None:
+        total_ms = (time.perf_counter() - timing.started) * 1000
+        entry: dict[str, Any] = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(total_ms, 2),
+            "queries": timing.queries,
+            "db_ms": round(timing.db_seconds * 1000, 2),
+            "render_ms": round(timing.render_seconds * 1000, 2),
+        }
+        if timing.statements is not None and _over_threshold(timing, total_ms):
+            entry["statements"] = [
+                {"ms": round(seconds * 1000, 2), "sql": statement} for seconds, statement in timing.statements
+            ]
+            logger.warning(json.dumps(entry))
+        else:
+            logger.info(json.dumps(entry))
@@ -1,9 +1,58 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing pool is saturated and the request should back off"""
+
+# bcrypt is deliberately slow, so it gets its own small pool instead of competing with
+# every sync route for the AnyIO threadpool. Admission control caps the work that may be
+# running or queued; anything beyond that is rejected immediately rather than piling up.
+_hasher_pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hasher_capacity = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_DEPTH
+_hasher_pending = 0
+_hasher_lock = Lock()
+
+def _release(_: Future) -> None:
+    global _hasher_pending
+    with _hasher_lock:
+        _hasher_pending -= 1
+
+def _submit(fn: Callable[..., Any], *args: Any) -> Future:
+    global _hasher_pending
+    with _hasher_lock:
+        if _hasher_pending >= _hasher_capacity:
+            raise PasswordHasherBusy()
+        _hasher_pending += 1
+    future = _hasher_pool.submit(fn, *args)
+    future.add_done_callback(_release)
+    return future
+
+def hasher_stats() -> dict[str, int]:
+    """Snapshot of the password hashing pool, for metrics"""
+    with _hasher_lock:
+        pending = _hasher_pending
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "pending": pending,
+        "queued": max(pending - settings.PASSWORD_HASH_WORKERS, 0),
+        "capacity": _hasher_capacity,
+    }
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit(pwd_context.hash, password))
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password without blocking the event loop or the AnyIO threadpool.
+    Returns (verified, new_hash); new_hash is set when the stored hash uses outdated
+    cost parameters and should be replaced.
+    """
+    return await asyncio.wrap_future(_submit(pwd_context.verify_and_update, plain_password, hashed_password))
@@ -0,0 +1,108 @@
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+import json
+import logging
+from threading import Lock
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Only these can be explained; DDL, PRAGMA and transaction control are skipped
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+
+@dataclass
+class SlowQuery:
+    recorded_at: datetime
+    route: str
+    statement: str
+    parameters: Any
+    duration_ms: float
+    plan: list[str]
+
+def redact(parameters: Any) -> Any:
+    """
+    Keep the shape of the bound parameters but not their content: numbers, booleans and
+    NULLs stay (limits, flags and enum values help when reading a plan), anything else
+    is replaced by its type, since strings may hold names, emails or search terms.
+    """
+    if isinstance(parameters, dict):
+        return {name: redact(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    if parameters is None or isinstance(parameters, (bool, int, float)):
+        return parameters
+    return f"<{type(parameters).__name__}>"
+
+def explain(connection: Any, statement: str, parameters: Any) -> list[str]:
+    """
+    Query plan for a statement that just ran, taken on the same connection and inside the
+    same transaction so it reflects the data and indexes the statement actually saw.
+    Runs through the raw DBAPI cursor, so it isn't itself counted or logged as a query.
+    """
+    if not statement.lstrip().lower().startswith(EXPLAINABLE):
+        return []
+    is_sqlite = connection.dialect.name == 'sqlite'
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(("EXPLAIN QUERY PLAN " if is_sqlite else "EXPLAIN ") + statement, parameters)
+        rows = cursor.fetchall()
+    except Exception as exc:
+        # A plan is a nice-to-have; the statement itself already succeeded
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        cursor.close()
+    if is_sqlite:
+        # (id, parent, notused, detail); indent each step under its parent
+        depth: dict[int, int] = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node_id] + detail)
+        return lines
+    return [row[0] for row in rows]
+
+class SlowQueryLog:
+    """
+    The most recent slow statements of this worker, with their query plans, in a bounded
+    ring buffer for the admin page, optionally also appended to a file as JSON lines.
+    """
+    def __init__(self, maxsize: int, path: str = ""):
+        self._entries: deque[SlowQuery] = deque(maxlen=maxsize)
+        self._lock = Lock()
+        self._file_logger: logging.Logger | None = None
+        if path:
+            self._file_logger = logging.getLogger(f"{__name__}.file")
+            self._file_logger.propagate = False
+            self._file_logger.setLevel(logging.INFO)
+            self._file_logger.addHandler(logging.FileHandler(path, encoding="utf-8"))
+
+    def record(self, connection: Any, route: str, statement: str, parameters: Any, executemany: bool, seconds: float) -> None:
+        # An executemany is explained with its first parameter set, which has the same plan
+        plan_parameters = parameters[0] if executemany and parameters else parameters
+        entry = SlowQuery(
+            recorded_at=datetime.now(),
+            route=route,
+            statement=statement,
+            parameters=redact(parameters),
+            duration_ms=round(seconds * 1000, 2),
+            plan=explain(connection, statement, plan_parameters),
+        )
+        with self._lock:
+            self._entries.append(entry)
+        logger.warning("Slow query (%.1f ms) in %s", entry.duration_ms, route)
+        if self._file_logger is not None:
+            self._file_logger.info(json.dumps(asdict(entry), default=str))
+
+    def entries(self) -> list[SlowQuery]:
+        """Newest first"""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+slow_query_log = SlowQueryLog(maxsize=settings.SLOW_QUERY_LOG_SIZE, path=settings.SLOW_QUERY_LOG_FILE)
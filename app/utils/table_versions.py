@@ -0,0 +1,30 @@
+from typing import Any
+
+from sqlalchemy import Update, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.table_version import TableVersion
+
+# session.info key of the tables bumped in the current transaction, for in-process caches
+# that are invalidated once it commits (see app/utils/catalog.py)
+BUMPED_TABLES = "bumped_tables"
+
+def bump_statement(*tables: str) -> Update:
+    """UPDATE that bumps the version of each table; run it in the same transaction as the write"""
+    return (
+        update(TableVersion)
+        .where(TableVersion.table_name.in_(tables))  # type: ignore[attr-defined]
+        .values(version=TableVersion.version + 1)
+    )
+
+async def bump_table_versions(session: AsyncSession, *tables: str) -> None:
+    await session.exec(bump_statement(*tables))  # type: ignore[call-overload]
+    session.info.setdefault(BUMPED_TABLES, set()).update(tables)
+
+async def get_table_versions(session: AsyncSession, *tables: str) -> tuple[Any, ...]:
+    """Current versions of `tables`, in the order given, as a cache validator"""
+    rows = dict((await session.exec(
+        select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables))  # type: ignore[attr-defined]
+    )).all())
+    return tuple(rows.get(table, 0) for table in tables)
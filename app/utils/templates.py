@@ -0,0 +1,23 @@
+from pathlib import Path
+import time
+from typing import Any
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Template
+
+from app.utils.assets import asset_url
+from app.utils.request_timing import record_render
+
+class TimedTemplate(Template):
+    """Reports render time to the current request's Server-Timing; includes render within the parent"""
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        start = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            record_render(time.perf_counter() - start)
+
+# Shared by every route module so template globals only need registering once
+templates = Jinja2Templates(directory=Path("app") / "templates")
+templates.env.template_class = TimedTemplate
+templates.env.globals["asset_url"] = asset_url
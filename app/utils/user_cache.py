@@ -0,0 +1,55 @@
+import time
+from typing import TYPE_CHECKING, Any, Sequence
+import uuid
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.utils.table_versions import get_table_versions
+from app.utils.versioned_cache import VersionedLRUCache
+
+if TYPE_CHECKING:
+    from app.models.user import User
+
+class UserCache(VersionedLRUCache[uuid.UUID, "User"]):
+    """
+    Bounded LRU cache of active users, used by get_current_user to skip loading the user
+    on every authenticated request. Entries are stored at the users table version, which
+    every user write bumps. As with the reference catalog, user writes in this worker mark
+    the version stale once they commit, and writes by other workers are picked up by
+    polling it at most every `poll_interval`, so a deactivation reaches every worker
+    within that time.
+    Each get returns its own detached copy, so requests never share a User instance.
+    """
+    def __init__(self, maxsize: int, poll_interval: float):
+        super().__init__(maxsize)
+        self.poll_interval = poll_interval
+        self._version: Any = None
+        self._stale = False
+        self._checked_at = 0.0
+
+    def mark_stale(self, tables: Sequence[str]) -> None:
+        if "users" in tables:
+            self._stale = True
+
+    async def version(self, session: AsyncSession) -> Any:
+        """The users table version to look users up at, or None when the cache is disabled"""
+        if self.maxsize <= 0:
+            return None
+        if self._version is None or self._stale or time.monotonic() - self._checked_at >= self.poll_interval:
+            # Cleared before reading, so a write that commits meanwhile marks it again
+            self._stale = False
+            self._checked_at = time.monotonic()
+            self._version = (await get_table_versions(session, "users"))[0]
+        return self._version
+
+    def get(self, user_id: uuid.UUID, version: Any) -> "User | None":
+        user = super().get(user_id, version)
+        return type(user).model_validate(user) if user is not None else None
+
+    def put(self, user: "User", version: Any) -> None:  # type: ignore[override]
+        if self.maxsize <= 0 or not user.is_active:
+            return
+        super().put(user.id, version, type(user).model_validate(user))
+
+user_cache = UserCache(maxsize=settings.USER_CACHE_SIZE, poll_interval=settings.USER_CACHE_POLL_INTERVAL_SECONDS)
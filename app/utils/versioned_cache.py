@@ -0,0 +1,64 @@
+from collections import OrderedDict
+import operator
+from threading import Lock
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class VersionedLRUCache(Generic[K, V]):
+    """
+    Bounded LRU map whose entries record the version they were stored at. An entry is only
+    served while `is_current(stored_version, version)` holds for the version asked for, by
+    default while the two are equal; anything else is dropped and counted as a miss.
+    Versions are typically table versions, or an expiry time compared against the clock.
+    """
+    def __init__(self, maxsize: int, is_current: Callable[[Any, Any], bool] = operator.eq):
+        self.maxsize = maxsize
+        self.is_current = is_current
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, tuple[Any, V]] = OrderedDict()
+        self._lock = Lock()
+
+    def peek(self, key: K, version: Any) -> V | None:
+        """The current entry for `key`, without counting a hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not self.is_current(entry[0], version):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def get(self, key: K, version: Any) -> V | None:
+        value = self.peek(key, version)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key: K, version: Any, value: V) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
@@ -0,0 +1,44 @@
+from typing import Any
+import uuid
+
+from sqlalchemy import delete, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+async def update_by_id(session: AsyncSession, model: Any, id: uuid.UUID, values: dict[str, Any]) -> bool:
+    """
+    Apply `values` to the `model` row with primary key `id` without loading it, for handlers
+    that don't send the row back. Returns False when there is no such row.
+    """
+    if not values:
+        return await session.get(model, id) is not None
+    statement = update(model).where(model.id == id).values(**values).execution_options(synchronize_session=False)
+    return (await session.exec(statement)).rowcount == 1  # type: ignore[call-overload]
+
+async def update_returning(session: AsyncSession, model: Any, id: uuid.UUID, values: dict[str, Any]) -> Any | None:
+    """
+    Apply `values` to the `model` row with primary key `id` and return the updated row, or
+    None when there is no such row: one UPDATE ... RETURNING where the dialect supports it,
+    else a SELECT and an UPDATE.
+    """
+    if values and session.bind.dialect.update_returning:
+        statement = update(model).where(model.id == id).values(**values).returning(model)
+        return (await session.exec(statement)).scalars().one_or_none()  # type: ignore[call-overload]
+    db_obj = await session.get(model, id)
+    if db_obj is not None and values:
+        db_obj.sqlmodel_update(values)
+        session.add(db_obj)
+    return db_obj
+
+async def delete_returning(session: AsyncSession, model: Any, id: uuid.UUID) -> Any | None:
+    """
+    Delete the `model` row with primary key `id` and return it, or None when there is no
+    such row: one DELETE ... RETURNING where the dialect supports it, else a SELECT and a
+    DELETE.
+    """
+    if session.bind.dialect.delete_returning:
+        statement = delete(model).where(model.id == id).returning(model)
+        return (await session.exec(statement)).scalars().one_or_none()  # type: ignore[call-overload]
+    db_obj = await session.get(model, id)
+    if db_obj is not None:
+        await session.delete(db_obj)
+    return db_obj
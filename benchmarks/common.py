@@ -0,0 +1,79 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Settings are read when `app.config` is first imported, so every script calls
+`use_database()` before importing anything from `app`.
+"""
+import os
+from pathlib import Path
+import statistics
+import tempfile
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def use_database(path: str | None = None) -> str:
+    """Point the app at a scratch SQLite database (fresh unless a path is given) and migrate it"""
+    if path is None:
+        path = str(Path(tempfile.mkdtemp(prefix="repair-bench-")) / "bench.db")
+    os.environ["DB_SCHEME"] = "sqlite"
+    os.environ["DB_NAME"] = path
+    os.environ.setdefault("SECURE_COOKIES", "False")
+    os.chdir(ROOT)
+
+    from alembic import command
+    from alembic.config import Config
+    command.upgrade(Config(str(ROOT / "alembic.ini")), "head")
+    return path
+
+def create_login(email: str = "bench@example.com", password: str = "benchmark-password") -> str:
+    """Create a user directly in the database and return an access token cookie value for it"""
+    import asyncio
+    from datetime import timedelta
+    from app.database import async_session_factory
+    from app.models.user import UserCreate, create_user, get_user_by_email
+    from app.routes.auth import create_access_token
+
+    async def get_or_create():
+        async with async_session_factory() as session:
+            user = await get_user_by_email(session=session, email=email)
+            if not user:
+                user = await create_user(session=session, user_create=UserCreate(email=email, password=password, full_name="Bench"))
+            return user.id
+
+    user_id = asyncio.run(get_or_create())
+    # The engine's pooled connections belong to the loop that just closed
+    asyncio.run(dispose_engines())
+    return create_access_token(user_id, timedelta(hours=1))
+
+async def dispose_engines() -> None:
+    """Close pooled connections; aiosqlite keeps a thread per open connection alive"""
+    from app.database import async_engine
+    await async_engine.dispose()
+
+def client(token: str | None = None):
+    """An httpx client that drives the ASGI app in-process"""
+    import httpx
+    from app.main import app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://bench",
+        cookies={"access_token": token} if token else None,
+    )
+
+def percentile(samples: list[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[min(max(int(p), 1), 99) - 1]
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Latency summary in milliseconds for a list of durations in seconds"""
+    ms = [s * 1000 for s in samples]
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+    }
@@ -0,0 +1,116 @@
+"""
+Streams the repair export through the app and reports rows/sec and memory use.
+
+    python -m benchmarks.export_repairs --rows 1000000 --format csv
+
+Rows are seeded in batches so seeding itself doesn't set the memory high-water mark.
+The app is driven over raw ASGI (httpx's ASGI transport buffers the whole body) and
+anonymous RSS is sampled after every chunk; SQLite's mmap'd file pages are left out
+since they are page cache, not heap. With a streaming export the peak stays flat as
+--rows grows.
+"""
+import argparse
+import asyncio
+from datetime import date, timedelta
+import json
+import resource
+import time
+import uuid
+
+from benchmarks.common import create_login, dispose_engines, use_database
+
+SEED_BATCH = 50_000
+
+def seed(rows: int) -> None:
+    from sqlmodel import Session, insert
+    from app.database import engine
+    from app.models import Collection, Device, Repair, School, User
+
+    with Session(engine) as session:
+        creator_id = session.exec(User.__table__.select()).first().id
+        school_id, device_id, collection_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        session.exec(insert(School).values(id=school_id, name="Bench School", contact_name="Bench", address="1 Bench Road"))
+        session.exec(insert(Device).values(id=device_id, manufacturer="Bench", model="Bench 11"))
+        session.exec(insert(Collection).values(id=collection_id, collection_number="C-1", origin="Bench", destination="Depot"))
+        for offset in range(0, rows, SEED_BATCH):
+            session.exec(insert(Repair), params=[
+                {"id": uuid.uuid4(), "creator_id": creator_id, "school_id": school_id, "device_model_id": device_id,
+                 "device_serial": f"SER{i:07d}", "external_ticket_number": f"T{i}", "has_protective_case": i % 2 == 0,
+                 "date_raised": date.today() - timedelta(days=i % 365), "inbound_collection_id": collection_id}
+                for i in range(offset, min(offset + SEED_BATCH, rows))
+            ])
+            session.commit()
+
+def rss_mb() -> float:
+    """Current anonymous resident memory, falling back to the peak RSS where /proc isn't available"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def main(args: argparse.Namespace, token: str) -> None:
+    from app.main import app
+
+    rss_before = rss_mb()
+    peak = rss_before
+    size = lines = 0
+    status = 0
+
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client never disconnects; Starlette cancels this wait once the response is sent
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal peak, size, lines, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            lines += chunk.count(b"\n")
+            peak = max(peak, rss_mb())
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/repair/export", "raw_path": b"/repair/export", "root_path": "",
+        "query_string": f"format={args.format}".encode(),
+        "headers": [(b"host", b"bench"), (b"cookie", f"access_token={token}".encode())],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    if status != 200:
+        raise SystemExit(f"export failed with status {status}")
+    rows = lines - 1 if args.format == "csv" else lines
+    print(json.dumps({
+        "rows": rows,
+        "format": args.format,
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(rows / elapsed),
+        "megabytes": round(size / 2**20, 1),
+        "rss_before_mb": round(rss_before, 1),
+        "rss_peak_mb": round(peak, 1),
+        "rss_growth_mb": round(peak - rss_before, 1),
+    }, indent=2))
+    await dispose_engines()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args()
+    use_database()
+    token = create_login()
+    seed(args.rows)
+    asyncio.run(main(args, token))
@@ -0,0 +1,67 @@
+"""
+Uploads a generated CSV to the bulk repair import and reports rows/sec.
+
+    python -m benchmarks.import_repairs --rows 100000 --batch-size 5000
+
+Half the rows reference the school and device by id, half by name, and one row in
+every --invalid-every is broken so the error path is exercised too.
+"""
+import argparse
+import asyncio
+from datetime import date, timedelta
+import io
+import json
+import time
+import uuid
+
+from benchmarks.common import client, create_login, dispose_engines, use_database
+
+def seed_references() -> tuple[uuid.UUID, uuid.UUID]:
+    from sqlmodel import Session, insert
+    from app.database import engine
+    from app.models import Device, School
+
+    school_id, device_id = uuid.uuid4(), uuid.uuid4()
+    with Session(engine) as session:
+        session.exec(insert(School).values(id=school_id, name="Bench School", contact_name="Bench", address="Bench"))
+        session.exec(insert(Device).values(id=device_id, manufacturer="Bench", model="Bench 11"))
+        session.commit()
+    return school_id, device_id
+
+def build_csv(rows: int, invalid_every: int, school_id: uuid.UUID, device_id: uuid.UUID) -> bytes:
+    out = io.StringIO()
+    out.write("school_id,school_name,device_model_id,device_model,device_serial,has_protective_case,date_raised,status,external_ticket_number\n")
+    for i in range(rows):
+        raised = "not-a-date" if invalid_every and i % invalid_every == 0 else (date.today() - timedelta(days=i % 365)).isoformat()
+        if i % 2:
+            out.write(f"{school_id},,{device_id},,SER{i:07d},true,{raised},OPEN,T{i}\n")
+        else:
+            out.write(f",Bench School,,Bench 11,SER{i:07d},false,{raised},,\n")
+    return out.getvalue().encode()
+
+async def main(args: argparse.Namespace, token: str, payload: bytes) -> None:
+    async with client(token) as http:
+        start = time.perf_counter()
+        response = await http.post("/repair/import", files={"file": ("repairs.csv", payload, "text/csv")}, timeout=None)
+        elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    print(json.dumps({
+        "rows": args.rows,
+        "batch_size": args.batch_size,
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(args.rows / elapsed),
+    }, indent=2))
+    await dispose_engines()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--invalid-every", type=int, default=1_000)
+    args = parser.parse_args()
+    import os
+    os.environ["IMPORT_BATCH_SIZE"] = str(args.batch_size)
+    use_database()
+    token = create_login()
+    payload = build_csv(args.rows, args.invalid_every, *seed_references())
+    asyncio.run(main(args, token, payload))
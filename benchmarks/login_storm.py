@@ -0,0 +1,67 @@
+"""
+Login storm benchmark: latency of a non-auth route with and without a burst of logins.
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 50
+
+bcrypt runs in a dedicated pool, so p99 of the probed route should stay roughly flat
+while the storm is running; logins beyond the pool's admission limit get a fast 503.
+"""
+import argparse
+import asyncio
+from collections import Counter
+import json
+import time
+
+from benchmarks.common import client, create_login, dispose_engines, summarize, use_database
+
+async def probe(http, path: str, duration: float) -> list[float]:
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await http.get(path)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+async def storm(http, logins: int, concurrency: int, password: str) -> Counter:
+    statuses: Counter = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            response = await http.post("/auth/login", data={"username": "bench@example.com", "password": password})
+            statuses[response.status_code] += 1
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return statuses
+
+async def main(args: argparse.Namespace, token: str, password: str) -> None:
+    async with client(token) as http:
+        baseline = await probe(http, args.path, args.duration)
+
+        storm_task = asyncio.create_task(storm(http, args.logins, args.concurrency, password))
+        started = time.perf_counter()
+        during = await probe(http, args.path, args.duration)
+        statuses = await storm_task
+        storm_seconds = time.perf_counter() - started
+
+    print(json.dumps({
+        "path": args.path,
+        "baseline": summarize(baseline),
+        "during_storm": summarize(during),
+        "login_statuses": dict(statuses),
+        "storm_seconds": round(storm_seconds, 2),
+    }, indent=2))
+    await dispose_engines()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to probe in each phase")
+    parser.add_argument("--path", default="/school/overview")
+    args = parser.parse_args()
+    use_database()
+    password = "benchmark-password"
+    asyncio.run(main(args, create_login(password=password), password))
@@ -0,0 +1,132 @@
+"""
+Memory and latency of a list page loaded as ORM entities versus column-projected read models.
+
+    python -m benchmarks.read_models --rows 10000 --repeat 5
+
+For repairs (with their school and device model), notes and schools, one page of --rows
+rows is fetched both ways, as the overviews and list_notes did before and do now. Latency
+is the median over --repeat runs without tracing; memory is measured in a separate traced
+run as the peak while loading and what the page still holds once loaded, with its session
+(and so its identity map) still open.
+"""
+import argparse
+import asyncio
+from datetime import date, timedelta
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+import uuid
+
+from benchmarks.common import dispose_engines, use_database
+
+def seed(rows: int) -> None:
+    """`rows` schools, repairs and notes, so each kind has a full page to fetch"""
+    from sqlmodel import Session, insert
+    from app.database import engine
+    from app.models import Device, Note, Repair, School, User
+
+    with Session(engine) as session:
+        creator_id = uuid.uuid4()
+        session.exec(insert(User).values(id=creator_id, email="bench@example.com", full_name="Bench", hashed_password="x"))
+        school_ids = [uuid.uuid4() for _ in range(rows)]
+        session.exec(insert(School), params=[
+            {"id": school_id, "name": f"School {i}", "contact_name": f"Contact {i}", "address": f"{i} Bench Road"}
+            for i, school_id in enumerate(school_ids)
+        ])
+        device_ids = [uuid.uuid4() for _ in range(10)]
+        session.exec(insert(Device), params=[
+            {"id": device_id, "manufacturer": "Bench", "model": f"Model {i}"} for i, device_id in enumerate(device_ids)
+        ])
+        repair_ids = [uuid.uuid4() for _ in range(rows)]
+        session.exec(insert(Repair), params=[
+            {"id": repair_id, "creator_id": creator_id, "school_id": school_ids[i], "device_model_id": device_ids[i % 10],
+             "device_serial": f"SER{i:07d}", "external_ticket_number": f"T{i}", "has_protective_case": i % 2 == 0,
+             "date_raised": date.today() - timedelta(days=i % 365)}
+            for i, repair_id in enumerate(repair_ids)
+        ])
+        session.exec(insert(Note), params=[
+            {"id": uuid.uuid4(), "repair_id": repair_id, "creator_id": creator_id, "text": f"Screen cracked, replacement ordered {i}"}
+            for i, repair_id in enumerate(repair_ids)
+        ])
+        session.commit()
+
+def loaders(limit: int) -> dict[str, dict[str, object]]:
+    """Per kind, coroutine functions fetching one page as entities ("orm") and as read models ("rows")"""
+    from sqlalchemy.orm import selectinload
+    from sqlmodel import select
+    from app.models.note import Note, NoteRow
+    from app.models.repair import Repair, RepairRow
+    from app.models.school import School, SchoolRow
+    from app.services.repair_query import select_repair_rows
+    from app.utils.pagination import paginate
+    from app.utils.read_models import build_rows, columns_of
+
+    def page(statement, model, row_type=None):
+        async def load(session):
+            rows, _ = await paginate(session, statement, model, cursor=None, limit=limit)
+            return rows if row_type is None else build_rows(row_type, rows)
+        return load
+
+    return {
+        "repairs": {
+            "orm": page(select(Repair).options(selectinload(Repair.school), selectinload(Repair.device_model)), Repair),
+            "rows": page(select_repair_rows(), Repair, RepairRow),
+        },
+        "notes": {
+            "orm": page(select(Note), Note),
+            "rows": page(select(*columns_of(NoteRow, Note)), Note, NoteRow),
+        },
+        "schools": {
+            "orm": page(select(School), School),
+            "rows": page(select(*columns_of(SchoolRow, School)), School, SchoolRow),
+        },
+    }
+
+async def measure(load, repeat: int) -> dict[str, float]:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from app.database import async_engine
+
+    samples = []
+    for _ in range(repeat + 1):
+        async with AsyncSession(async_engine) as session:
+            start = time.perf_counter()
+            await load(session)
+            samples.append(time.perf_counter() - start)
+    # The first run warms the connection and statement caches
+    samples = samples[1:]
+
+    gc.collect()
+    tracemalloc.start()
+    async with AsyncSession(async_engine) as session:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        rows = await load(session)
+        gc.collect()
+        held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rows": len(rows),
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "peak_kib": round((peak - before) / 1024),
+        "held_kib": round((held - before) / 1024),
+    }
+
+async def main(args: argparse.Namespace) -> None:
+    results = {}
+    try:
+        for kind, ways in loaders(args.rows).items():
+            results[kind] = {way: await measure(load, args.repeat) for way, load in ways.items()}
+    finally:
+        await dispose_engines()
+    print(json.dumps({"page_rows": args.rows, **results}, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    use_database()
+    seed(args.rows)
+    asyncio.run(main(args))
@@ -0,0 +1,303 @@
+"""
+Benchmark suite: drives every route in app/routes through the in-process ASGI app with
+an authenticated cookie against a database seeded at a chosen scale, and compares the
+results with a stored baseline.
+
+    python -m benchmarks.suite --scale 1k
+    python -m benchmarks.suite --scale 100k --requests 200 --concurrency 20
+    python -m benchmarks.suite --scale 1k --update-baseline
+
+For each route it reports p50/p95/p99 latency, SQL statements per request, throughput and
+failed responses as JSON, as medians over --repeat runs. With a baseline in benchmarks/baselines/<scale>.json it exits
+non-zero when a route regresses: more queries per request, more failed responses, or a
+p95 or throughput worse than the baseline by more than --tolerance. Baselines are only
+comparable on the machine that recorded them, so record one before changing anything.
+
+Seeding 1m takes a while; pass --database to keep the seeded file and reuse it.
+"""
+import argparse
+import asyncio
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable
+import uuid
+
+from benchmarks.common import ROOT, client, create_login, dispose_engines, summarize, use_database
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+BASELINES = ROOT / "benchmarks" / "baselines"
+
+# Latency regressions smaller than this are noise at any tolerance
+MIN_P95_REGRESSION_MS = 2.0
+
+def seed(repairs: int, seed: int = 0) -> None:
+    """The synthetic dataset from `python -m app.cli seed`, unless the database already has repairs"""
+    from app.database import engine
+    from app.models import Repair
+    from app.services.synthetic import SyntheticScale, generate
+
+    with engine.connect() as connection:
+        if connection.execute(Repair.__table__.select().limit(1)).first() is None:
+            generate(connection, SyntheticScale.for_repairs(repairs), seed=seed)
+
+@dataclass
+class Fixtures:
+    """Ids the scenarios address, plus throwaway rows for the delete routes"""
+    repair_ids: list[str]
+    school_ids: list[str]
+    device_ids: list[str]
+    collection_ids: list[str]
+    note_ids: list[str]
+    cursor: str
+    spare: dict[str, list[str]]
+
+def prepare_fixtures(spares: int, token: str) -> Fixtures:
+    from sqlmodel import Session, insert, select, update
+    from app.database import engine
+    from app.models import Collection, Device, Note, Repair, School, User
+    from app.utils.pagination import encode_cursor
+
+    with Session(engine) as session:
+        # The admin page is superuser only
+        session.exec(update(User).where(User.email == "bench@example.com").values(is_superuser=True))
+        creator_id = session.exec(select(User.id).where(User.email == "bench@example.com")).one()
+        repairs = session.exec(select(Repair.id, Repair.created_at).order_by(Repair.created_at.desc(), Repair.id.desc()).limit(200)).all()
+        fixtures = Fixtures(
+            repair_ids=[str(r.id) for r in repairs],
+            school_ids=[str(i) for i in session.exec(select(School.id).limit(200))],
+            device_ids=[str(i) for i in session.exec(select(Device.id).limit(200))],
+            collection_ids=[str(i) for i in session.exec(select(Collection.id).limit(200))],
+            note_ids=[str(i) for i in session.exec(select(Note.id).limit(200))],
+            cursor=encode_cursor(repairs[-1].created_at, repairs[-1].id),
+            spare={},
+        )
+        spare_ids = {table: [uuid.uuid4() for _ in range(spares)] for table in ("schools", "devices", "collections", "notes")}
+        session.exec(insert(School), params=[{"id": i, "name": "Spare", "contact_name": "Spare", "address": "Spare"} for i in spare_ids["schools"]])
+        session.exec(insert(Device), params=[{"id": i, "manufacturer": "Spare", "model": "Spare"} for i in spare_ids["devices"]])
+        session.exec(insert(Collection), params=[{"id": i, "collection_number": "SPARE", "origin": "Spare", "destination": "Spare"} for i in spare_ids["collections"]])
+        session.exec(insert(Note), params=[{"id": i, "repair_id": uuid.UUID(fixtures.repair_ids[0]), "creator_id": creator_id, "text": "spare"} for i in spare_ids["notes"]])
+        session.commit()
+        fixtures.spare = {table: [str(i) for i in ids] for table, ids in spare_ids.items()}
+    return fixtures
+
+@dataclass
+class Scenario:
+    route: str  # "<METHOD> <path template>", as registered on the app
+    request: Callable[[int], tuple[str, dict[str, Any]]]  # request number -> url, httpx arguments
+    authenticated: bool = True
+    max_requests: int | None = None  # for routes that only measure bcrypt, whatever the count
+
+def scenarios(f: Fixtures) -> list[Scenario]:
+    def pick(ids: list[str], i: int) -> str:
+        return ids[i % len(ids)]
+
+    def import_file(i: int) -> dict[str, Any]:
+        rows = "".join(f"{pick(f.school_ids, i + n)},,{pick(f.device_ids, i + n)},,IMP{i:05d}{n:03d},true,2025-01-01,OPEN,\n" for n in range(100))
+        return {"files": {"file": ("repairs.csv", "school_id,school_name,device_model_id,device_model,device_serial,has_protective_case,date_raised,status,external_ticket_number\n" + rows, "text/csv")}}
+
+    return [
+        Scenario("GET /auth/login", lambda i: ("/auth/login", {}), authenticated=False),
+        Scenario("POST /auth/login", lambda i: ("/auth/login", {"data": {"username": "bench@example.com", "password": "benchmark-password"}}), authenticated=False, max_requests=20),
+        Scenario("GET /auth/register", lambda i: ("/auth/register", {}), authenticated=False),
+        Scenario("POST /auth/register", lambda i: ("/auth/register", {"json": {"email": f"new-{uuid.uuid4().hex[:12]}@example.com", "full_name": "New", "password": "benchmark-password"}}), authenticated=False, max_requests=20),
+        Scenario("POST /auth/logout", lambda i: ("/auth/logout", {}), authenticated=False),
+        Scenario("GET /metrics", lambda i: ("/metrics", {}), authenticated=False),
+        Scenario("GET /admin/slow-queries", lambda i: ("/admin/slow-queries", {})),
+        Scenario("DELETE /admin/slow-queries", lambda i: ("/admin/slow-queries", {})),
+        Scenario("GET /repair/", lambda i: (("/repair/", "/repair/?status=1&sort=-updated_at", f"/repair/?school_id={pick(f.school_ids, i)}",
+                                             f"/repair/?device_model_id={pick(f.device_ids, i)}&is_sla_breached=false", "/repair/?date_raised_from=2025-01-01&sort=date_raised")[i % 5], {})),
+        Scenario("GET /repair/overview", lambda i: ("/repair/overview", {})),
+        Scenario("GET /repair/overview/rows", lambda i: (f"/repair/overview/rows?cursor={f.cursor}", {})),
+        Scenario("GET /repair/search", lambda i: (f"/repair/search?q={('cracked', 'SN0000', 'battery')[i % 3]}", {})),
+        Scenario("GET /repair/new", lambda i: ("/repair/new", {})),
+        Scenario("GET /repair/import", lambda i: ("/repair/import", {})),
+        Scenario("GET /repair/{repair_id}/edit", lambda i: (f"/repair/{pick(f.repair_ids, i)}/edit", {})),
+        Scenario("POST /repair/", lambda i: ("/repair/", {"data": {"school_id": pick(f.school_ids, i), "device_model_id": pick(f.device_ids, i), "device_serial": f"NEW{i:06d}", "has_protective_case": "true", "date_raised": "2025-01-01"}})),
+        Scenario("POST /repair/import", lambda i: ("/repair/import", import_file(i))),
+        Scenario("GET /repair/export", lambda i: (f"/repair/export?format={('csv', 'ndjson')[i % 2]}&school_id={pick(f.school_ids, i)}", {})),
+        Scenario("GET /repair/{repair_id}", lambda i: (f"/repair/{pick(f.repair_ids, i)}", {})),
+        Scenario("PATCH /repair/bulk", lambda i: ("/repair/bulk", {"json": {"ids": f.repair_ids[i % 100:i % 100 + 50], "update": {"status": 2}}})),
+        Scenario("PATCH /repair/{repair_id}", lambda i: (f"/repair/{pick(f.repair_ids, i)}", {"json": {"external_ticket_number": f"PATCH{i}"}})),
+        Scenario("GET /school/overview", lambda i: ("/school/overview", {})),
+        Scenario("GET /school/overview/rows", lambda i: (f"/school/overview/rows?cursor={f.cursor}", {})),
+        Scenario("GET /school/new", lambda i: ("/school/new", {})),
+        Scenario("GET /school/{school_id}/edit", lambda i: (f"/school/{pick(f.school_ids, i)}/edit", {})),
+        Scenario("POST /school/", lambda i: ("/school/", {"data": {"name": f"Bench {i}", "contact_name": "Bench", "address": "Bench"}})),
+        Scenario("PATCH /school/{school_id}", lambda i: (f"/school/{pick(f.school_ids, i)}", {"data": {"contact_name": f"Contact {i}"}})),
+        Scenario("DELETE /school/{school_id}", lambda i: (f"/school/{f.spare['schools'][i]}", {})),
+        Scenario("GET /device/overview", lambda i: ("/device/overview", {})),
+        Scenario("GET /device/overview/rows", lambda i: (f"/device/overview/rows?cursor={f.cursor}", {})),
+        Scenario("POST /device/", lambda i: ("/device/", {"data": {"manufacturer": "Bench", "model": f"Model {i}"}})),
+        Scenario("DELETE /device/{device_id}", lambda i: (f"/device/{f.spare['devices'][i]}", {})),
+        Scenario("GET /collection/overview", lambda i: ("/collection/overview", {})),
+        Scenario("GET /collection/overview/rows", lambda i: (f"/collection/overview/rows?cursor={f.cursor}", {})),
+        Scenario("POST /collection/", lambda i: ("/collection/", {"data": {"collection_number": f"BENCH-{i}", "origin": "Bench", "destination": "Bench"}})),
+        Scenario("DELETE /collection/{collection_id}", lambda i: (f"/collection/{f.spare['collections'][i]}", {})),
+        Scenario("POST /note/", lambda i: ("/note/", {"json": {"repair_id": pick(f.repair_ids, i), "text": f"Bench note {i}"}})),
+        Scenario("GET /note/", lambda i: ("/note/", {})),
+        Scenario("GET /note/{note_id}", lambda i: (f"/note/{pick(f.note_ids, i)}", {})),
+        Scenario("PATCH /note/{note_id}", lambda i: (f"/note/{pick(f.note_ids, i)}", {"json": {"text": f"Edited {i}"}})),
+        Scenario("DELETE /note/{note_id}", lambda i: (f"/note/{f.spare['notes'][i]}", {})),
+    ]
+
+def registered_routes() -> set[str]:
+    from fastapi.routing import APIRoute
+    from app.main import app
+
+    return {
+        f"{method} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.endpoint.__module__.startswith("app.routes.")
+        for method in route.methods
+    }
+
+async def run_scenario(scenario: Scenario, token: str, requests: int, warmup: int, concurrency: int, offset: int = 0) -> dict[str, Any]:
+    from sqlalchemy import event
+    from app.database import async_engine, engine
+
+    method, _ = scenario.route.split(" ", 1)
+    statements = 0
+
+    def count(*args: Any) -> None:
+        nonlocal statements
+        statements += 1
+
+    async def send(http, i: int) -> tuple[float, int]:
+        url, kwargs = scenario.request(i)
+        start = time.perf_counter()
+        try:
+            status_code = (await http.request(method, url, **kwargs)).status_code
+        except Exception:
+            # The in-process transport re-raises unhandled errors, which a server would turn into a 500
+            status_code = 500
+        return time.perf_counter() - start, status_code
+
+    # Logout clears the cookie it's sent, so unauthenticated scenarios get their own client
+    async with client(token if scenario.authenticated else None) as http:
+        for i in range(warmup):
+            await send(http, offset + requests + i)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(i: int) -> tuple[float, int]:
+            async with semaphore:
+                return await send(http, i)
+
+        for sync_engine in (async_engine.sync_engine, engine):
+            event.listen(sync_engine, "before_cursor_execute", count)
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(limited(offset + i) for i in range(requests)))
+            elapsed = time.perf_counter() - start
+        finally:
+            for sync_engine in (async_engine.sync_engine, engine):
+                event.remove(sync_engine, "before_cursor_execute", count)
+
+    return {
+        **summarize([seconds for seconds, _ in results]),
+        "queries_per_request": round(statements / requests, 2),
+        "requests_per_second": round(requests / elapsed, 1),
+        "errors": sum(1 for _, status_code in results if status_code >= 400),
+    }
+
+async def median_of(scenario: Scenario, token: str, args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Each measurement's median over --repeat runs. A single run's p95 rests on its five slowest
+    requests and swings with scheduling noise; the median of several runs holds still enough to
+    gate on. Failures from any run count.
+    """
+    requests = min(args.requests, scenario.max_requests or args.requests)
+    runs = [
+        await run_scenario(scenario, token, requests, args.warmup, args.concurrency, offset=run * (args.requests + args.warmup))
+        for run in range(args.repeat)
+    ]
+    return {
+        **{key: round(statistics.median(result[key] for result in runs), 2) for key in runs[0]},
+        "errors": max(result["errors"] for result in runs),
+    }
+
+def compare(results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], tolerance: float) -> list[str]:
+    regressions = []
+    for route, result in results.items():
+        before = baseline.get(route)
+        if before is None:
+            continue
+        if result["queries_per_request"] > before["queries_per_request"] + 0.5:
+            regressions.append(f"{route}: {before['queries_per_request']} -> {result['queries_per_request']} queries per request")
+        if result["errors"] > before["errors"]:
+            regressions.append(f"{route}: {before['errors']} -> {result['errors']} failed responses")
+        # At a tolerance of 1, p95 may double and throughput halve
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance) and result["p95_ms"] - before["p95_ms"] > MIN_P95_REGRESSION_MS:
+            regressions.append(f"{route}: p95 {before['p95_ms']} -> {result['p95_ms']} ms")
+        if result["requests_per_second"] < before["requests_per_second"] / (1 + tolerance):
+            regressions.append(f"{route}: {before['requests_per_second']} -> {result['requests_per_second']} requests/s")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--requests", type=int, default=100, help="Measured requests per route")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per route, e.g. to fill caches")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--routes", help="Only run routes containing this text")
+    parser.add_argument("--database", help="SQLite file to seed, or reuse if already seeded (default: a fresh temporary one)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the generated dataset")
+    parser.add_argument("--baseline", type=Path, help="Baseline file (default: benchmarks/baselines/<scale>.json)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline instead of comparing")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per route; the median of each measurement is reported")
+    # Concurrent writes queue on SQLite's write lock, so their p95 moves by half between runs even as a median
+    parser.add_argument("--tolerance", type=float, default=1.0, help="Allowed relative p95 / throughput regression")
+    parser.add_argument("--output", type=Path, help="Also write the JSON report here")
+    args = parser.parse_args()
+    # Queries run inside a request would otherwise be EXPLAINed and logged as slow at 1m
+    os.environ["SLOW_QUERY_MS"] = "0"
+
+    use_database(args.database)
+    token = create_login()
+    start = time.perf_counter()
+    seed(SCALES[args.scale], args.seed)
+    seed_seconds = time.perf_counter() - start
+    fixtures = prepare_fixtures((args.requests + args.warmup) * args.repeat, token)
+
+    selected = [s for s in scenarios(fixtures) if not args.routes or args.routes in s.route]
+    missing = sorted(registered_routes() - {s.route for s in scenarios(fixtures)})
+
+    async def run_all() -> dict[str, dict[str, Any]]:
+        try:
+            return {s.route: await median_of(s, token, args) for s in selected}
+        finally:
+            await dispose_engines()
+
+    results = asyncio.run(run_all())
+    report = {
+        "scale": args.scale,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "repeat": args.repeat,
+        "machine": f"{platform.machine()} {platform.processor() or ''} cpus={os.cpu_count()} python={platform.python_version()}".replace("  ", " "),
+        "seed_seconds": round(seed_seconds, 1),
+        "routes": results,
+        "routes_without_scenario": missing,
+    }
+
+    baseline_path = args.baseline or BASELINES / f"{args.scale}.json"
+    regressions: list[str] = []
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+    elif baseline_path.exists():
+        regressions = compare(results, json.loads(baseline_path.read_text())["routes"], args.tolerance)
+    report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    print(output)
+    # A route added without a scenario would silently go unmeasured
+    sys.exit(1 if regressions or missing else 0)
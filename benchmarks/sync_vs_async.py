@@ -0,0 +1,91 @@
+"""
+Side-by-side throughput of the sync (Session, threadpool) and async (AsyncSession) paths.
+
+    python -m benchmarks.sync_vs_async --requests 2000 --concurrency 100
+
+Both endpoints run the same repair overview page query against the same database;
+only the session type and handler style differ.
+"""
+import argparse
+import asyncio
+from datetime import date
+import json
+import time
+import uuid
+
+from benchmarks.common import create_login, dispose_engines, summarize, use_database
+
+def seed(rows: int) -> None:
+    from sqlmodel import Session, insert
+    from app.database import engine
+    from app.models import Device, Repair, School, User
+
+    with Session(engine) as session:
+        creator_id = session.exec(User.__table__.select()).first().id
+        school_id, device_id = uuid.uuid4(), uuid.uuid4()
+        session.exec(insert(School).values(id=school_id, name="Bench School", contact_name="Bench", address="Bench"))
+        session.exec(insert(Device).values(id=device_id, manufacturer="Bench", model="Bench"))
+        session.exec(insert(Repair), params=[
+            {"id": uuid.uuid4(), "creator_id": creator_id, "school_id": school_id, "device_model_id": device_id,
+             "device_serial": f"SER{i:07d}", "has_protective_case": False, "date_raised": date.today()}
+            for i in range(rows)
+        ])
+        session.commit()
+
+def build_app():
+    from fastapi import FastAPI
+    from sqlmodel import select
+    from app.models import Repair
+    from app.utils.dependencies import async_session_dep, session_dep
+
+    def page():
+        return select(Repair).order_by(Repair.created_at.desc(), Repair.id.desc()).limit(25)
+
+    bench = FastAPI()
+
+    @bench.get("/sync")
+    def sync_page(session: session_dep):
+        return {"count": len(session.exec(page()).all())}
+
+    @bench.get("/async")
+    async def async_page(session: async_session_dep):
+        return {"count": len((await session.exec(page())).all())}
+
+    return bench
+
+async def drive(app, path: str, requests: int, concurrency: int) -> dict:
+    import httpx
+
+    samples: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                (await http.get(path)).raise_for_status()
+                samples.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    return {"requests_per_sec": round(requests / elapsed, 1), **summarize(samples)}
+
+async def main(args: argparse.Namespace) -> None:
+    app = build_app()
+    results = {}
+    for path in ("/sync", "/async"):
+        await drive(app, path, min(args.requests, 100), args.concurrency)  # warm up
+        results[path.strip("/")] = await drive(app, path, args.requests, args.concurrency)
+    print(json.dumps({"rows": args.rows, "concurrency": args.concurrency, **results}, indent=2))
+    await dispose_engines()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    use_database()
+    create_login()
+    seed(args.rows)
+    asyncio.run(main(args))
@@ -0,0 +1,135 @@
+"""
+Shared fixtures: one migrated SQLite database for the whole run, seeded once with a spread
+of schools, devices, collections, repairs and notes, and an in-process client logged in
+to it.
+
+Settings are read when `app.config` is first imported, so the environment is set here,
+before any test module imports from `app`. The user, fragment and count caches are
+disabled so every request does its full work, and the SLA job is left to the tests.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+import os
+from pathlib import Path
+import sqlite3
+import tempfile
+from typing import Any, Iterator
+import uuid
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+DATABASE = str(Path(tempfile.mkdtemp(prefix="repair-tests-")) / "test.db")
+
+os.environ.update({
+    "DB_SCHEME": "sqlite",
+    "DB_NAME": DATABASE,
+    "SECURE_COOKIES": "False",
+    "USER_CACHE_SIZE": "0",
+    "FRAGMENT_CACHE_SIZE": "0",
+    "REPAIR_COUNT_CACHE_SIZE": "0",
+    "SLA_EVALUATION_INTERVAL_SECONDS": "0",
+})
+# Templates and static files are looked up relative to the project root
+os.chdir(ROOT)
+
+SCHOOLS = 40
+DEVICES = 40
+COLLECTIONS = 40
+REPAIRS = 400
+AUTHORS = 30
+NOTES_PER_REPAIR = 3  # on the first tenth of the repairs, except the first
+
+def pytest_configure(config: pytest.Config) -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(str(ROOT / "alembic.ini")), "head")
+
+@dataclass
+class Seeded:
+    """Ids of the seeded rows the tests address. The first repair has a note by every author."""
+    user_id: uuid.UUID
+    school_ids: list[uuid.UUID]
+    device_ids: list[uuid.UUID]
+    collection_ids: list[uuid.UUID]
+    repair_ids: list[uuid.UUID]
+    note_ids: list[uuid.UUID]
+
+@pytest.fixture(scope="session")
+def seeded() -> Seeded:
+    from sqlmodel import Session, insert
+    from app.database import engine
+    from app.models import Collection, Device, Note, Repair, School, User
+    from app.models.repair import RepairStatus
+    from app.utils.table_versions import bump_statement
+
+    today = date.today()
+    with Session(engine) as session:
+        author_ids = [uuid.uuid4() for _ in range(AUTHORS)]
+        session.exec(insert(User), params=[
+            {"id": author_id, "email": f"author{i}@example.com", "full_name": f"Author {i}", "hashed_password": "x"}
+            for i, author_id in enumerate(author_ids)
+        ])
+        school_ids = [uuid.uuid4() for _ in range(SCHOOLS)]
+        session.exec(insert(School), params=[
+            {"id": school_id, "name": f"School {i}", "contact_name": "Contact", "address": "Address"}
+            for i, school_id in enumerate(school_ids)
+        ])
+        device_ids = [uuid.uuid4() for _ in range(DEVICES)]
+        session.exec(insert(Device), params=[
+            {"id": device_id, "manufacturer": "Maker", "model": f"Model {i}"} for i, device_id in enumerate(device_ids)
+        ])
+        collection_ids = [uuid.uuid4() for _ in range(COLLECTIONS)]
+        session.exec(insert(Collection), params=[
+            {"id": collection_id, "collection_number": f"C-{i}", "origin": "Depot", "destination": "Workshop"}
+            for i, collection_id in enumerate(collection_ids)
+        ])
+
+        repair_ids = [uuid.uuid4() for _ in range(REPAIRS)]
+        repairs = []
+        for i, repair_id in enumerate(repair_ids):
+            status = list(RepairStatus)[i % len(RepairStatus)]
+            raised = today - timedelta(days=i % 60)
+            created = datetime.combine(raised, datetime.min.time()) + timedelta(minutes=i)
+            repairs.append({
+                "id": repair_id, "creator_id": author_ids[i % len(author_ids)],
+                "school_id": school_ids[i % SCHOOLS], "device_model_id": device_ids[i % DEVICES],
+                "device_serial": f"SER{i:05d}", "external_ticket_number": f"T{i}", "has_protective_case": i % 2 == 0,
+                "status": status, "date_raised": raised, "created_at": created, "updated_at": created,
+                "date_closed": raised + timedelta(days=3) if status == RepairStatus.CLOSED else None,
+                "inbound_collection_id": collection_ids[i % COLLECTIONS] if i % 2 == 0 else None,
+                "outbound_collection_id": collection_ids[(i + 1) % COLLECTIONS] if status == RepairStatus.CLOSED else None,
+                "is_sla_breached": i % 7 == 0,
+            })
+        session.exec(insert(Repair), params=repairs)
+
+        note_ids = []
+        notes = []
+        for i, repair_id in enumerate(repair_ids[:REPAIRS // 10]):
+            for n in range(AUTHORS if i == 0 else NOTES_PER_REPAIR):
+                note_ids.append(uuid.uuid4())
+                notes.append({
+                    "id": note_ids[-1], "repair_id": repair_id, "creator_id": author_ids[n],
+                    "text": f"note {n} on repair {i}", "created_at": datetime.now() - timedelta(hours=i, minutes=n),
+                })
+        session.exec(insert(Note), params=notes)
+        # Invalidate the in-memory catalog like the CRUD routes do
+        session.exec(bump_statement(School.__tablename__, Device.__tablename__, Collection.__tablename__, Repair.__tablename__, Note.__tablename__))
+        session.commit()
+
+    # Plans are checked against statistics, as they would be on a database in use
+    with sqlite3.connect(DATABASE) as connection:
+        connection.execute("ANALYZE")
+    return Seeded(author_ids[0], school_ids, device_ids, collection_ids, repair_ids, note_ids)
+
+@pytest.fixture(scope="session")
+def http(seeded: Seeded) -> Iterator[Any]:
+    """A client for the app, logged in as the first seeded author"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.routes.auth import create_access_token
+
+    token = create_access_token(seeded.user_id, timedelta(hours=1))
+    with TestClient(app, cookies={"access_token": token}) as client:
+        yield client
@@ -0,0 +1,41 @@
+"""Helpers for checking what the app asks of the database"""
+from contextlib import contextmanager
+import re
+import sqlite3
+from typing import Any, Iterator
+
+@contextmanager
+def captured_statements(async_engine: Any) -> Iterator[list[tuple[str, Any]]]:
+    """Every statement `async_engine` runs in the block, with its parameters"""
+    from sqlalchemy import event
+
+    statements: list[tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+def query_plan(statement: str, parameters: Any = ()) -> list[str]:
+    """The EXPLAIN QUERY PLAN steps of `statement` on the test database"""
+    from app.config import settings
+
+    with sqlite3.connect(settings.DB_NAME) as connection:
+        return [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+def table_scans(plan: list[str], *tables: str) -> list[str]:
+    """Steps of `plan` that read every row of one of `tables` instead of using an index"""
+    full_scan = re.compile(rf"SCAN ({'|'.join(map(re.escape, tables))})( AS \w+)?")
+    return [step for step in plan if full_scan.fullmatch(step)]
+
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+def query_count(response: Any) -> int:
+    """Statements the request ran, as counted by RequestTimingMiddleware and reported in its Server-Timing header"""
+    match = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+    assert match, f"no query count in Server-Timing: {response.headers.get('server-timing')!r}"
+    return int(match.group(1))
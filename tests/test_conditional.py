@@ -0,0 +1,24 @@
+"""
+Revalidating the repair detail: a matching If-None-Match is answered 304 from the repair's
+version columns in one statement besides the user lookup, and a write to the repair's
+notes changes the ETag.
+"""
+from tests.helpers import query_count
+
+def test_repair_detail_revalidates_from_its_version(http, seeded):
+    path = f"/repair/{seeded.repair_ids[2]}"
+    first = http.get(path)
+    first.raise_for_status()
+    etag = first.headers["etag"]
+
+    revalidated = http.get(path, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    # The user lookup and the version
+    assert query_count(revalidated) == 2
+
+    http.post("/note/", json={"repair_id": str(seeded.repair_ids[2]), "text": "Revalidate"}).raise_for_status()
+    changed = http.get(path, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert "Revalidate" in changed.text
@@ -0,0 +1,46 @@
+"""
+Deleting a school, device or collection first probes for referencing repairs. A refused
+delete costs the probe and a capped count; an allowed one the probe, the lookup, the DELETE
+and the table version bump. Counts include the user lookup, as the user cache is disabled.
+"""
+import uuid
+
+import pytest
+
+from tests.helpers import query_count
+
+def insert_unreferenced(kind: str) -> uuid.UUID:
+    """A new school, device or collection that no repair references"""
+    from sqlmodel import Session, insert
+    from app.database import engine
+    from app.models import Collection, Device, School
+
+    id = uuid.uuid4()
+    statement = {
+        "school": insert(School).values(id=id, name="Spare School", contact_name="Spare", address="Spare"),
+        "device": insert(Device).values(id=id, manufacturer="Spare", model="Spare"),
+        "collection": insert(Collection).values(id=id, collection_number=f"S-{id.hex[:6]}", origin="Spare", destination="Spare"),
+    }[kind]
+    with Session(engine) as session:
+        session.exec(statement)
+        session.commit()
+    return id
+
+def referenced_id(seeded, kind: str) -> uuid.UUID:
+    return {"school": seeded.school_ids[0], "device": seeded.device_ids[0], "collection": seeded.collection_ids[0]}[kind]
+
+@pytest.mark.parametrize("kind", ["school", "device", "collection"])
+def test_refused_delete_probes_and_counts(http, seeded, kind):
+    response = http.delete(f"/{kind}/{referenced_id(seeded, kind)}")
+    response.raise_for_status()
+    assert "associated repairs" in response.text
+    # user, EXISTS probe, capped count
+    assert query_count(response) == 3
+
+@pytest.mark.parametrize("kind", ["school", "device", "collection"])
+def test_allowed_delete_probes_gets_deletes_and_bumps(http, seeded, kind):
+    response = http.delete(f"/{kind}/{insert_unreferenced(kind)}")
+    response.raise_for_status()
+    assert "success" in response.text
+    # user, EXISTS probe, SELECT, DELETE, table version bump
+    assert query_count(response) == 5
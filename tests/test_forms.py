@@ -0,0 +1,20 @@
+"""
+The create, edit and import forms each render, filled in from the row they edit.
+"""
+import pytest
+
+# Each form, given the seeded rows, and text it must contain
+FORMS = {
+    "new repair": (lambda seeded: "/repair/new", "Create Repair"),
+    "import repairs": (lambda seeded: "/repair/import", "device_serial"),
+    "edit repair": (lambda seeded: f"/repair/{seeded.repair_ids[1]}/edit", 'value="T1"'),
+    "new school": (lambda seeded: "/school/new", "school"),
+    "edit school": (lambda seeded: f"/school/{seeded.school_ids[1]}/edit", 'value="School 1"'),
+}
+
+@pytest.mark.parametrize("form", FORMS)
+def test_form_renders(http, seeded, form):
+    path, text = FORMS[form]
+    response = http.get(path(seeded))
+    response.raise_for_status()
+    assert text in response.text
@@ -0,0 +1,34 @@
+"""
+The CSV import commits each batch as it goes, so a file that stops being readable part way
+must still report the batches it imported and refresh the overview.
+"""
+from datetime import date
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+def test_unreadable_line_reports_the_batches_before_it(http, seeded):
+    from app.config import settings
+    from app.database import engine
+    from app.models import Repair
+
+    rows = settings.IMPORT_BATCH_SIZE + 10
+    lines = [b"school_id,device_model_id,device_serial,has_protective_case,date_raised"]
+    lines += [
+        f"{seeded.school_ids[0]},{seeded.device_ids[0]},IMP{i:06d},true,{date.today().isoformat()}".encode()
+        for i in range(rows)
+    ]
+    # Latin-1, not UTF-8, on the line after the imported rows
+    lines.append(f"{seeded.school_ids[0]},{seeded.device_ids[0]},IMP-\xe9,true,{date.today().isoformat()}".encode("latin-1"))
+    lines.append(f"{seeded.school_ids[0]},{seeded.device_ids[0]},IMP-LAST,true,{date.today().isoformat()}".encode())
+
+    response = http.post("/repair/import", files={"file": ("repairs.csv", b"\r\n".join(lines) + b"\r\n", "text/csv")})
+
+    assert response.status_code == 200
+    assert response.headers["hx-trigger"] == "refreshOverview"
+    assert "Import Stopped" in response.text
+    assert f"Line {rows + 2}:" in response.text
+    with Session(engine) as session:
+        imported = session.exec(select(func.count()).select_from(Repair).where(Repair.device_serial.startswith("IMP"))).one()
+    assert imported == rows
+    assert f">{rows}<" in response.text
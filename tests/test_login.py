@@ -0,0 +1,28 @@
+"""
+Logging in with a hash made at an outdated bcrypt cost replaces it with one at the current
+cost, written through its own session as the request's is closed while bcrypt runs.
+"""
+import uuid
+
+def test_login_upgrades_a_legacy_cost_hash(http):
+    from passlib.context import CryptContext
+    from sqlmodel import Session, insert, select
+    from app.config import settings
+    from app.database import engine
+    from app.models import User
+    from app.utils.security import pwd_context
+
+    legacy_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("legacy-password")
+    email = f"legacy-{uuid.uuid4().hex[:8]}@example.com"
+    with Session(engine) as session:
+        session.exec(insert(User).values(id=uuid.uuid4(), email=email, full_name="Legacy", hashed_password=legacy_hash))
+        session.commit()
+
+    response = http.post("/auth/login", data={"username": email, "password": "legacy-password"})
+    response.raise_for_status()
+
+    with Session(engine) as session:
+        stored = session.exec(select(User.hashed_password).where(User.email == email)).one()
+    assert stored != legacy_hash
+    assert stored.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert pwd_context.verify("legacy-password", stored)
@@ -0,0 +1,41 @@
+"""
+Multiprocess metrics: each worker's snapshot file carries its pid and a uuid, and a scrape
+sums the counters of every file while keeping gauges from live workers only.
+"""
+import asyncio
+import json
+import os
+
+def test_exposition_merges_worker_snapshots(tmp_path):
+    from app.utils.metrics import MetricsRegistry
+
+    registry = MetricsRegistry(str(tmp_path))
+    requests = registry.counter("requests_total", "Requests")
+    in_progress = registry.gauge("in_progress", "In progress")
+    requests.inc(amount=3)
+    in_progress.inc(amount=2)
+
+    # An exited worker whose pid was since reused by this one
+    exited = [
+        ["requests_total", "counter", "Requests", "sum", [["requests_total", [], 4]]],
+        ["in_progress", "gauge", "In progress", "sum", [["in_progress", [], 5]]],
+    ]
+    (tmp_path / f"{os.getpid()}-exited.json").write_text(json.dumps(exited))
+
+    text = asyncio.run(registry.exposition())
+    assert "requests_total 7" in text
+    assert "in_progress 7" in text  # the pid is alive, so both gauges count
+
+    (tmp_path / f"{os.getpid()}-exited.json").rename(tmp_path / "999999999-exited.json")
+    text = asyncio.run(registry.exposition())
+    assert "requests_total 7" in text
+    assert "in_progress 2" in text
+
+    own = [path.name for path in tmp_path.glob(f"{os.getpid()}-*.json")]
+    assert len(own) == 1 and own[0] != f"{os.getpid()}.json"
+
+def test_metrics_route_serves_collectors(http):
+    response = http.get("/metrics")
+    response.raise_for_status()
+    for name in ("http_requests_total", "db_pool_checked_out", "threadpool_busy_threads", "cache_hits_total", "sla_evaluation_runs_total"):
+        assert f"# TYPE {name} " in response.text
@@ -0,0 +1,45 @@
+"""
+N+1 check: each view must run the same number of statements whether it renders a few rows
+or many. The catalog is emptied before each request, so every request does its full work.
+"""
+import pytest
+
+from tests.helpers import query_count
+
+SMALL, LARGE = 3, 30
+
+# Each view at a page size, given the seeded rows
+VIEWS = {
+    "repair overview": lambda seeded, rows: f"/repair/overview?limit={rows}",
+    "repair search": lambda seeded, rows: f"/repair/search?q=SER&limit={rows}",
+    # The first repair has a note by every author, the second one by a few
+    "repair detail": lambda seeded, rows: f"/repair/{seeded.repair_ids[0 if rows == LARGE else 1]}",
+    "school overview": lambda seeded, rows: f"/school/overview?limit={rows}",
+    "device overview": lambda seeded, rows: f"/device/overview?limit={rows}",
+    "collection overview": lambda seeded, rows: f"/collection/overview?limit={rows}",
+    "note list": lambda seeded, rows: f"/note/?limit={rows}",
+}
+
+@pytest.mark.parametrize("view", VIEWS)
+def test_query_count_does_not_grow_with_rows(http, seeded, view):
+    from app.utils.catalog import catalog
+
+    counts = {}
+    for rows in (SMALL, LARGE):
+        catalog.clear()
+        response = http.get(VIEWS[view](seeded, rows))
+        response.raise_for_status()
+        counts[rows] = query_count(response)
+    assert counts[SMALL] == counts[LARGE]
+
+@pytest.mark.parametrize("path", ["/school/overview", "/device/overview", "/collection/overview"])
+def test_cached_views_read_table_versions_once(http, seeded, path):
+    from app.database import async_engine
+    from app.utils.catalog import catalog
+    from tests.helpers import captured_statements
+
+    catalog.clear()
+    with captured_statements(async_engine) as statements:
+        http.get(path).raise_for_status()
+    # The catalog reuses the versions the fragment is cached under
+    assert sum("table_versions" in statement for statement, _ in statements) == 1
@@ -0,0 +1,107 @@
+"""
+The hot read paths and the SLA engine's UPDATEs must reach repairs and notes through an
+index. Each test captures the statements a request (or an SLA run) sends and fails on any
+EXPLAIN QUERY PLAN step that reads a whole table.
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Any
+
+import pytest
+
+from app.database import async_engine
+from tests.helpers import captured_statements, query_plan, table_scans
+
+def plans(statements: list[tuple[str, Any]], table: str) -> list[tuple[str, list[str]]]:
+    """Each statement that reads `table`, with its plan"""
+    return [(statement, query_plan(statement, parameters)) for statement, parameters in statements if f" {table}" in statement]
+
+def assert_indexed(statements: list[tuple[str, Any]], table: str) -> None:
+    checked = plans(statements, table)
+    assert checked, f"no statement read {table}"
+    for statement, plan in checked:
+        assert not table_scans(plan, table), f"{statement}\n{plan}"
+
+# Filters and sorts of the repair list, each given the seeded rows
+CASES = {
+    "newest": lambda seeded: {},
+    "updated": lambda seeded: {"sort": "-updated_at"},
+    "raised": lambda seeded: {"sort": "date_raised"},
+    "school": lambda seeded: {"school_id": seeded.school_ids[0]},
+    "school by updated": lambda seeded: {"school_id": seeded.school_ids[0], "sort": "-updated_at"},
+    "school by raised": lambda seeded: {"school_id": seeded.school_ids[0], "sort": "-date_raised"},
+    "school and status": lambda seeded: {"school_id": seeded.school_ids[0], "status": [1, 2]},
+    "status": lambda seeded: {"status": [4]},
+    "device": lambda seeded: {"device_model_id": seeded.device_ids[0]},
+    "collection": lambda seeded: {"collection_id": seeded.collection_ids[0]},
+    "breached": lambda seeded: {"is_sla_breached": "true"},
+    "breached by raised": lambda seeded: {"is_sla_breached": "true", "sort": "-date_raised"},
+    "date range": lambda seeded: {"date_raised_from": (date.today() - timedelta(days=10)).isoformat(), "sort": "-updated_at"},
+}
+
+@pytest.mark.parametrize("case", CASES)
+def test_repair_overview_pages_use_an_index(http, seeded, case):
+    params = CASES[case](seeded)
+    with captured_statements(async_engine) as statements:
+        first = http.get("/repair/", params={**params, "limit": 5})
+        first.raise_for_status()
+        cursor = first.json()["next_cursor"]
+        assert cursor
+        http.get("/repair/overview/rows", params={**params, "limit": 5, "cursor": cursor}).raise_for_status()
+    assert_indexed(statements, "repairs")
+
+def test_note_list_pages_use_an_index(http, seeded):
+    with captured_statements(async_engine) as statements:
+        first = http.get("/note/", params={"limit": 5})
+        first.raise_for_status()
+        http.get("/note/", params={"limit": 5, "cursor": first.json()["next_cursor"]}).raise_for_status()
+    assert_indexed(statements, "notes")
+
+def test_repair_detail_finds_notes_by_repair(http, seeded):
+    with captured_statements(async_engine) as statements:
+        http.get(f"/repair/{seeded.repair_ids[0]}").raise_for_status()
+    assert_indexed(statements, "notes")
+    assert any("SEARCH notes USING INDEX ix_notes_repair_id_created_at" in step for _, plan in plans(statements, "notes") for step in plan)
+
+@pytest.mark.parametrize("path", ["/school/{school_id}", "/device/{device_id}", "/collection/{collection_id}"])
+def test_delete_guards_probe_repairs_by_index(http, seeded, path):
+    url = path.format(school_id=seeded.school_ids[0], device_id=seeded.device_ids[0], collection_id=seeded.collection_ids[0])
+    with captured_statements(async_engine) as statements:
+        response = http.delete(url)
+    assert "Cannot delete" in response.text
+    checked = plans(statements, "repairs")
+    # The EXISTS probe and the capped count
+    assert len(checked) == 2
+    for statement, plan in checked:
+        assert not table_scans(plan, "repairs"), f"{statement}\n{plan}"
+        assert any(step.startswith("SEARCH repairs USING") for step in plan), f"{statement}\n{plan}"
+
+def test_incremental_sla_updates_use_an_index(seeded):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import Session, update
+    from app.config import settings
+    from app.database import engine as sync_engine
+    from app.models import JobState
+    from app.services.sla import SLA_JOB, SlaEngine
+
+    # As if the last run was yesterday, so this one also looks for repairs that aged past their deadline
+    with Session(sync_engine) as session:
+        session.exec(update(JobState).where(JobState.name == SLA_JOB).values(last_started_at=datetime.now() - timedelta(days=1)))
+        session.commit()
+    engine = create_async_engine(settings.SQLALCHEMY_ASYNC_DATABASE_URI)
+    sla = SlaEngine(engine, interval=0)
+
+    async def run():
+        try:
+            return await sla.run()
+        finally:
+            await engine.dispose()
+
+    with captured_statements(engine) as statements:
+        asyncio.run(run())
+    updates = [(statement, parameters) for statement, parameters in statements if statement.startswith("UPDATE repairs")]
+    # The changed-since UPDATE and the aged UPDATE
+    assert len(updates) == 2
+    (changed, changed_plan), (aged, aged_plan) = plans(updates, "repairs")
+    assert not table_scans(changed_plan, "repairs"), f"{changed}\n{changed_plan}"
+    assert any("USING INDEX ix_repairs_open_unbreached" in step for step in aged_plan), f"{aged}\n{aged_plan}"
@@ -0,0 +1,26 @@
+"""Search ranks every match of a query, not just the newest ones."""
+from datetime import datetime, timedelta
+import re
+import uuid
+
+def test_best_match_ranks_first_however_old(http, seeded):
+    from sqlmodel import Session, insert
+    from app.database import engine
+    from app.models import Note
+
+    best, others = seeded.repair_ids[5], seeded.repair_ids[6:300]
+    now = datetime.now()
+    with Session(engine) as session:
+        # The best match is the oldest note; every later one mentions the word once among others
+        session.exec(insert(Note).values(id=uuid.uuid4(), repair_id=best, creator_id=seeded.user_id, text="hinge hinge hinge", created_at=now - timedelta(days=30)))
+        session.exec(insert(Note), params=[
+            {"id": uuid.uuid4(), "repair_id": repair_id, "creator_id": seeded.user_id, "text": "lid hinge loose, screen flickers and the case is cracked", "created_at": now}
+            for repair_id in others
+        ])
+        session.commit()
+
+    response = http.get("/repair/search", params={"q": "hinge", "limit": 5})
+    response.raise_for_status()
+    serials = re.findall(r'<div class="font-medium">(SER\d+)</div>', response.text)
+    assert len(serials) == 5
+    assert serials[0] == "SER00005"
@@ -0,0 +1,34 @@
+"""
+The SLA engine's last run is shared through job_state: one worker evaluates per interval,
+and a restarted worker carries on incrementally instead of re-evaluating every repair.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+def test_sla_runs_once_per_interval_across_workers(seeded):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import Session, update
+    from app.config import settings
+    from app.database import engine as sync_engine
+    from app.models import JobState
+    from app.services.sla import SLA_JOB, SlaEngine
+
+    with Session(sync_engine) as session:
+        session.exec(update(JobState).where(JobState.name == SLA_JOB).values(last_started_at=datetime.now() - timedelta(hours=1)))
+        session.commit()
+
+    async def run():
+        engine = create_async_engine(settings.SQLALCHEMY_ASYNC_DATABASE_URI)
+        try:
+            # Two workers on a five minute interval, and one started after a restart
+            first, second, restarted = (SlaEngine(engine, interval=300) for _ in range(3))
+            return await first.run(), await second.run(), await restarted.run(), await restarted.run(full=True)
+        finally:
+            await engine.dispose()
+
+    first, second, restarted, full = asyncio.run(run())
+    assert first is not None and not first.full
+    assert second is None
+    assert restarted is None
+    # Full runs, as from `python -m app.cli evaluate-sla`, don't wait their turn
+    assert full is not None and full.full
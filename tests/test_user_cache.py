@@ -0,0 +1,32 @@
+"""
+The user cache serves a user only at the users version it was stored at, and never hands
+out the instance it keeps.
+"""
+import uuid
+
+def test_user_cache_serves_copies_at_the_stored_version():
+    from app.models.user import User
+    from app.utils.user_cache import UserCache
+
+    cache = UserCache(maxsize=4, poll_interval=2)
+    user = User(id=uuid.uuid4(), email="cached@example.com", full_name="Cached", hashed_password="x")
+    cache.put(user, 1)
+
+    first, second = cache.get(user.id, 1), cache.get(user.id, 1)
+    assert first is not None and second is not None
+    assert first is not second and first is not user
+    first.is_superuser = True
+    assert not cache.get(user.id, 1).is_superuser
+
+    # Any user write elsewhere bumps the version and drops the entry
+    assert cache.get(user.id, 2) is None
+    assert cache.get(user.id, 1) is None
+
+def test_user_cache_skips_inactive_users():
+    from app.models.user import User
+    from app.utils.user_cache import UserCache
+
+    cache = UserCache(maxsize=4, poll_interval=2)
+    user = User(id=uuid.uuid4(), email="inactive@example.com", hashed_password="x", is_active=False)
+    cache.put(user, 1)
+    assert cache.get(user.id, 1) is None
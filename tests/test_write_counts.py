@@ -0,0 +1,84 @@
+"""
+Write-path check: each create, update and delete route must run exactly its expected
+statements.
+
+A write should cost its INSERT/UPDATE/DELETE, the table_versions bump and whatever lookups
+it needs to validate the request; reloading the written row afterwards (a refresh() after
+commit) shows up here as one statement too many, and a route that stops writing as too few.
+Counts include the user lookup on authenticated routes, as the user cache is disabled.
+"""
+from datetime import date, datetime
+from typing import Any
+import uuid
+
+import pytest
+
+from tests.helpers import query_count
+
+# Statements per route, including the user lookup on authenticated routes
+STATEMENTS = {
+    "POST /auth/register": 2,           # email check, INSERT
+    "POST /school/": 3,                 # user, INSERT, bump
+    "PATCH /school/{school_id}": 3,     # user, UPDATE, bump
+    "DELETE /school/{school_id}": 5,    # user, references probe, SELECT, DELETE, bump
+    "POST /device/": 3,
+    "DELETE /device/{device_id}": 5,
+    "POST /collection/": 3,
+    "DELETE /collection/{collection_id}": 5,
+    "POST /repair/": 3,
+    "PATCH /repair/{repair_id}": 3,     # user, UPDATE ... RETURNING, bump
+    "PATCH /repair/bulk": 3,            # user, UPDATE, bump
+    "POST /note/": 4,                   # user, INSERT, notes_version bump, bump
+    "PATCH /note/{note_id}": 4,
+    "DELETE /note/{note_id}": 4,        # user, DELETE ... RETURNING, notes_version bump, bump
+}
+
+def insert_row(model: Any, values: dict[str, Any]) -> uuid.UUID:
+    """Insert one row of `model` directly, for a route to update or delete"""
+    from sqlmodel import Session, insert
+    from app.database import engine
+
+    id = uuid.uuid4()
+    with Session(engine) as session:
+        session.exec(insert(model).values(id=id, **values))
+        session.commit()
+    return id
+
+def write_request(route: str, seeded) -> tuple[str, str, dict[str, Any]]:
+    """Method, path and body of one request to `route`, inserting the row it acts on"""
+    from app.models import Collection, Device, Note, School
+
+    school = {"name": "Written School", "contact_name": "Writer", "address": "Writer"}
+    device = {"manufacturer": "Writer", "model": "Writer"}
+    collection = {"collection_number": f"W-{uuid.uuid4().hex[:6]}", "origin": "Writer", "destination": "Writer"}
+    repair_id = seeded.repair_ids[-1]
+    note = {"repair_id": repair_id, "creator_id": seeded.user_id, "text": "Written", "created_at": datetime.now()}
+    requests = {
+        "POST /auth/register": lambda: ("POST", "/auth/register", {"json": {
+            "email": f"writer-{uuid.uuid4().hex[:8]}@example.com", "full_name": "Writer", "password": "write-password",
+        }}),
+        "POST /school/": lambda: ("POST", "/school/", {"data": school}),
+        "PATCH /school/{school_id}": lambda: ("PATCH", f"/school/{insert_row(School, school)}", {"data": {"name": "Renamed School"}}),
+        "DELETE /school/{school_id}": lambda: ("DELETE", f"/school/{insert_row(School, school)}", {}),
+        "POST /device/": lambda: ("POST", "/device/", {"data": device}),
+        "DELETE /device/{device_id}": lambda: ("DELETE", f"/device/{insert_row(Device, device)}", {}),
+        "POST /collection/": lambda: ("POST", "/collection/", {"data": collection}),
+        "DELETE /collection/{collection_id}": lambda: ("DELETE", f"/collection/{insert_row(Collection, collection)}", {}),
+        "POST /repair/": lambda: ("POST", "/repair/", {"data": {
+            "school_id": str(seeded.school_ids[0]), "device_model_id": str(seeded.device_ids[0]), "device_serial": "WRITE1",
+            "has_protective_case": "true", "date_raised": date.today().isoformat(),
+        }}),
+        "PATCH /repair/{repair_id}": lambda: ("PATCH", f"/repair/{repair_id}", {"json": {"status": 2, "external_ticket_number": "W-T1"}}),
+        "PATCH /repair/bulk": lambda: ("PATCH", "/repair/bulk", {"json": {"ids": [str(repair_id)], "update": {"status": 3}}}),
+        "POST /note/": lambda: ("POST", "/note/", {"json": {"repair_id": str(repair_id), "text": "Written"}}),
+        "PATCH /note/{note_id}": lambda: ("PATCH", f"/note/{insert_row(Note, note)}", {"json": {"text": "Rewritten"}}),
+        "DELETE /note/{note_id}": lambda: ("DELETE", f"/note/{insert_row(Note, note)}", {}),
+    }
+    return requests[route]()
+
+@pytest.mark.parametrize("route", STATEMENTS)
+def test_write_runs_its_statements(http, seeded, route):
+    method, path, kwargs = write_request(route, seeded)
+    response = http.request(method, path, **kwargs)
+    response.raise_for_status()
+    assert query_count(response) == STATEMENTS[route]